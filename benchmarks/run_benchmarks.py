@@ -0,0 +1,264 @@
+"""
+Benchmarks of the scrape, parse and transform hot paths on recorded or synthetic HTML fixtures.
+
+    python benchmarks/run_benchmarks.py                       # compare against baseline.json
+    python benchmarks/run_benchmarks.py --save-baseline       # record a new baseline
+    python benchmarks/run_benchmarks.py --fixtures fixtures   # use pages recorded by finviz.testing
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DISABLE_TQDM", "1")
+warnings.simplefilter("ignore")  # pandas deprecation warnings would be timed too
+
+from lxml import html  # noqa: E402
+
+import finviz.helper_functions.scraper_functions as scrape  # noqa: E402
+from finviz import main_func  # noqa: E402
+from finviz.config import connection_settings  # noqa: E402
+from finviz.helper_functions.save_data import (export_to_csv,  # noqa: E402
+                                               export_to_db)
+from finviz.testing import (FixtureStore, StandInServer,  # noqa: E402
+                            render_quote_page, render_screener_page,
+                            synthetic_universe)
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+SIZES = [20, 100, 1000, 10000]
+
+
+class Fixtures:
+    """ Screener and quote pages for a universe size, recorded if available or synthetic. """
+
+    def __init__(self, size, store=None):
+        self.size = size
+        self.headers, self.rows = synthetic_universe(size)
+        self.pages = [
+            render_screener_page(self.headers, self.rows, offset).encode("utf-8")
+            for offset in range(1, size + 1, 20)
+        ]
+        self.data = [dict(zip(self.headers, row)) for row in self.rows]
+
+        quote_pages = store.keys("quote.ashx") if store else []
+        if quote_pages:
+            self.quote_page = store.load(quote_pages[0])
+        else:
+            self.quote_page = synthetic_quote_page().encode("utf-8")
+
+
+def synthetic_quote_page():
+    snapshot = [(f"Field {number}", f"{number}.00") for number in range(71)]
+    snapshot.insert(5, ("Volatility", "2.10% 1.80%"))
+    return render_quote_page(
+        "T00001",
+        {
+            "Company": "Company 1 Inc",
+            "Sector": "Technology",
+            "Industry": "Software",
+            "Country": "USA",
+            "Website": "https://example.com",
+        },
+        snapshot,
+        ratings=[("Jan-05-24", "Upgrade", "UBS", "Neutral → Buy", "$180 → $210")] * 5,
+        news=[
+            (f"Jan-0{day}-24 0{hour}:30AM", f"Headline {day}{hour}", "https://example.com", "Reuters")
+            for day in range(1, 10)
+            for hour in range(9, 1, -1)
+        ],
+    )
+
+
+def bench_get_table(fixtures):
+    for page in fixtures.pages:
+        scrape.get_table(page, fixtures.headers, fixtures.size)
+
+
+def bench_get_total_rows(fixtures):
+    page = html.fromstring(fixtures.pages[0])
+    for _ in fixtures.pages:
+        scrape.get_total_rows(page)
+
+
+def bench_get_page_urls(fixtures):
+    page = html.fromstring(fixtures.pages[0])
+    for _ in fixtures.pages:
+        scrape.get_page_urls(page, fixtures.size, "https://finviz.com/screener.ashx?v=111")
+
+
+def bench_download_ticker_details(fixtures):
+    for row in fixtures.data:
+        scrape.download_ticker_details(
+            fixtures.quote_page, URL=f"https://finviz.com/quote.ashx?&t={row['Ticker']}"
+        )
+
+
+def bench_get_stock(fixtures):
+    for row in fixtures.data:
+        main_func.STOCK_PAGE[row["Ticker"]] = html.fromstring(fixtures.quote_page)
+        main_func.get_stock(row["Ticker"])
+    main_func.STOCK_PAGE.clear()
+
+
+def bench_get_news(fixtures):
+    for row in fixtures.data:
+        main_func.STOCK_PAGE[row["Ticker"]] = html.fromstring(fixtures.quote_page)
+        main_func.get_news(row["Ticker"])
+    main_func.STOCK_PAGE.clear()
+
+
+def bench_export_to_csv(fixtures):
+    export_to_csv(fixtures.headers, fixtures.data)
+
+
+def bench_export_to_db(fixtures):
+    with tempfile.TemporaryDirectory() as directory:
+        export_to_db(fixtures.headers, fixtures.data, os.path.join(directory, "db.sqlite3"))
+
+
+def bench_get_dataframe(fixtures):
+    from finviz_utils.finviz_utils import _get_dataframe
+
+    # Rows are crawled from a local stand-in serving the synthetic screener
+    with StandInServer(screener=(fixtures.headers, fixtures.rows)) as server:
+        base_url = connection_settings["BASE_URL"]
+        connection_settings["BASE_URL"] = server.url
+        try:
+            _get_dataframe("exch_nasd", table="Overview", order="", details=False)
+        finally:
+            connection_settings["BASE_URL"] = base_url
+
+
+def bench_process_dataframe(fixtures):
+    import pandas as pd
+
+    from finviz_utils.constants import PERFORMANCE_TABLE_ALL_FIELDS
+    from finviz_utils.finviz_utils import _process_dataframe
+
+    # Shaped like the frame _get_dataframe builds: one object column per ticker
+    frame = pd.DataFrame(
+        {row["Ticker"]: pd.Series(row, dtype=object) for row in fixtures.data}
+    ).reindex(PERFORMANCE_TABLE_ALL_FIELDS)
+    _process_dataframe(frame)
+
+
+# name: (function, largest size it runs on unless --full is given)
+# Cases parsing one quote page per row are capped to keep a default run short
+CASES = {
+    "scraper_functions.get_table": (bench_get_table, None),
+    "scraper_functions.get_total_rows": (bench_get_total_rows, None),
+    "scraper_functions.get_page_urls": (bench_get_page_urls, None),
+    "scraper_functions.download_ticker_details": (bench_download_ticker_details, 1000),
+    "main_func.get_stock": (bench_get_stock, 1000),
+    "main_func.get_news": (bench_get_news, 1000),
+    "save_data.export_to_csv": (bench_export_to_csv, None),
+    "save_data.export_to_db": (bench_export_to_db, None),
+    "finviz_utils._get_dataframe": (bench_get_dataframe, 1000),
+    "finviz_utils._process_dataframe": (bench_process_dataframe, 1000),
+}
+
+
+def measure(function, fixtures, repeat):
+    """ Returns the best wall time of the runs and the peak memory of a traced run. """
+
+    seconds = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        function(fixtures)
+        seconds = min(seconds, time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    function(fixtures)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return seconds, peak
+
+
+def run(sizes, cases, repeat, store, full):
+    results = {}
+    for size in sizes:
+        fixtures = Fixtures(size, store)
+        for name in cases:
+            function, max_size = CASES[name]
+            if max_size is not None and size > max_size and not full:
+                continue
+            try:
+                seconds, peak = measure(function, fixtures, repeat)
+            except Exception as error:  # eg. finviz_utils on an unsupported pandas version
+                print(f"skipped {name}[{size}]: {error!r}")
+                continue
+
+            results[f"{name}[{size}]"] = {
+                "seconds": round(seconds, 6),
+                "rows_per_sec": round(size / seconds, 1) if seconds else None,
+                "peak_kb": round(peak / 1024, 1),
+            }
+    return results
+
+
+def report(results, baseline, threshold):
+    """ Prints the results next to the baseline and returns the keys that regressed. """
+
+    regressions = []
+    print(f"{'case':58} {'seconds':>10} {'rows/sec':>12} {'peak KB':>10} {'vs base':>9}")
+    for key, result in results.items():
+        base = baseline.get(key)
+        change = ""
+        if base and base["seconds"]:
+            ratio = result["seconds"] / base["seconds"] - 1
+            change = f"{ratio:+.0%}"
+            if ratio > threshold:
+                regressions.append(key)
+                change += " !"
+        print(
+            f"{key:58} {result['seconds']:>10.4f} {result['rows_per_sec']:>12,.0f} "
+            f"{result['peak_kb']:>10,.0f} {change:>9}"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--cases", nargs="+", default=list(CASES), choices=list(CASES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--fixtures", help="fixture directory recorded with finviz.testing")
+    parser.add_argument("--full", action="store_true", help="run every case on every size")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="slowdown reported as a regression"
+    )
+    args = parser.parse_args()
+
+    store = FixtureStore(args.fixtures) if args.fixtures else None
+    results = run(args.sizes, args.cases, args.repeat, store, args.full)
+
+    baseline = {}
+    if os.path.isfile(args.baseline):
+        with open(args.baseline, "r") as fp:
+            baseline = json.load(fp)
+
+    regressions = report(results, baseline, args.threshold)
+
+    if args.save_baseline:
+        baseline.update(results)
+        with open(args.baseline, "w") as fp:
+            json.dump(baseline, fp, indent=1, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+    elif regressions:
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,14 @@
+from finviz.helper_functions.query_cache import (disable_query_cache,
+                                                 enable_query_cache)
+from finviz.helper_functions.request_functions import configure_client
+from finviz.helper_functions.response_cache import (disable_response_cache,
+                                                    enable_response_cache)
+from finviz.helper_functions.save_data import ExportSink
+from finviz.helper_functions.snapshot_store import SnapshotStore
 from finviz.main_func import (get_all_news, get_analyst_price_targets,
                               get_insider, get_news, get_stock)
+from finviz.multi_view import MultiViewScreener
 from finviz.portfolio import Portfolio
 from finviz.screener import Screener
+from finviz.sharded import ShardedScreener
+from finviz.ticker_list import TickerListScreener
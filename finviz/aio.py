@@ -0,0 +1,255 @@
+import asyncio
+
+from user_agent import generate_user_agent
+
+import finviz.helper_functions.scraper_functions as scrape
+from finviz import main_func, screener
+from finviz.config import connection_settings
+from finviz.helper_functions.error_handling import NoResults
+from finviz.helper_functions.request_functions import (Connector,
+                                                       async_http_request_get,
+                                                       rebase_url, session_scope)
+
+
+class Screener(screener.Screener):
+    """
+    Asynchronous version of finviz.screener.Screener that runs inside any event loop.
+    Await an instance to download the screener:
+
+    async with aiohttp.ClientSession() as session:
+        stock_list = await Screener(filters=['exch_nasd'], session=session)
+    """
+
+    def __init__(
+        self,
+        tickers=None,
+        filters=None,
+        rows=None,
+        order="",
+        signal="",
+        table=None,
+        custom=None,
+        user_agent=generate_user_agent(),
+        stream=False,
+        base_url=None,
+        session=None,
+        columns=None,
+        sink=None,
+        ratings_sink=None,
+    ):
+        """
+        Initializes all variables to its values without sending any request.
+        Takes the same parameters as finviz.screener.Screener, plus:
+
+        :param session: asynchronous session to send the requests with, a new one is used per call if omitted
+        :type session: aiohttp.ClientSession
+        """
+
+        if columns:
+            custom = self._check_columns(columns)
+
+        self._init_parameters(
+            tickers,
+            filters,
+            rows,
+            order,
+            signal,
+            table,
+            custom,
+            user_agent,
+            "async",
+            stream,
+            base_url,
+            sink=sink,
+            ratings_sink=ratings_sink,
+        )
+        self._session = session
+        self.headers = []
+        self.data = []
+
+    def __await__(self):
+        return self.search().__await__()
+
+    async def __call__(
+        self,
+        tickers=None,
+        filters=None,
+        rows=None,
+        order="",
+        signal="",
+        table=None,
+        custom=None,
+    ):
+        """
+        Adds more filters to the screener and downloads it again.
+        Only a new order or row limit is applied to the downloaded rows if possible.
+        """
+
+        only_reordered = (order or rows) and not (
+            tickers or filters or signal or table or custom
+        )
+        if only_reordered and self._reorder(order, rows):
+            return self
+
+        self._update_parameters(tickers, filters, rows, order, signal, table, custom)
+        self._restart_sinks()
+        return await self.search()
+
+    add = __call__
+
+    async def search(self):
+        """ Downloads the screener and returns itself. """
+
+        key = self._query_key()
+        data = self._cached_search(key)
+        if data is not None:
+            self._write_rows(data, flush=True)
+            self.data = self._result = data
+            return self
+
+        async with session_scope(self._session, self._user_agent) as session:
+            self._read_first_page(
+                *await async_http_request_get(
+                    rebase_url(screener.SCREENER_URL, self._base_url),
+                    session,
+                    payload=self._screener_payload(),
+                    user_agent=self._user_agent,
+                )
+            )
+
+            if self._stream:
+                self.data = []
+            else:
+                self.data = []
+                async for page in self._connector().stream(session=session):
+                    self._write_rows(page)
+                    self.data.extend(page)
+                self._write_rows([], flush=True)
+                self._cache_search(key, self.data)
+                self._result = self.data
+
+        return self
+
+    async def astream(self, ordered=True):
+        """
+        Asynchronously yields the rows page by page as the responses arrive.
+        Non-streaming screeners yield the rows already downloaded.
+
+        :param ordered: yield the pages in table order instead of the order they arrive in
+        :type ordered: bool
+        """
+
+        if not self._stream:
+            for row in self.data:
+                yield row
+            return
+
+        async with session_scope(self._session, self._user_agent) as session:
+            async for page in self._connector().stream(ordered, session=session):
+                self._write_rows(page)
+                for row in page:
+                    yield row
+        self._write_rows([], flush=True)
+
+    async def get_ticker_details(self):
+        """
+        Downloads the details of all tickers shown by the table.
+        """
+
+        merge = self._ticker_details_merger()
+        async with session_scope(self._session, self._user_agent) as session:
+            connector = Connector(
+                scrape.download_ticker_details,
+                self._ticker_urls(),
+                self._user_agent,
+                parse_workers=connection_settings["PARSE_WORKERS"],
+            )
+            # Details are merged as the responses arrive
+            async for entry in connector.stream(session=session):
+                self.analysis.extend(merge(entry))
+
+        if self._ratings_sink is not None:
+            self._ratings_sink.flush()
+
+        return self.data
+
+
+async def search_all(screeners):
+    """
+    Downloads screeners concurrently and returns the ones with results. Every screener is
+    downloaded, and cached, before the first error other than NoResults is raised.
+
+    :param screeners: screeners to download
+    :type screeners: list
+    """
+
+    results = await asyncio.gather(
+        *(stock_list.search() for stock_list in screeners), return_exceptions=True
+    )
+
+    for result in results:
+        if isinstance(result, Exception) and not isinstance(result, NoResults):
+            raise result
+
+    return [
+        stock_list
+        for stock_list, result in zip(screeners, results)
+        if not isinstance(result, NoResults)
+    ]
+
+
+async def get_page(ticker, session=None):
+    """
+    Returns the parsed quote page of a ticker, downloading it if it is not cached yet.
+
+    :param ticker: stock symbol
+    :type ticker: str
+    :param session: asynchronous session to send the request with
+    :type session: aiohttp.ClientSession
+    """
+
+    if ticker not in main_func.STOCK_PAGE:
+        async with session_scope(session) as session:
+            main_func.STOCK_PAGE[ticker], _ = await async_http_request_get(
+                main_func.STOCK_URL, session, payload={"t": ticker}
+            )
+
+    return main_func.STOCK_PAGE[ticker]
+
+
+async def get_stock(ticker, session=None):
+    """
+    Returns a dictionary containing stock data.
+
+    :param ticker: stock symbol
+    :type ticker: str
+    :param session: asynchronous session to send the request with
+    :type session: aiohttp.ClientSession
+    :return dict
+    """
+
+    return main_func._stock_data(await get_page(ticker, session))
+
+
+async def get_insider(ticker, session=None):
+    """
+    Returns a list of dictionaries containing all recent insider transactions.
+
+    :param ticker: stock symbol
+    :param session: asynchronous session to send the request with
+    :return: list
+    """
+
+    return main_func._insider_data(await get_page(ticker, session))
+
+
+async def get_news(ticker, session=None):
+    """
+    Returns a list of sets containing news headline and url
+
+    :param ticker: stock symbol
+    :param session: asynchronous session to send the request with
+    :return: list
+    """
+
+    return main_func._news_data(await get_page(ticker, session))
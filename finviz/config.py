@@ -1,4 +1,14 @@
 connection_settings = dict(
+    BASE_URL="https://finviz.com",  # Point it to a stand-in server to crawl offline
     CONCURRENT_CONNECTIONS=30,
     CONNECTION_TIMEOUT=30000,
+    POOL_CONNECTIONS=10,  # Number of per-host connection pools kept alive
+    POOL_MAXSIZE=30,  # Maximum number of open connections to a single host
+    POOL_BLOCK=True,  # Wait for a free connection instead of opening extra ones
+    INITIAL_CONCURRENCY=4,  # Asynchronous requests in flight before the window adapts
+    INITIAL_REQUEST_RATE=10.0,  # Asynchronous requests per second before the rate adapts
+    MAX_REQUEST_RATE=50.0,
+    THROTTLE_RETRIES=10,  # Times a throttled URL is requeued before giving up
+    THREAD_WORKERS=10,  # Threads used by the "threaded" request method
+    PARSE_WORKERS=0,  # Processes parsing screener and quote pages, 0 to parse them inline
 )
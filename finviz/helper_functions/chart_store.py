@@ -0,0 +1,104 @@
+import datetime
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+CHUNK_SIZE = 64 * 1024
+
+
+class ChartStore:
+    """
+    Directory of chart images named by the SHA-256 hash of their content, so that a chart
+    that did not change since the last download is not written again. The manifest of each
+    ticker, in manifests/{ticker}.json, lists the images each chart had and when.
+    """
+
+    def __init__(self, directory="charts"):
+        """
+        :param directory: directory of the images and manifests
+        :type directory: str
+        """
+
+        self.directory = directory
+        self._manifest_dir = os.path.join(directory, "manifests")
+        self._locks = {}
+        self._lock = threading.Lock()
+
+        os.makedirs(self._manifest_dir, exist_ok=True)
+
+    def write(self, ticker, chart, chunks):
+        """
+        Writes an image as it is downloaded and records it in the manifest of the ticker.
+        Returns the manifest entry, with whether the chart changed since its last download.
+
+        :param ticker: stock symbol eg.: 'AAPL'
+        :type ticker: str
+        :param chart: parameters of the chart eg.: 'p=d&s=l&ta=1&ty=c'
+        :type chart: str
+        :param chunks: content of the image
+        :type chunks: Iterable[bytes]
+        """
+
+        digest = hashlib.sha256()
+        with tempfile.NamedTemporaryFile(
+            dir=self.directory, suffix=".part", delete=False
+        ) as handle:
+            try:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    handle.write(chunk)
+            except BaseException:
+                handle.close()
+                os.remove(handle.name)
+                raise
+
+        file_name = f"{digest.hexdigest()}.png"
+        path = os.path.join(self.directory, file_name)
+        if os.path.exists(path):
+            os.remove(handle.name)
+        else:
+            os.replace(handle.name, path)
+
+        entry = {
+            "sha256": digest.hexdigest(),
+            "file": file_name,
+            "downloaded_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        }
+
+        with self.__ticker_lock(ticker):
+            manifest = self.manifest(ticker)
+            versions = manifest["charts"].setdefault(chart, [])
+            changed = not versions or versions[-1]["sha256"] != entry["sha256"]
+            if changed:
+                versions.append(entry)
+                self.__save_manifest(ticker, manifest)
+
+        return dict(entry, ticker=ticker, chart=chart, changed=changed)
+
+    def manifest(self, ticker):
+        """ Returns the manifest of a ticker: the images of each of its charts, oldest first. """
+
+        try:
+            with open(self.__manifest_path(ticker)) as handle:
+                return json.load(handle)
+        except FileNotFoundError:
+            return {"ticker": ticker, "charts": {}}
+
+    def __save_manifest(self, ticker, manifest):
+        """ Private function used to replace the manifest of a ticker in one step. """
+
+        path = self.__manifest_path(ticker)
+        with open(path + ".part", "w") as handle:
+            json.dump(manifest, handle, indent=2)
+        os.replace(path + ".part", path)
+
+    def __manifest_path(self, ticker):
+        return os.path.join(self._manifest_dir, f"{ticker}.json")
+
+    def __ticker_lock(self, ticker):
+        """ Private function used to return the lock of the manifest of a ticker. """
+
+        with self._lock:
+            return self._locks.setdefault(ticker, threading.Lock())
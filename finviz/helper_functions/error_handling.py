@@ -15,6 +15,20 @@ class InvalidTableType(Exception):
         super(InvalidTableType, self).__init__(f"Invalid table type called: {arg}")
 
 
+class InvalidColumn(Exception):
+    """ Raise when the given column is not in the catalog of Custom table columns. """
+
+    def __init__(self, arg):
+        super(InvalidColumn, self).__init__(f"Invalid column called: {arg}")
+
+
+class InvalidShardCategory(Exception):
+    """ Raise when the given filter category does not split a screener into disjoint shards. """
+
+    def __init__(self, arg):
+        super(InvalidShardCategory, self).__init__(f"Invalid shard category called: {arg}")
+
+
 class TooManyRequests(Exception):
     """ Raise when HTTP request fails because too many requests were sent to FinViz at once. """
 
@@ -0,0 +1,120 @@
+import itertools
+from collections.abc import Sequence
+
+ROWS_PER_PAGE = 20
+
+
+class LazyRows(Sequence):
+    """
+    Rows of a screener that are downloaded a 20-row page at a time, when they are first read.
+    Downloaded pages are kept, so every page is requested at most once.
+    """
+
+    def __init__(self, fetch_pages, total, first_page=None):
+        """
+        :param fetch_pages: function returning the rows of each of a list of 0-based page numbers
+        :type fetch_pages: Callable
+        :param total: number of rows of the screener
+        :type total: int
+        :param first_page: rows of the first page, already downloaded with the headers
+        :type first_page: list
+        """
+
+        self._fetch_pages = fetch_pages
+        self._total = total
+        self._pages = {}
+
+        if first_page is not None:
+            self._pages[0] = first_page
+
+    def __len__(self):
+        return self._total
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            positions = range(*position.indices(self._total))
+            self.fetch({number // ROWS_PER_PAGE for number in positions})
+            return [self.__row(number) for number in positions]
+
+        if position < 0:
+            position += self._total
+        if not 0 <= position < self._total:
+            raise IndexError("screener row index out of range")
+
+        self.fetch([position // ROWS_PER_PAGE])
+        return self.__row(position)
+
+    def __iter__(self):
+        for page_number in range(self.page_count):
+            self.fetch([page_number])
+            start = page_number * ROWS_PER_PAGE
+            yield from self._pages[page_number][: self._total - start]
+
+    def __repr__(self):
+        return f"<LazyRows: {self._total} rows, {len(self._pages)}/{self.page_count} pages downloaded>"
+
+    @property
+    def page_count(self):
+        """ Returns the number of pages covering the rows. """
+
+        return -(-self._total // ROWS_PER_PAGE)
+
+    def fetch(self, page_numbers=None):
+        """
+        Downloads the pages that are not downloaded yet, all of them if no page numbers are given.
+
+        :param page_numbers: 0-based page numbers
+        :type page_numbers: list
+        """
+
+        if page_numbers is None:
+            page_numbers = range(self.page_count)
+
+        missing = sorted(set(page_numbers) - self._pages.keys())
+        if missing:
+            self._pages.update(zip(missing, self._fetch_pages(missing)))
+
+    def __row(self, position):
+        return self._pages[position // ROWS_PER_PAGE][position % ROWS_PER_PAGE]
+
+
+class ChainedRows(Sequence):
+    """
+    Rows of several screeners read one after the other, eg.: the lazy rows of each batch of
+    a merged screener, cut at a row limit. The rows of each screener are only read when needed.
+    """
+
+    def __init__(self, parts, limit=None):
+        """
+        :param parts: rows of each screener
+        :type parts: list
+        :param limit: number of rows to read at most
+        :type limit: int
+        """
+
+        self._parts = list(parts)
+        total = sum(len(part) for part in self._parts)
+        self._total = total if limit is None else min(limit, total)
+
+    def __len__(self):
+        return self._total
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[number] for number in range(*position.indices(self._total))]
+
+        if position < 0:
+            position += self._total
+        if not 0 <= position < self._total:
+            raise IndexError("screener row index out of range")
+
+        for part in self._parts:
+            if position < len(part):
+                return part[position]
+            position -= len(part)
+
+    def __iter__(self):
+        return itertools.islice(itertools.chain.from_iterable(self._parts), self._total)
+
+    def __repr__(self):
+        return f"<ChainedRows: {self._total} rows of {len(self._parts)} screeners>"
@@ -0,0 +1,200 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class QueryCache:
+    """
+    Results of screener queries, kept for a number of seconds and keyed by a canonical
+    form of the query so that the same screener asked differently is a hit. The least
+    recently used results are evicted past the maximum number of entries. With a path,
+    the results are also stored in a SQLite file that other processes can share.
+    """
+
+    def __init__(self, ttl=300, max_entries=256, path=None):
+        """
+        :param ttl: seconds a result is served from the cache
+        :type ttl: float
+        :param max_entries: maximum number of results kept
+        :type max_entries: int
+        :param path: SQLite file shared by processes, results are only kept in memory if None
+        :type path: str
+        """
+
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+
+        if path is not None:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS queries ("
+                "key TEXT PRIMARY KEY, result TEXT, stored_at REAL, accessed_at REAL)"
+            )
+            self._conn.commit()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def key(
+        table, filters, tickers, signal, custom, order, rows=None, base_url=None
+    ):
+        """
+        Returns the canonical form of a screener query. Filters and tickers are sorted
+        and deduplicated, custom columns keep their order as it is the order of the headers.
+        """
+
+        return json.dumps(
+            [
+                base_url,
+                table,
+                sorted(set(filters)),
+                sorted(set(tickers)),
+                signal,
+                list(custom),
+                order,
+                rows,
+            ]
+        )
+
+    def get(self, key):
+        """ Returns the result stored for a key if it is still fresh, or None. """
+
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, result = entry
+                if now - stored_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.__touch(key, now)
+                    return json.loads(result)
+                del self._entries[key]
+
+            if self._conn is None:
+                return None
+
+            row = self._conn.execute(
+                "SELECT result, stored_at FROM queries WHERE key = ? AND stored_at > ?",
+                (key, now - self.ttl),
+            ).fetchone()
+            if row is None:
+                return None
+
+            result, stored_at = row
+            self.__touch(key, now)
+            self.__remember(key, stored_at, result)
+
+        return json.loads(result)
+
+    def put(self, key, result):
+        """
+        Stores the result of a query.
+
+        :param result: JSON serializable result, eg.: the headers and rows of a screener
+        :type result: dict
+        """
+
+        now = time.time()
+        result = json.dumps(result)
+
+        with self._lock:
+            self.__remember(key, now, result)
+
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO queries VALUES (?, ?, ?, ?)",
+                    (key, result, now, now),
+                )
+                self._conn.execute(
+                    "DELETE FROM queries WHERE stored_at <= ? OR key NOT IN "
+                    "(SELECT key FROM queries ORDER BY accessed_at DESC LIMIT ?)",
+                    (now - self.ttl, self.max_entries),
+                )
+                self._conn.commit()
+
+    def __touch(self, key, now):
+        """ Marks a result as recently used in the SQLite file, for the LRU eviction of every process. """
+
+        if self._conn is not None:
+            self._conn.execute(
+                "UPDATE queries SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+
+    def __remember(self, key, stored_at, result):
+        """ Keeps a result in memory and evicts the least recently used ones. """
+
+        self._entries[key] = (stored_at, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard(self, key):
+        """ Deletes the result stored for a key, if any. """
+
+        with self._lock:
+            self._entries.pop(key, None)
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM queries WHERE key = ?", (key,))
+                self._conn.commit()
+
+    def clear(self):
+        """ Deletes every stored result. """
+
+        with self._lock:
+            self._entries.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM queries")
+                self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_cache = None
+
+
+def get_query_cache():
+    """ Returns the query cache in use, or None if it is disabled. """
+
+    return _cache
+
+
+def enable_query_cache(ttl=300, max_entries=256, path=None):
+    """
+    Enables the cache of screener results. Example usage:
+
+    enable_query_cache(ttl=60, path="finviz_cache/queries.sqlite3")  # shared by processes
+    """
+
+    global _cache
+
+    disable_query_cache()
+    _cache = QueryCache(ttl, max_entries, path)
+    return _cache
+
+
+def disable_query_cache():
+    """ Disables the query cache. The results stored in a SQLite file are kept on disk. """
+
+    global _cache
+
+    if _cache is not None:
+        _cache.close()
+    _cache = None
@@ -0,0 +1,192 @@
+import asyncio
+import threading
+import time
+
+from finviz.config import connection_settings
+
+
+class AdaptiveLimiter:
+    """
+    Paces asynchronous requests with a token bucket whose rate and concurrency window
+    follow an additive-increase/multiplicative-decrease (AIMD) policy.
+
+    Until the first throttled response (HTTP 429 or "Too many requests.") every healthy
+    response grows the window and the rate by a full step (slow start). Afterwards they grow
+    by one step per window of healthy responses, and every throttled response cuts both by
+    the decrease factor.
+
+    Every request to a host should go through the same limiter (see get_limiter), otherwise
+    each crawl paces itself as if it were alone.
+    """
+
+    def __init__(
+        self,
+        max_window=None,
+        initial_window=None,
+        rate=None,
+        max_rate=None,
+        min_rate=0.5,
+        increase=1.0,
+        decrease=0.5,
+    ):
+        """
+        :param max_window: maximum number of requests in flight
+        :type max_window: int
+        :param initial_window: number of requests in flight allowed at start
+        :type initial_window: int
+        :param rate: initial number of requests per second
+        :type rate: float
+        :param max_rate: upper bound of requests per second
+        :type max_rate: float
+        :param min_rate: lower bound of requests per second
+        :type min_rate: float
+        :param increase: window and rate growth per window of healthy responses
+        :type increase: float
+        :param decrease: factor applied to the window and rate on a throttled response
+        :type decrease: float
+        """
+
+        self.max_window = max_window or connection_settings["CONCURRENT_CONNECTIONS"]
+        self.window = float(
+            min(
+                initial_window or connection_settings["INITIAL_CONCURRENCY"],
+                self.max_window,
+            )
+        )
+        self.rate = float(rate or connection_settings["INITIAL_REQUEST_RATE"])
+        self.max_rate = float(max_rate or connection_settings["MAX_REQUEST_RATE"])
+        self.min_rate = min_rate
+        self.increase = increase
+        self.decrease = decrease
+
+        self.in_flight = 0
+        self._lock = threading.Lock()  # Shared by the event loops of every thread
+        self.completed = 0
+        self.throttled = 0
+        self._tokens = self.window
+        self._updated = time.monotonic()
+        self._last_decrease = 0.0
+        self._slow_start = True
+        self._started = None
+        self._finished = None
+
+    def __refill(self, now):
+        """ Adds the tokens accumulated since the last refill, capped at the window size. """
+
+        self._tokens = min(
+            max(self.window, 1.0), self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def try_acquire(self):
+        """
+        Takes a request slot if one is available.
+
+        :return: 0 if the slot was taken, otherwise the number of seconds to wait before retrying
+        :rtype: float
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            self.__refill(now)
+            return self.__take(now)
+
+    def __take(self, now):
+        """ Private function used to take a slot from the refilled bucket. """
+
+        if self.in_flight >= int(self.window):
+            return 1 / self.rate
+        if self._tokens < 1:
+            return (1 - self._tokens) / self.rate
+
+        self._tokens -= 1
+        self.in_flight += 1
+        if self._started is None:
+            self._started = now
+        return 0
+
+    async def acquire(self):
+        """
+        Waits until a request may be sent.
+
+        :return: the time the slot was taken, to be passed back to release()
+        :rtype: float
+        """
+
+        while True:
+            delay = self.try_acquire()
+            if delay == 0:
+                return time.monotonic()
+            await asyncio.sleep(delay)
+
+    def release(self, sent_at, throttled=False, failed=False):
+        """
+        Frees a request slot and adapts the window and rate to the response.
+
+        :param sent_at: value returned by acquire() for this request
+        :type sent_at: float
+        :param throttled: whether the server refused the request because of its rate
+        :type throttled: bool
+        :param failed: whether the request failed otherwise (eg. a network error), which frees the slot only
+        :type failed: bool
+        """
+
+        with self._lock:
+            self.__adapt(sent_at, throttled, failed)
+
+    def __adapt(self, sent_at, throttled, failed):
+        """ Private function used to free a slot and adapt the window and rate. """
+
+        self.in_flight -= 1
+        now = time.monotonic()
+
+        if failed:
+            return
+        if throttled:
+            self.throttled += 1
+            # Requests sent before the last decrease belong to the same congestion event
+            if sent_at >= self._last_decrease:
+                self._slow_start = False
+                self.window = max(1.0, self.window * self.decrease)
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self._tokens = 0.0
+                self._last_decrease = now
+        else:
+            self.completed += 1
+            self._finished = now
+            step = self.increase if self._slow_start else self.increase / self.window
+            self.window = min(float(self.max_window), self.window + step)
+            self.rate = min(self.max_rate, self.rate + step)
+
+    @property
+    def sustained_rate(self):
+        """
+        Returns the number of successful requests per second since the first request of the
+        limiter, idle time between crawls included. Connector.request_rate gives the rate of a run.
+        """
+
+        if self._started is None or self._finished is None:
+            return 0.0
+
+        elapsed = self._finished - self._started
+        return self.completed / elapsed if elapsed > 0 else float(self.completed)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(host):
+    """
+    Returns the limiter shared by every asynchronous request to a host, creating it on first use,
+    so that concurrent crawls (eg. the views, batches or shards of a screener) share one window.
+
+    :param host: network location of the requests eg.: 'finviz.com'
+    :type host: str
+    """
+
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = _limiters[host] = AdaptiveLimiter()
+        return limiter
@@ -1,21 +1,236 @@
 import asyncio
+import collections
+import contextlib
+import itertools
 import os
-from typing import Callable, Dict, List
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List
+from urllib.parse import urlsplit
 
 import aiohttp
 import requests
 import tenacity
 import urllib3
-from lxml import html
 from requests import Response
+from requests.adapters import HTTPAdapter
 from tqdm import tqdm
 from user_agent import generate_user_agent
 
 from finviz.config import connection_settings
-from finviz.helper_functions.error_handling import ConnectionTimeout
+from finviz.helper_functions.error_handling import (ConnectionTimeout,
+                                                    TooManyRequests)
+from finviz.helper_functions.rate_control import AdaptiveLimiter, get_limiter
+from finviz.helper_functions.response_cache import get_response_cache
+from finviz.helper_functions.scraper_functions import parse_html
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+FINVIZ_URL = "https://finviz.com"
+# Body FinViz answers throttled requests with, with status 200
+THROTTLED_BODY = b"Too many requests."
+
+
+def rebase_url(url, base_url=None):
+    """
+    Points a FinViz URL address to another base URL (eg. a stand-in server).
+    Uses the BASE_URL connection setting if no base URL is given.
+    """
+
+    base_url = (base_url or connection_settings["BASE_URL"]).rstrip("/")
+    if base_url == FINVIZ_URL or not url.startswith(FINVIZ_URL):
+        return url
+    return base_url + url[len(FINVIZ_URL) :]
+
+
+class HTTPClient:
+    """ Keeps HTTP connections alive and reuses them between requests. """
+
+    def __init__(self, pool_connections=None, pool_maxsize=None, pool_block=None):
+        """
+        :param pool_connections: number of per-host connection pools to keep
+        :type pool_connections: int
+        :param pool_maxsize: maximum number of connections kept open to a single host
+        :type pool_maxsize: int
+        :param pool_block: wait for a free connection when a host pool is exhausted
+        :type pool_block: bool
+        """
+
+        self.pid = os.getpid()
+        self.adapter = HTTPAdapter(
+            pool_connections=pool_connections
+            or connection_settings["POOL_CONNECTIONS"],
+            pool_maxsize=pool_maxsize or connection_settings["POOL_MAXSIZE"],
+            pool_block=connection_settings["POOL_BLOCK"]
+            if pool_block is None
+            else pool_block,
+        )
+        self.session = self.new_session()
+
+    def new_session(self):
+        """ Returns a session with its own cookies that shares the client's connection pool. """
+
+        session = requests.Session()
+        session.mount("https://", self.adapter)
+        session.mount("http://", self.adapter)
+        return session
+
+    def get(self, url, **kwargs):
+        """ Sends a GET HTTP request through the pooled session and the response cache. """
+
+        return cached_get(self.session, url, **kwargs)
+
+    def close(self):
+        """ Closes all pooled connections. """
+
+        self.session.close()
+        self.adapter.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """ Returns the process-wide HTTP client, creating it on first use. """
+
+    global _client
+
+    with _client_lock:
+        # Connections must not be shared with a forked child process
+        if _client is None or _client.pid != os.getpid():
+            _client = HTTPClient()
+        return _client
+
+
+def configure_client(**settings):
+    """
+    Updates the connection settings and replaces the process-wide HTTP client. Example usage:
+
+    configure_client(POOL_MAXSIZE=50, POOL_BLOCK=False)
+    """
+
+    global _client
+
+    connection_settings.update(settings)
+    with _client_lock:
+        if _client is not None and _client.pid == os.getpid():
+            _client.close()
+        _client = HTTPClient()
+        return _client
+
+
+def _cache_lookup(url, params=None):
+    """
+    Returns the response cache, the cache key and the stored entry of a request.
+    The cache is None if caching is disabled or the endpoint is not cached.
+    """
+
+    cache = get_response_cache()
+    if cache is None:
+        return None, None, None
+
+    key = cache.key(url, params)
+    if not cache.ttl(key):
+        return None, None, None
+
+    return cache, key, cache.lookup(key)
+
+
+async def _async_cache_lookup(url, params=None):
+    """
+    Private function used to run _cache_lookup in the default executor, so that the SQLite
+    read and the decompression of the body do not block the event loop.
+    """
+
+    if get_response_cache() is None:
+        return None, None, None
+    return await asyncio.get_running_loop().run_in_executor(
+        None, _cache_lookup, url, params
+    )
+
+
+def cached_get(session, url, params=None, headers=None, **kwargs) -> Response:
+    """
+    Sends a GET HTTP request through a session. When the response cache is enabled, fresh
+    responses are answered from it and stale ones are revalidated with the server.
+    """
+
+    url = rebase_url(url)
+    cache, key, entry = _cache_lookup(url, params)
+    if cache is None:
+        return session.get(url, params=params, headers=headers, **kwargs)
+
+    if entry is not None:
+        if cache.is_fresh(entry):
+            return entry.to_response()
+        headers = dict(headers or {}, **entry.conditional_headers())
+
+    response = session.get(url, params=params, headers=headers, **kwargs)
+
+    if response.status_code == 304 and entry is not None:
+        cache.revalidated(entry)
+        return entry.to_response()
+    if response.status_code == 200 and response.content != THROTTLED_BODY:
+        cache.store(
+            key,
+            response.url,
+            response.content,
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+            response.encoding or "utf-8",
+        )
+
+    return response
+
+
+async def async_cached_read(session, url, params=None, headers=None, lookup=None):
+    """
+    Sends an asynchronous GET HTTP request, answering from the response cache when it is enabled.
+    Raises for failed requests other than 429 (Too Many Requests). The cache is read and
+    written in the default executor.
+
+    :param lookup: result of a cache lookup of the request already done by the caller
+    :type lookup: tuple
+    :return: the status code, the body and the final url address
+    :rtype: tuple
+    """
+
+    url = rebase_url(url)
+    if lookup is None:
+        lookup = await _async_cache_lookup(url, params)
+    cache, key, entry = lookup
+    if entry is not None:
+        if cache.is_fresh(entry):
+            return 200, entry.body, entry.url
+        headers = dict(headers or {}, **entry.conditional_headers())
+
+    async with session.get(url, params=params or {}, headers=headers) as response:
+        body = await response.read()
+        if response.status != 429:
+            response.raise_for_status()
+
+    if cache is not None:
+        loop = asyncio.get_running_loop()
+        if response.status == 304 and entry is not None:
+            await loop.run_in_executor(None, cache.revalidated, entry)
+            return 200, entry.body, entry.url
+        if response.status == 200 and body != THROTTLED_BODY:
+            await loop.run_in_executor(
+                None,
+                cache.store,
+                key,
+                str(response.url),
+                body,
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+                response.get_encoding() if response.charset else "utf-8",
+            )
+
+    return response.status, body, str(response.url)
+
 
 def http_request_get(
     url, session=None, payload=None, parse=True, user_agent=generate_user_agent()
@@ -25,25 +240,21 @@ def http_request_get(
     if payload is None:
         payload = {}
 
+    if session is None:
+        session = get_client().session
+
     try:
-        if session:
-            content = session.get(
-                url,
-                params=payload,
-                verify=False,
-                headers={"User-Agent": user_agent},
-            )
-        else:
-            content = requests.get(
-                url,
-                params=payload,
-                verify=False,
-                headers={"User-Agent": user_agent},
-            )
+        content = cached_get(
+            session,
+            url,
+            params=payload,
+            verify=False,
+            headers={"User-Agent": user_agent},
+        )
 
         content.raise_for_status()  # Raise HTTPError for bad requests (4xx or 5xx)
         if parse:
-            return html.fromstring(content.text), content.url
+            return parse_html(content), content.url
         else:
             return content.text, content.url
     except (asyncio.TimeoutError, requests.exceptions.Timeout):
@@ -52,26 +263,288 @@ def http_request_get(
 
 @tenacity.retry(wait=tenacity.wait_exponential())
 def finviz_request(url: str, user_agent: str) -> Response:
-    response = requests.get(url, headers={"User-Agent": user_agent})
+    response = get_client().get(url, headers={"User-Agent": user_agent})
     if response.text == "Too many requests.":
         raise Exception("Too many requests.")
     return response
 
 
+def stop_after_throttle_retries(retry_state) -> bool:
+    """ Stops retrying after THROTTLE_RETRIES attempts, read from the settings on every call. """
+
+    return retry_state.attempt_number >= connection_settings["THROTTLE_RETRIES"]
+
+
+def client_session(user_agent: str) -> aiohttp.ClientSession:
+    """ Returns a new asynchronous session configured with the connection settings. """
+
+    conn = aiohttp.TCPConnector(
+        limit_per_host=connection_settings["CONCURRENT_CONNECTIONS"]
+    )
+    timeout = aiohttp.ClientTimeout(total=connection_settings["CONNECTION_TIMEOUT"])
+
+    return aiohttp.ClientSession(
+        connector=conn, timeout=timeout, headers={"User-Agent": user_agent}
+    )
+
+
+@contextlib.asynccontextmanager
+async def session_scope(session=None, user_agent=generate_user_agent()):
+    """ Yields the given asynchronous session, or a new one that is closed on exit. """
+
+    if session is not None:
+        yield session
+        return
+
+    async with client_session(user_agent) as new_session:
+        yield new_session
+
+
+def run_sync(coroutine):
+    """
+    Runs a coroutine to completion from synchronous code and returns its result.
+    If an event loop is already running in this thread (eg. Jupyter), it runs in a background one.
+    """
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+@tenacity.retry(
+    wait=tenacity.wait_exponential(),
+    retry=tenacity.retry_if_exception_type(TooManyRequests),
+    stop=stop_after_throttle_retries,
+    reraise=True,
+)
+async def async_http_request_get(
+    url, session, payload=None, parse=True, user_agent=generate_user_agent()
+):
+    """ Sends an asynchronous GET HTTP request and returns its HTML content and full url address. """
+
+    try:
+        status, page_html, final_url = await async_cached_read(
+            session, url, params=payload, headers={"User-Agent": user_agent}
+        )
+    except asyncio.TimeoutError:
+        raise ConnectionTimeout(url)
+
+    if status == 429 or page_html == THROTTLED_BODY:
+        raise TooManyRequests(url)
+
+    if parse:
+        return parse_html(page_html), final_url
+    else:
+        return page_html.decode("utf-8"), final_url
+
+
+_parse_pool = None
+_parse_pool_key = None
+_parse_pool_lock = threading.Lock()
+
+
+def get_parse_pool(workers):
+    """
+    Returns the pool of processes parsing pages, shared by every crawl of the process.
+    The pool is replaced when the number of workers changes or after a fork.
+    """
+
+    global _parse_pool, _parse_pool_key
+
+    with _parse_pool_lock:
+        if _parse_pool_key != (os.getpid(), workers):
+            if _parse_pool is not None and _parse_pool_key[0] == os.getpid():
+                _parse_pool.shutdown(wait=False)
+            _parse_pool = ProcessPoolExecutor(max_workers=workers)
+            _parse_pool_key = (os.getpid(), workers)
+        return _parse_pool
+
+
+def parse_page(scrape_func: Callable, page_content: bytes, args, kwargs):
+    """ Runs a scrape function over the raw body of a page, in a worker process. """
+
+    return scrape_func(page_content, *args, **kwargs)
+
+
+def iter_data_scrape(
+    scrape_func: Callable,
+    urls: List[str],
+    user_agent: str,
+    *args,
+    parse_workers: int = 0,
+    **kwargs,
+) -> Iterator[Dict]:
+    """
+    Requests the URLs one by one and yields the scraped data of each page.
+    With parse_workers, the pages are parsed by a pool of processes while the next ones download.
+    """
+
+    if not parse_workers:
+        for url in tqdm(urls, disable="DISABLE_TQDM" in os.environ):
+            response = finviz_request(url, user_agent)
+            kwargs["URL"] = url
+            yield scrape_func(response, *args, **kwargs)
+        return
+
+    pool = get_parse_pool(parse_workers)
+    parsing = collections.deque()
+    for url in tqdm(urls, disable="DISABLE_TQDM" in os.environ):
+        response = finviz_request(url, user_agent)
+        parsing.append(
+            pool.submit(
+                parse_page, scrape_func, response.content, args, dict(kwargs, URL=url)
+            )
+        )
+        while parsing and parsing[0].done():
+            yield parsing.popleft().result()
+
+    while parsing:
+        yield parsing.popleft().result()
+
+
+def iter_bounded_map(function: Callable, items, workers: int) -> Iterator:
+    """
+    Yields the result of the function over every item in order, from a pool of threads.
+    At most twice as many items as workers are submitted ahead of the consumer, and
+    closing the iterator cancels the submitted items that have not started yet.
+    """
+
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = collections.deque(
+            executor.submit(function, item) for item in itertools.islice(items, 2 * workers)
+        )
+        try:
+            while pending:
+                result = pending.popleft().result()
+                for item in itertools.islice(items, 1):
+                    pending.append(executor.submit(function, item))
+                yield result
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def _iter_progress(results: Iterator, total: int) -> Iterator:
+    """ Private function used to show the progress of results, closing them if the consumer stops. """
+
+    try:
+        yield from tqdm(results, total=total, disable="DISABLE_TQDM" in os.environ)
+    finally:
+        results.close()
+
+
 def sequential_data_scrape(
     scrape_func: Callable, urls: List[str], user_agent: str, *args, **kwargs
 ) -> List[Dict]:
-    data = []
+    return list(iter_data_scrape(scrape_func, urls, user_agent, *args, **kwargs))
 
-    for url in tqdm(urls, disable="DISABLE_TQDM" in os.environ):
-        try:
-            response = finviz_request(url, user_agent)
-            kwargs["URL"] = url
-            data.append(scrape_func(response, *args, **kwargs))
-        except Exception as exc:
-            raise exc
 
-    return data
+def iter_threaded_data_scrape(
+    scrape_func: Callable,
+    urls: List[str],
+    user_agent: str,
+    *args,
+    parse_workers: int = 0,
+    **kwargs,
+) -> Iterator[Dict]:
+    """
+    Requests the URLs from a pool of threads and yields the scraped data of each page in order.
+    With parse_workers, the threads hand the pages over to a pool of processes to parse.
+    Only a few pages are requested ahead of the consumer (see iter_bounded_map).
+    """
+
+    pool = get_parse_pool(parse_workers) if parse_workers else None
+
+    def scrape_url(url):
+        response = finviz_request(url, user_agent)
+        if pool is not None:
+            return pool.submit(
+                parse_page, scrape_func, response.content, args, dict(kwargs, URL=url)
+            ).result()
+        return scrape_func(response, *args, URL=url, **kwargs)
+
+    yield from _iter_progress(
+        iter_bounded_map(scrape_url, urls, connection_settings["THREAD_WORKERS"]),
+        len(urls),
+    )
+
+
+def threaded_data_scrape(
+    scrape_func: Callable, urls: List[str], user_agent: str, *args, **kwargs
+) -> List[Dict]:
+    return list(
+        iter_threaded_data_scrape(scrape_func, urls, user_agent, *args, **kwargs)
+    )
+
+
+@tenacity.retry(
+    retry=tenacity.retry_if_exception_type(TooManyRequests),
+    wait=tenacity.wait_exponential(max=30),
+    stop=stop_after_throttle_retries,
+    reraise=True,
+)
+def stream_scrape(scrape_func: Callable, url: str, user_agent: str, *args, **kwargs):
+    """
+    Sends a GET HTTP request through the pooled session and hands the response over to the
+    scrape function before its body is read, so that it can stream it eg.: into a file.
+    """
+
+    with get_client().session.get(
+        rebase_url(url), headers={"User-Agent": user_agent}, stream=True, verify=False
+    ) as response:
+        if response.status_code == 429:
+            raise TooManyRequests(url)
+        response.raise_for_status()
+        if is_streamed_throttle(response):
+            raise TooManyRequests(url)
+        return scrape_func(response, *args, URL=url, **kwargs)
+
+
+def is_streamed_throttle(response: Response) -> bool:
+    """
+    Checks if a streamed 200 response is the text FinViz sends instead of a throttled page.
+    Only bodies that can be that text are read: the ones of its length, or text bodies of
+    unknown length. The scrape function then streams them from memory.
+    """
+
+    length = response.headers.get("Content-Length")
+    if length is None or response.headers.get("Content-Encoding"):
+        content_type = response.headers.get("Content-Type", "")
+        if content_type.startswith("image/"):
+            return False
+    elif int(length) != len(THROTTLED_BODY):
+        return False
+
+    return response.content == THROTTLED_BODY
+
+
+def iter_streamed_data_scrape(
+    scrape_func: Callable,
+    urls: List[str],
+    user_agent: str,
+    *args,
+    workers: int = None,
+    **kwargs,
+) -> Iterator[Dict]:
+    """
+    Streams the responses of the URLs from a pool of threads, at most workers at once
+    (THREAD_WORKERS by default), and yields the scraped data of each one in order.
+    Only a few responses are requested ahead of the consumer (see iter_bounded_map).
+    """
+
+    yield from _iter_progress(
+        iter_bounded_map(
+            lambda url: stream_scrape(scrape_func, url, user_agent, *args, **kwargs),
+            urls,
+            workers or connection_settings["THREAD_WORKERS"],
+        ),
+        len(urls),
+    )
 
 
 class Connector:
@@ -83,61 +556,246 @@ class Connector:
         urls: List[str],
         user_agent: str,
         *args,
-        css_select: bool = False
+        css_select: bool = False,
+        base_url: str = None,
+        parse_workers: int = 0,
+        limiter: AdaptiveLimiter = None
     ):
         self.scrape_function = scrape_function
-        self.urls = urls
+        self.urls = [rebase_url(url, base_url) for url in urls]
         self.user_agent = user_agent
         self.arguments = args
         self.css_select = css_select
+        self.parse_workers = parse_workers  # Processes parsing off the event loop, 0 to parse on it
+        # Paces the requests, shared by every Connector to the same host if omitted
+        self.limiter = limiter
         self.data = []
+        # Successful requests of the last run and when it sent its first and got its last one
+        self._completed = 0
+        self._started = None
+        self._finished = None
+
+    @property
+    def request_rate(self):
+        """
+        Returns the number of successful requests per second the last run settled on,
+        without the requests of other crawls sharing the limiter.
+        """
+
+        if self._started is None or self._finished is None:
+            return 0.0
+
+        elapsed = self._finished - self._started
+        return self._completed / elapsed if elapsed > 0 else float(self._completed)
 
     async def __http_request__async(
         self,
         url: str,
         session: aiohttp.ClientSession,
+        lookup: tuple = None,
     ):
-        """ Sends asynchronous http request to URL address and scrapes the webpage. """
+        """
+        Sends asynchronous http request to URL address.
+        Returns the page content, or None if FinViz throttled the request.
+        """
 
         try:
-            async with session.get(
-                url, headers={"User-Agent": self.user_agent}
-            ) as response:
-                page_html = await response.read()
-
-                if page_html.decode("utf-8") == "Too many requests.":
-                    raise Exception("Too many requests.")
-
-                if self.css_select:
-                    return self.scrape_function(
-                        html.fromstring(page_html), *self.arguments
-                    )
-                return self.scrape_function(page_html, *self.arguments)
+            status, page_html, _ = await async_cached_read(
+                session, url, headers={"User-Agent": self.user_agent}, lookup=lookup
+            )
         except (asyncio.TimeoutError, requests.exceptions.Timeout):
             raise ConnectionTimeout(url)
 
-    async def __async_scraper(self):
-        """ Adds a URL's into a list of tasks and requests their response asynchronously. """
+        if status == 429 or page_html == THROTTLED_BODY:
+            return None
+        return page_html
 
-        async_tasks = []
-        conn = aiohttp.TCPConnector(
-            limit_per_host=connection_settings["CONCURRENT_CONNECTIONS"]
+    async def __scrape(self, page_html, url):
+        """ Runs the scrape function over the page content, in the parse pool if there is one. """
+
+        if self.parse_workers:
+            return await asyncio.get_running_loop().run_in_executor(
+                get_parse_pool(self.parse_workers),
+                parse_page,
+                self.scrape_function,
+                page_html,
+                self.arguments,
+                {"URL": url},
+            )
+
+        if self.css_select:
+            page_html = parse_html(page_html)
+        return self.scrape_function(page_html, *self.arguments, URL=url)
+
+    async def __worker(self, pending, session, scraped):
+        """ Requests queued URLs as the limiter allows and requeues the throttled ones. """
+
+        while True:
+            index, url, attempt = await pending.get()
+
+            # Fresh cached pages do not count against the request rate
+            lookup = await _async_cache_lookup(url)
+            cache, _, entry = lookup
+            if entry is not None and cache.is_fresh(entry):
+                page_html = entry.body
+            else:
+                sent_at = await self.limiter.acquire()
+                if self._started is None:
+                    self._started = sent_at
+                try:
+                    page_html = await self.__http_request__async(url, session, lookup)
+                except BaseException:
+                    # Failed requests are not throttles, they leave the window as it is
+                    self.limiter.release(sent_at, failed=True)
+                    raise
+                self.limiter.release(sent_at, throttled=page_html is None)
+                if page_html is not None:
+                    self._completed += 1
+                    self._finished = time.monotonic()
+
+            if page_html is not None:
+                await scraped.put((index, await self.__scrape(page_html, url)))
+            elif attempt < connection_settings["THROTTLE_RETRIES"]:
+                pending.put_nowait((index, url, attempt + 1))
+            else:
+                raise TooManyRequests(url)
+
+    @staticmethod
+    async def __next_result(scraped, workers):
+        """ Waits for the next scraped page. Re-raises the error of a failed worker. """
+
+        getter = asyncio.ensure_future(scraped.get())
+        done, _ = await asyncio.wait(
+            [getter, *workers], return_when=asyncio.FIRST_COMPLETED
         )
-        timeout = aiohttp.ClientTimeout(total=connection_settings["CONNECTION_TIMEOUT"])
 
-        async with aiohttp.ClientSession(
-            connector=conn, timeout=timeout, headers={"User-Agent": self.user_agent}
-        ) as session:
-            for url in self.urls:
-                async_tasks.append(self.__http_request__async(url, session))
+        if getter in done:
+            return getter.result()
+
+        # A worker only stops when it has failed
+        getter.cancel()
+        for task in done:
+            task.result()
 
-            self.data = await asyncio.gather(*async_tasks)
+    async def stream(self, ordered: bool = True, session=None):
+        """
+        Yields the scraped data of every URL as soon as its response arrives.
+
+        :param ordered: yield in the order of the URLs instead of the order of completion
+        :type ordered: bool
+        :param session: asynchronous session to send the requests with, a new one is used if omitted
+        :type session: aiohttp.ClientSession
+        """
+
+        if self.limiter is None:
+            self.limiter = get_limiter(urlsplit(self.urls[0]).netloc if self.urls else "")
+        self._completed, self._started, self._finished = 0, None, None
+        pending = asyncio.Queue()
+        for index, url in enumerate(self.urls):
+            pending.put_nowait((index, url, 0))
+        # Bounded so that workers wait for a slow consumer instead of piling up pages
+        scraped = asyncio.Queue(maxsize=self.limiter.max_window)
+
+        async with session_scope(session, self.user_agent) as session:
+            workers = [
+                asyncio.ensure_future(self.__worker(pending, session, scraped))
+                for _ in range(min(self.limiter.max_window, len(self.urls)))
+            ]
+
+            try:
+                buffered = {}
+                next_index = 0
+                for _ in range(len(self.urls)):
+                    index, data = await self.__next_result(scraped, workers)
+
+                    if not ordered:
+                        yield data
+                        continue
+
+                    buffered[index] = data
+                    while next_index in buffered:
+                        yield buffered.pop(next_index)
+                        next_index += 1
+            finally:
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+
+    def iter_results(self, ordered: bool = True):
+        """
+        Yields the scraped data of every URL while the requests keep running in a
+        background event loop.
+
+        :param ordered: yield in the order of the URLs instead of the order of completion
+        :type ordered: bool
+        """
+
+        results = queue.Queue(maxsize=connection_settings["CONCURRENT_CONNECTIONS"])
+        stop = threading.Event()
+
+        async def pump():
+            loop = asyncio.get_event_loop()
+            stream = self.stream(ordered)
+            try:
+                async for data in stream:
+                    await loop.run_in_executor(None, results.put, (True, data))
+                    if stop.is_set():
+                        break
+                else:
+                    await loop.run_in_executor(None, results.put, (False, None))
+            except Exception as exc:
+                await loop.run_in_executor(None, results.put, (False, exc))
+            finally:
+                await stream.aclose()
+
+        def run_pump():
+            loop = asyncio.SelectorEventLoop()
+            try:
+                loop.run_until_complete(pump())
+            finally:
+                loop.close()
+
+        threading.Thread(target=run_pump, daemon=True).start()
+
+        try:
+            while True:
+                has_data, data = results.get()
+                if not has_data:
+                    if data is not None:
+                        raise data
+                    return
+                yield data
+        finally:
+            stop.set()
+            # Unblock the background loop if it is waiting for room in the queue
+            try:
+                results.get_nowait()
+            except queue.Empty:
+                pass
+
+    async def run_async(self, session=None):
+        """
+        Requests the URL's asynchronously inside the running event loop and returns the
+        scraped data in order.
+
+        :param session: asynchronous session to send the requests with, a new one is used if omitted
+        :type session: aiohttp.ClientSession
+        """
+
+        self.data = [data async for data in self.stream(session=session)]
+        return self.data
 
     def run_connector(self):
         """ Starts the asynchronous loop and returns the scraped data. """
 
-        asyncio.set_event_loop(asyncio.SelectorEventLoop())
-        loop = asyncio.get_event_loop()
-        loop.run_until_complete(self.__async_scraper())
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.set_event_loop(asyncio.SelectorEventLoop())
+            loop = asyncio.get_event_loop()
+            loop.run_until_complete(self.run_async())
+        else:
+            # A loop is already running in this thread (eg. Jupyter), use a background one
+            self.data = list(self.iter_results())
 
         return self.data
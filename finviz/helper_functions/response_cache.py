@@ -0,0 +1,276 @@
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+
+# Seconds a cached response is served without asking the server again, per endpoint
+DEFAULT_TTLS = {
+    "quote": 15 * 60,
+    "screener": 5 * 60,
+    "news": 5 * 60,
+    "filters": 24 * 60 * 60,
+}
+
+
+class CachedResponse:
+    """ A response body stored in the cache along with its validators. """
+
+    def __init__(self, key, url, body, etag, last_modified, encoding, stored_at):
+        self.key = key
+        self.url = url
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.encoding = encoding
+        self.stored_at = stored_at
+
+    def conditional_headers(self):
+        """ Returns the headers that ask the server whether the stored body is still valid. """
+
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_response(self):
+        """ Returns the stored body as a requests.Response. """
+
+        response = requests.Response()
+        response._content = self.body
+        response.status_code = 200
+        response.url = self.url
+        response.encoding = self.encoding
+        return response
+
+
+class ResponseCache:
+    """
+    Persistent cache of FinViz responses stored in a SQLite file in WAL mode.
+    Bodies are compressed and the least recently used entries are evicted
+    once the cache grows past its maximum size. Reads do not write to the file:
+    their access times are kept in memory and written with the next store.
+    The total size is kept in the file by triggers, so that every process sharing
+    it evicts by the same size without summing the bodies again.
+    """
+
+    def __init__(self, path, max_size=256 * 1024 * 1024, ttls=None):
+        """
+        :param path: SQLite file the responses are stored in
+        :type path: str
+        :param max_size: maximum size of the compressed bodies in bytes
+        :type max_size: int
+        :param ttls: seconds each endpoint ('quote', 'screener', 'news', 'filters') stays fresh
+        :type ttls: dict
+        """
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.max_size = max_size
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self._lock = threading.Lock()
+        self._accessed = {}  # Access times of the reads since the last write, by key
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, url TEXT, body BLOB, etag TEXT, last_modified TEXT, "
+                "encoding TEXT, stored_at REAL, accessed_at REAL, size INTEGER)"
+            )
+            # Total size of the bodies, summed once for files of older versions
+            self._conn.execute("CREATE TABLE IF NOT EXISTS cache_size (total INTEGER)")
+            self._conn.execute(
+                "INSERT INTO cache_size SELECT COALESCE(SUM(size), 0) FROM responses "
+                "WHERE NOT EXISTS (SELECT 1 FROM cache_size)"
+            )
+            self._conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS responses_inserted AFTER INSERT ON responses "
+                "BEGIN UPDATE cache_size SET total = total + NEW.size; END"
+            )
+            self._conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS responses_deleted AFTER DELETE ON responses "
+                "BEGIN UPDATE cache_size SET total = total - OLD.size; END"
+            )
+
+    @property
+    def size(self):
+        """ Returns the total size of the compressed bodies, stored by every process. """
+
+        (total,) = self._conn.execute("SELECT total FROM cache_size").fetchone()
+        return total
+
+    @staticmethod
+    def key(url, params=None):
+        """ Returns the URL with the query parameters merged, sorted and stripped of empty values. """
+
+        parts = urlsplit(url)
+        query = parse_qsl(parts.query) + list((params or {}).items())
+        query = sorted((k, str(v)) for k, v in query if v not in (None, ""))
+
+        return urlunsplit(
+            (
+                parts.scheme.lower(),
+                parts.netloc.lower(),
+                parts.path,
+                urlencode(query),
+                "",
+            )
+        )
+
+    def ttl(self, key):
+        """ Returns how many seconds the response of a key stays fresh, 0 if it is not cached. """
+
+        parts = urlsplit(key)
+        endpoint = parts.path.rsplit("/", 1)[-1]
+
+        if endpoint == "screener.ashx" and "ft=" in parts.query:
+            return self.ttls["filters"]
+        if endpoint.endswith(".ashx"):
+            return self.ttls.get(endpoint[: -len(".ashx")], 0)
+        return 0
+
+    def lookup(self, key):
+        """ Returns the stored response of a key, fresh or not, or None. """
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, body, etag, last_modified, encoding, stored_at "
+                "FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+
+            self._accessed[key] = time.time()
+
+        url, body, etag, last_modified, encoding, stored_at = row
+        return CachedResponse(
+            key, url, zlib.decompress(body), etag, last_modified, encoding, stored_at
+        )
+
+    def is_fresh(self, entry):
+        """ Checks if a stored response can be served without asking the server. """
+
+        return time.time() - entry.stored_at < self.ttl(entry.key)
+
+    def store(self, key, url, body, etag=None, last_modified=None, encoding="utf-8"):
+        """ Stores a response body and evicts old entries if the cache is full. """
+
+        compressed = zlib.compress(body)
+        now = time.time()
+
+        with self._lock:
+            self.__flush_accessed()
+            # Deleted instead of replaced, so that the size triggers see the old body
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._conn.execute(
+                "INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    url,
+                    compressed,
+                    etag,
+                    last_modified,
+                    encoding,
+                    now,
+                    now,
+                    len(compressed),
+                ),
+            )
+            self.__evict()
+            self._conn.commit()
+
+    def revalidated(self, entry):
+        """ Marks a stored response as fresh again after the server answered 304 Not Modified. """
+
+        entry.stored_at = time.time()
+        with self._lock:
+            self._accessed.pop(entry.key, None)
+            self._conn.execute(
+                "UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?",
+                (entry.stored_at, entry.stored_at, entry.key),
+            )
+            self._conn.commit()
+
+    def __flush_accessed(self):
+        """ Private function used to write the access times of the reads since the last write. """
+
+        if self._accessed:
+            self._conn.executemany(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._accessed.items()],
+            )
+            self._accessed.clear()
+
+    def __evict(self):
+        """ Deletes the least recently used entries until the cache fits its maximum size. """
+
+        # Read from the file, as other processes may have stored responses too
+        size = self.size
+        if size <= self.max_size:
+            return
+
+        for key, entry_size in self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at"
+        ).fetchall():
+            if size <= self.max_size:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            size -= entry_size
+
+    def clear(self):
+        """ Deletes every stored response. """
+
+        with self._lock:
+            self._accessed.clear()
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self.__flush_accessed()
+            self._conn.commit()
+            self._conn.close()
+
+
+_cache = None
+
+
+def get_response_cache():
+    """ Returns the response cache in use, or None if caching is disabled. """
+
+    return _cache
+
+
+def enable_response_cache(path="finviz_cache/responses.sqlite3", **kwargs):
+    """
+    Enables the persistent response cache for all FinViz requests. Example usage:
+
+    enable_response_cache("cache.sqlite3", max_size=512 * 1024 * 1024, ttls={"quote": 3600})
+    """
+
+    global _cache
+
+    disable_response_cache()
+    _cache = ResponseCache(path, **kwargs)
+    return _cache
+
+
+def disable_response_cache():
+    """ Disables the response cache. The stored responses are kept on disk. """
+
+    global _cache
+
+    if _cache is not None:
+        _cache.close()
+    _cache = None
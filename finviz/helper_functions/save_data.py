@@ -1,8 +1,14 @@
 import csv
+import datetime
+import gzip
 import io
+import itertools
+import json
 import re
 import sqlite3
 
+from finviz.helper_functions.value_parsing import parse_column
+
 
 def create_connection(sqlite_file):
     """ Creates a database connection. """
@@ -11,10 +17,9 @@ def create_connection(sqlite_file):
         conn = sqlite3.connect(sqlite_file)
         return conn
     except sqlite3.Error as error:
-        raise (
-            "An error has occurred while connecting to the database: ",
-            error.args[0],
-        )
+        raise sqlite3.Error(
+            f"An error has occurred while connecting to the database: {error.args[0]}"
+        ) from error
 
 
 def __write_csv_to_stream(stream, headers, data):
@@ -38,41 +43,242 @@ def export_to_csv(headers, data, filename=None, mode="w", newline=""):
     return stream.getvalue()
 
 
-def export_to_db(headers, data, filename):
-    """ Exports the generated table into a SQLite database into a file."""
+class ExportSink:
+    """
+    File the rows of a screener are appended to as they are downloaded, in CSV or JSON Lines
+    format, gzip compressed if the file name ends with .gz, eg.: 'stocks.csv.gz'. The file is
+    created on the first write and flushed every flush_rows rows, so that the rows written
+    so far survive a crash. Example usage:
 
-    field_list = ""
-    table_name = "screener_results"  # name of the table to be created
-    conn = create_connection(filename)
-    c = conn.cursor()
+    with ExportSink("stocks.jsonl.gz") as sink:
+        stock_list = Screener(filters=['exch_nasd'], sink=sink)
+    """
+
+    def __init__(self, filename, headers=None, flush_rows=500):
+        """
+        :param filename: file path ending with .csv, .jsonl, .csv.gz or .jsonl.gz
+        :type filename: str
+        :param headers: CSV columns, the headers of the first rows written if omitted
+        :type headers: list
+        :param flush_rows: number of rows written between two flushes
+        :type flush_rows: int
+        """
+
+        name = filename[:-3] if filename.endswith(".gz") else filename
+        if not name.endswith((".csv", ".jsonl")):
+            raise ValueError(f"Unsupported export file: {filename}")
+
+        self.filename = filename
+        self.headers = headers
+        self._headers = headers
+        self.flush_rows = flush_rows
+        self.rows = 0
+
+        self._compressed = filename.endswith(".gz")
+        self._json = name.endswith(".jsonl")
+        self._file = None
+        self._writer = None
+        self._unflushed = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, rows, headers=None):
+        """
+        Appends rows to the file.
+
+        :param rows: rows as dictionaries
+        :type rows: list
+        :param headers: headers of the rows, the CSV columns if they are the first rows written
+        :type headers: list
+        """
+
+        if self._file is None:
+            self.__open(headers)
+
+        count = 0
+        for row in rows:
+            if self._json:
+                row = row if isinstance(row, dict) else dict(row)
+                self._file.write(json.dumps(row) + "\n")
+            else:
+                self._writer.writerow(row)
+            count += 1
+
+        self.rows += count
+        self._unflushed += count
+        if self._unflushed >= self.flush_rows:
+            self.flush()
+
+    def __open(self, headers):
+        """
+        Private function used to create the file, with the CSV header, or to reopen it
+        for appending if it was closed.
+        """
+
+        created = self._writer is not None or self.rows > 0
+        mode = "a" if created else "w"
+
+        if self._compressed:
+            self._file = gzip.open(self.filename, mode + "t", newline="")
+        else:
+            self._file = open(self.filename, mode, newline="")
+
+        if not self._json:
+            if not created:
+                self.headers = list(self.headers or headers or [])
+            self._writer = csv.DictWriter(
+                self._file, self.headers, extrasaction="ignore"
+            )
+            if not created:
+                self._writer.writeheader()
+
+    def flush(self):
+        """ Writes the buffered rows to the file, readable even if it is compressed. """
 
+        if self._file is not None:
+            self._file.flush()
+        self._unflushed = 0
+
+    def truncate(self):
+        """ Empties the file, the next rows written start it over with the CSV header. """
+
+        if self._file is None and self._writer is None and self.rows == 0:
+            return
+
+        self.close()
+        open(self.filename, "w").close()
+        self.headers = self._headers
+        self.rows = 0
+        self._writer = None
+        self._unflushed = 0
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def __column_name(field):
+    """ Returns a header as an SQL column name, eg.: '52W High' -> 'High52W'. """
+
+    field_cleaned = re.sub(r"[^\w\s]", "", field)
+    field_cleaned = field_cleaned.replace(" ", "")
+    field_cleaned = field_cleaned.replace("50DHigh", "High50D")
+    field_cleaned = field_cleaned.replace("50DLow", "Low50D")
+    field_cleaned = field_cleaned.replace("52WHigh", "High52W")
+    field_cleaned = field_cleaned.replace("52WLow", "Low52W")
+    return field_cleaned
+
+
+def __typed_columns(headers, data):
+    """
+    Returns the values of each column and its SQL type: REAL, with the values parsed, if every
+    value but the missing ones ('-') is a number, and TEXT otherwise. The row numbers ('No.')
+    are stored as INTEGER.
+    """
+
+    columns, column_types = [], []
     for field in headers:
-        field_cleaned = re.sub(r"[^\w\s]", "", field)
-        field_cleaned = field_cleaned.replace(" ", "")
-        field_cleaned = field_cleaned.replace("50DHigh", "High50D")
-        field_cleaned = field_cleaned.replace("50DLow", "Low50D")
-        field_cleaned = field_cleaned.replace("52WHigh", "High52W")
-        field_cleaned = field_cleaned.replace("52WLow", "Low52W")
-        field_list += field_cleaned + " TEXT, "
+        values = [row.get(field) for row in data]
+        numbers = parse_column(values)
+
+        if field == "No." and numbers is not None:
+            columns.append(
+                [None if number is None else int(number) for number in numbers]
+            )
+            column_types.append("INTEGER")
+        elif numbers is None:
+            columns.append(values)
+            column_types.append("TEXT")
+        else:
+            columns.append(numbers)
+            column_types.append("REAL")
 
-    c.execute(f"CREATE TABLE IF NOT EXISTS {table_name} ({field_list[:-2]});")
+    return columns, column_types
 
-    inserts = ""
-    for row in data:
 
-        insert_fields = "("
-        for field, value in row.items():
+def export_to_db(
+    headers,
+    data,
+    filename,
+    mode="append",
+    snapshot_date=None,
+    batch_size=1000,
+    table_name="screener_results",
+):
+    """
+    Exports the generated table into a SQLite database into a file. Columns whose values are
+    all numbers are stored as REAL, eg.: '1.2B' -> 1200000000.0 and '3.4%' -> 3.4, with NULL
+    for missing values, and the others as TEXT. Every row gets the snapshot date, and the
+    rows are written with bound parameters in batches, in one transaction.
 
-            insert_fields += '"' + value + '", '
+    :param mode: 'append' adds the rows, 'upsert' replaces the rows of the same Ticker and snapshot date,
+        also the ones appended before
+    :type mode: str
+    :param snapshot_date: date stored in the SnapshotDate column eg.: '2024-01-02', today if omitted
+    :type snapshot_date: str
+    :param batch_size: number of rows sent to SQLite per executemany call
+    :type batch_size: int
+    """
 
-        inserts += insert_fields[:-2] + "), "
+    if mode not in ("append", "upsert"):
+        raise ValueError(f"Invalid export mode: {mode}")
+    if mode == "upsert" and "Ticker" not in headers:
+        raise ValueError("Upserts need the Ticker column")
+    if snapshot_date is None:
+        snapshot_date = datetime.date.today().isoformat()
 
-    insert_lines = inserts[:-2]
+    columns = [__column_name(field) for field in headers] + ["SnapshotDate"]
+    values, column_types = __typed_columns(headers, data)
+    column_types.append("TEXT")
+    rows = list(zip(*values, itertools.repeat(snapshot_date, len(data))))
 
+    conn = create_connection(filename)
     try:
-        c.execute(f"INSERT INTO {table_name} VALUES {insert_lines};")
-    except sqlite3.Error as error:
-        print("An error has occurred", error.args[0])
+        conn.execute("PRAGMA journal_mode=WAL")
+
+        with conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table_name} ("
+                + ", ".join(
+                    f'"{column}" {column_type}'
+                    for column, column_type in zip(columns, column_types)
+                )
+                + ")"
+            )
+
+            # Tables of other headers, or of older versions, get the missing columns
+            existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table_name})")}
+            for column, column_type in zip(columns, column_types):
+                if column not in existing:
+                    conn.execute(
+                        f'ALTER TABLE {table_name} ADD COLUMN "{column}" {column_type}'
+                    )
+
+            if mode == "upsert":
+                # Not unique: appended snapshots may already hold a ticker twice
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS {table_name}_ticker_snapshot "
+                    f'ON {table_name} ("Ticker", "SnapshotDate")'
+                )
+                conn.executemany(
+                    f'DELETE FROM {table_name} WHERE "Ticker" = ? AND "SnapshotDate" = ?',
+                    ((row.get("Ticker"), snapshot_date) for row in data),
+                )
+
+            statement = (
+                f"INSERT INTO {table_name} ("
+                + ", ".join(f'"{column}"' for column in columns)
+                + ") VALUES ("
+                + ", ".join("?" * len(columns))
+                + ")"
+            )
 
-    conn.commit()
-    conn.close()
+            for start in range(0, len(rows), batch_size):
+                conn.executemany(statement, rows[start : start + batch_size])
+    finally:
+        conn.close()
@@ -1,64 +1,96 @@
 import datetime
-import os
-import time
+import re
+from urllib.parse import parse_qs, urlencode, urlsplit
 
 import requests
 from lxml import etree, html
 
+from finviz.helper_functions.chart_store import CHUNK_SIZE, ChartStore
+
+
+# FinViz serves UTF-8, decoding the bytes in the parser skips the charset detection of Response.text
+_HTML_PARSER = html.HTMLParser(encoding="utf-8")
+
+_TABLE_ROWS = etree.XPath("//tr[@valign='top']")
+_CELL_TEXT = etree.XPath("td//text()")
+
+
+def parse_html(page_content):
+    """ Returns the parsed HTML of a response, of its content or of an already parsed page. """
+
+    if isinstance(page_content, html.HtmlElement):
+        return page_content
+    if isinstance(page_content, str):
+        return html.fromstring(page_content)
+    if isinstance(page_content, bytes):
+        return html.fromstring(page_content, parser=_HTML_PARSER)
+    return html.fromstring(page_content.content, parser=_HTML_PARSER)
+
+
+def iter_table(page_html, headers, rows=None):
+    """
+    Yields the rows of a FinViz table (screener, portfolio or crypto) as dictionaries.
+
+    :param page_html: response, body or parsed page
+    :param headers: table headers the cells are zipped to
+    :type headers: list
+    :param rows: maximum number of rows, all of them if None
+    :type rows: int
+    """
+
+    for row_number, row in enumerate(_TABLE_ROWS(parse_html(page_html)), 1):
+        yield dict(zip(headers, _CELL_TEXT(row)))
+        if row_number == rows:  # If we have reached the required end
+            return
+
 
 def get_table(page_html: requests.Response, headers, rows=None, **kwargs):
     """ Private function used to return table data inside a list of dictionaries. """
-    if isinstance(page_html, str):
-        page_parsed = html.fromstring(page_html)
-    else:
-        page_parsed = html.fromstring(page_html.text)
-    # When we call this method from Portfolio we don't fill the rows argument.
-    # Conversely, we always fill the rows argument when we call this method from Screener.
-    # Also, in the portfolio page, we don't need the last row - it's redundant.
-    if rows is None:
-        rows = -2  # We'll increment it later (-1) and use it to cut the last row
-
-    data_sets = []
-    # Select the HTML of the rows and append each column text to a list
-    all_rows = [
-        column.xpath("td//text()")
-        for column in page_parsed.cssselect('tr[valign="top"]')
-    ]
 
-    # If rows is different from -2, this function is called from Screener
-    if rows != -2:
-        for row_number, row_data in enumerate(all_rows, 1):
-            data_sets.append(dict(zip(headers, row_data)))
-            if row_number == rows:  # If we have reached the required end
-                break
-    else:
-        # Zip each row values to the headers and append them to data_sets
-        [data_sets.append(dict(zip(headers, row))) for row in all_rows]
+    return list(iter_table(page_html, headers, rows))
+
+
+# Precompiled once, the pagination of the first page gates every other screener request.
+# The [1] step lets libxml2 stop at the first match instead of scanning the whole page.
+_TOTAL_COUNTER = etree.XPath("string(descendant::*[contains(@class, 'count-text')][1])")
+_PAGE_SELECT = etree.XPath("string(descendant::option[@value='1'][1])")
+_TOTAL_NUMBER = re.compile(r"#1\s*/\s*([\d,]+)\s*Total")
+
+
+def get_pagination(page_content):
+    """
+    Returns the total number of rows and pages of a screener page,
+    read from the "#1 / N Total" counter and the "Page 1/N" selector.
+    """
+
+    page_parsed = parse_html(page_content)
+
+    match = _TOTAL_NUMBER.search(_TOTAL_COUNTER(page_parsed))
+    total_rows = int(match.group(1).replace(",", "")) if match else 0
+
+    page_option = _PAGE_SELECT(page_parsed).rpartition("/")[2].strip()
+    if page_option.isdigit():
+        total_pages = int(page_option)
+    else:  # No page selector: compute the page count from 20 rows per page
+        total_pages = max(1, -(-total_rows // 20))
 
-    return data_sets
+    return total_rows, total_pages
 
 
 def get_total_rows(page_content):
     """ Returns the total number of rows(results). """
 
-    options=[('class="count-text whitespace-nowrap">#1 / ',' Total</div>'),('class="count-text">#1 / ',' Total</td>')]
-    page_text = str(html.tostring(page_content))
-    for option_beg,option_end in options:
-        if option_beg in page_text:
-            total_number = page_text.split(option_beg)[1].split(option_end)[0]
-            try:
-                return int(total_number)
-            except ValueError:
-                return 0
-    return 0
+    return get_pagination(page_content)[0]
 
 
-def get_page_urls(page_content, rows, url):
-    """ Returns a list containing all of the page URL addresses. """
+def get_page_urls(page_content, rows, url, total_pages=None):
+    """
+    Returns a list containing all of the page URL addresses.
+    The page count is read from the page unless already known from get_pagination.
+    """
 
-    total_pages = int(
-        [i.text.split("/")[1] for i in page_content.cssselect('option[value="1"]')][0]
-    )
+    if total_pages is None:
+        total_pages = get_pagination(page_content)[1]
     urls = []
 
     for page_number in range(1, total_pages + 1):
@@ -72,14 +104,17 @@ def get_page_urls(page_content, rows, url):
 
 
 def download_chart_image(page_content: requests.Response, **kwargs):
-    """ Downloads a .png image of a chart into the "charts" folder. """
-    file_name = f"{kwargs['URL'].split('t=')[1]}_{int(time.time())}.png"
+    """
+    Writes a .png image of a chart, as it is downloaded, into a ChartStore (the "charts"
+    folder by default) and returns its manifest entry.
+    """
 
-    if not os.path.exists("charts"):
-        os.mkdir("charts")
+    query = parse_qs(urlsplit(kwargs["URL"]).query)
+    ticker = query.pop("t")[0]
+    chart = urlencode(sorted((key, values[0]) for key, values in query.items()))
 
-    with open(os.path.join("charts", file_name), "wb") as handle:
-        handle.write(page_content.content)
+    store = kwargs.get("store") or ChartStore()
+    return store.write(ticker, chart, page_content.iter_content(CHUNK_SIZE))
 
 
 def get_analyst_price_targets_for_export(
@@ -145,7 +180,7 @@ def get_analyst_price_targets_for_export(
 def download_ticker_details(page_content: requests.Response, **kwargs):
     data = {}
     ticker = kwargs["URL"].split("=")[1]
-    page_parsed = html.fromstring(page_content.text)
+    page_parsed = parse_html(page_content)
 
     all_rows = [
         row.xpath("td//text()")
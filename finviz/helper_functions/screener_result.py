@@ -0,0 +1,392 @@
+from array import array
+from collections.abc import Mapping, MutableMapping, Sequence
+
+from finviz.helper_functions.value_parsing import (MISSING_VALUES, MULTIPLIERS,
+                                                   parse_number)
+
+# Columns of a few repeated values, stored as codes into their list of categories
+CATEGORICAL_COLUMNS = frozenset(
+    ["Sector", "Industry", "Country", "Index", "Optionable", "Shortable"]
+)
+NAN = float("nan")
+# Most formats a numeric column keeps before it is stored as text
+MAX_FORMATS = 2 ** 15 - 1
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, str) and value.strip() in MISSING_VALUES)
+
+
+def _number_format(value):
+    """
+    Private function returning the number of a value and the format that writes the number
+    back to the same text, eg.: '1,234.50M' -> (1234500000.0, (2, True, 'M')), or None if
+    the value is text. Float values are kept as they are, with None as format.
+    """
+
+    if isinstance(value, float):
+        return value, None
+    if not isinstance(value, str):
+        return None
+
+    number = parse_number(value)
+    if number is None:
+        return None
+
+    suffix = value[-1] if value[-1] == "%" or value[-1] in MULTIPLIERS else ""
+    body = value[: len(value) - len(suffix)]
+    number_format = (len(body.partition(".")[2]), "," in body, suffix)
+    if _format_number(number, number_format) != value:
+        return None
+
+    return number, number_format
+
+
+def _format_number(number, number_format):
+    """ Private function writing a number back to the text it was parsed from. """
+
+    if number_format is None:
+        return number
+
+    decimals, commas, suffix = number_format
+    if suffix in MULTIPLIERS:
+        number /= MULTIPLIERS[suffix]
+    return f"{number:{',' if commas else ''}.{decimals}f}{suffix}"
+
+
+class ScreenerResult(Sequence):
+    """
+    Rows of a screener stored as one typed array per column, parsed once as the rows are
+    added: numeric columns as float64 arrays with NaN for missing values ('-'), the columns
+    of CATEGORICAL_COLUMNS as int32 codes (-1 if missing) into their categories, and text
+    columns as lists. Rows are read-only mappings of the typed values, while the rows
+    of self.rows give back the text of FinViz. Example usage:
+
+    result = stock_list.to_result()
+    result[0]['Market Cap']  # 1200000000.0
+    result.rows[0]['Market Cap']  # '1.20B'
+    result.to_pandas()
+    """
+
+    def __init__(self, headers, rows=()):
+        """
+        :param headers: column headers
+        :type headers: list
+        :param rows: rows as dictionaries
+        :type rows: list
+        :var self.columns: array of each column
+        :type self.columns: dict
+        :var self.categories: categories of each categorical column
+        :type self.categories: dict
+        """
+
+        self.headers = []
+        self.columns = {}
+        self.categories = {}
+        self._length = 0
+        self._category_codes = {}
+        # Numeric columns: format code of each value (-1 if missing), the formats and their codes
+        self._formats = {}
+        # Text of the missing values other than None, by column and position
+        self._missing = {}
+
+        for header in headers:
+            self.__add_column(header)
+        self.extend(rows)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            positions = range(*position.indices(self._length))
+            return [ResultRow(self, number) for number in positions]
+
+        return ResultRow(self, self.__position(position))
+
+    def __repr__(self):
+        return f"<ScreenerResult: {self._length} rows, {len(self.headers)} columns>"
+
+    @property
+    def rows(self):
+        """ Rows as mutable mappings of the text of each value, like the rows of Screener.data. """
+
+        return RowsView(self)
+
+    def extend(self, rows):
+        """
+        Appends rows to the columns, parsing their values. Headers the result does not
+        have yet are added as columns, missing in the rows before.
+
+        :param rows: rows as dictionaries
+        :type rows: iterable
+        """
+
+        for row in rows:
+            if not self.columns.keys() >= row.keys():
+                for header in row:
+                    if header not in self.columns:
+                        self.__add_column(header)
+
+            for header in self.headers:
+                self.__store(header, self._length, row.get(header))
+            self._length += 1
+
+    def value(self, header, position):
+        """ Returns the value of a column in a row, the category of categorical columns. """
+
+        value = self.columns[header][position]
+        if header in self.categories:
+            return None if value < 0 else self.categories[header][value]
+        return value
+
+    def text(self, header, position):
+        """ Returns the value of a column in a row as it was added. """
+
+        column = self.columns[header]
+
+        if header in self._formats:
+            codes, formats, _ = self._formats[header]
+            code = codes[position]
+            if code < 0:
+                return self._missing[header].get(position)
+            return _format_number(column[position], formats[code])
+
+        if header in self.categories:
+            code = column[position]
+            if code < 0:
+                return self._missing[header].get(position)
+            return self.categories[header][code]
+
+        return column[position]
+
+    def set_text(self, header, position, value):
+        """ Replaces the value of a column in a row, adding the column if it is new. """
+
+        position = self.__position(position)
+        if header not in self.columns:
+            self.__add_column(header)
+        self.__store(header, position, value)
+
+    def __position(self, position):
+        """ Private function returning the position of a row, counted from the end if negative. """
+
+        if position < 0:
+            position += self._length
+        if not 0 <= position < self._length:
+            raise IndexError("screener row index out of range")
+        return position
+
+    def __add_column(self, header):
+        """ Private function adding a column missing in every row so far. """
+
+        self.headers.append(header)
+        self._missing[header] = {}
+
+        if header in CATEGORICAL_COLUMNS:
+            self.columns[header] = array("i", [-1]) * self._length
+            self.categories[header] = []
+            self._category_codes[header] = {}
+        else:
+            self.columns[header] = array("d", [NAN]) * self._length
+            self._formats[header] = (array("h", [-1]) * self._length, [], {})
+
+    def __store(self, header, position, value):
+        """ Private function storing a value in a column, at its end or over a row. """
+
+        column = self.columns[header]
+        append = position == len(column)
+        missing = self._missing.get(header)
+
+        if missing is not None:
+            missing.pop(position, None)
+            if _is_missing(value):
+                if value is not None:
+                    missing[position] = value
+                typed, code = (NAN, -1) if header in self._formats else (-1, None)
+            elif header in self._formats:
+                parsed = _number_format(value)
+                _, formats, format_codes = self._formats[header]
+                if parsed is None or (
+                    parsed[1] not in format_codes and len(formats) >= MAX_FORMATS
+                ):
+                    self.__to_text(header)
+                    return self.__store(header, position, value)
+                typed, number_format = parsed
+                code = format_codes.get(number_format)
+                if code is None:
+                    code = format_codes[number_format] = len(formats)
+                    formats.append(number_format)
+            elif isinstance(value, str):
+                codes = self._category_codes[header]
+                typed, code = codes.get(value), None
+                if typed is None:
+                    typed = codes[value] = len(codes)
+                    self.categories[header].append(value)
+            else:
+                self.__to_text(header)
+                return self.__store(header, position, value)
+
+            if header in self._formats:
+                codes = self._formats[header][0]
+                if append:
+                    codes.append(code)
+                else:
+                    codes[position] = code
+            value = typed
+
+        if append:
+            column.append(value)
+        else:
+            column[position] = value
+
+    def __to_text(self, header):
+        """ Private function storing a column the values of which are not all numbers as text. """
+
+        self.columns[header] = [
+            self.text(header, position) for position in range(len(self.columns[header]))
+        ]
+        self.categories.pop(header, None)
+        self._category_codes.pop(header, None)
+        self._formats.pop(header, None)
+        del self._missing[header]
+
+    def to_numpy(self):
+        """
+        Returns a NumPy array of each column. The arrays of the numeric and categorical columns
+        share the memory of the columns, text columns are object arrays.
+        """
+
+        import numpy as np
+
+        arrays = {}
+        for header, column in self.columns.items():
+            if isinstance(column, array):
+                arrays[header] = np.frombuffer(
+                    column, dtype=np.float64 if column.typecode == "d" else np.intc
+                )
+            else:
+                arrays[header] = np.array(column, dtype=object)
+
+        return arrays
+
+    def to_pandas(self):
+        """ Returns a pandas DataFrame of the columns, with the categorical columns as categoricals. """
+
+        import pandas as pd
+
+        data = {}
+        for header, column in self.to_numpy().items():
+            if header in self.categories:
+                column = pd.Categorical.from_codes(column, self.categories[header])
+            data[header] = column
+
+        return pd.DataFrame(data, columns=self.headers, copy=False)
+
+    def to_arrow(self):
+        """ Returns a pyarrow Table of the columns, with the categorical columns as dictionaries. """
+
+        import pyarrow as pa
+
+        data = []
+        for header, column in self.to_numpy().items():
+            if header in self.categories:
+                column = pa.DictionaryArray.from_arrays(
+                    pa.array(column, mask=column < 0), self.categories[header]
+                )
+            elif column.dtype == object:
+                column = pa.array(column, type=pa.string())
+            else:
+                column = pa.array(column)
+            data.append(column)
+
+        return pa.table(data, names=self.headers)
+
+
+class ResultRow(Mapping):
+    """ Row of a ScreenerResult, read from its columns. """
+
+    __slots__ = ("_result", "_position")
+
+    def __init__(self, result, position):
+        self._result = result
+        self._position = position
+
+    def __getitem__(self, header):
+        if header not in self._result.columns:
+            raise KeyError(header)
+        return self._result.value(header, self._position)
+
+    def __iter__(self):
+        return iter(self._result.headers)
+
+    def __len__(self):
+        return len(self._result.headers)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class RowsView(Sequence):
+    """ Rows of a ScreenerResult as mappings of text, the rows of Screener.data. """
+
+    __slots__ = ("result",)
+
+    def __init__(self, result):
+        self.result = result
+
+    def __len__(self):
+        return len(self.result)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            positions = range(*position.indices(len(self.result)))
+            return [TextRow(self.result, number) for number in positions]
+
+        if position < 0:
+            position += len(self.result)
+        if not 0 <= position < len(self.result):
+            raise IndexError("screener row index out of range")
+
+        return TextRow(self.result, position)
+
+    def __eq__(self, other):
+        if not isinstance(other, Sequence) or len(self) != len(other):
+            return False
+        return all(row == other_row for row, other_row in zip(self, other))
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class TextRow(MutableMapping):
+    """
+    Row of a ScreenerResult giving back the text of each value. Setting a value writes it
+    into the columns, new headers are added as columns.
+    """
+
+    __slots__ = ("_result", "_position")
+
+    def __init__(self, result, position):
+        self._result = result
+        self._position = position
+
+    def __getitem__(self, header):
+        if header not in self._result.columns:
+            raise KeyError(header)
+        return self._result.text(header, self._position)
+
+    def __setitem__(self, header, value):
+        self._result.set_text(header, self._position, value)
+
+    def __delitem__(self, header):
+        raise TypeError("the columns of a screener row cannot be deleted")
+
+    def __iter__(self):
+        return iter(self._result.headers)
+
+    def __len__(self):
+        return len(self._result.headers)
+
+    def __repr__(self):
+        return repr(dict(self))
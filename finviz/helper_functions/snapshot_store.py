@@ -0,0 +1,292 @@
+import datetime
+import os
+import sqlite3
+import threading
+
+from finviz.helper_functions.value_parsing import MISSING_VALUES, parse_number
+
+# Field of the presence of a ticker, NULL from the snapshot it is missing from
+PRESENCE_FIELD = "Ticker"
+# Fields that are not values of the ticker, eg.: the position of the row in the table
+SKIPPED_FIELDS = frozenset(["No."])
+
+
+def _timestamp(ts):
+    """
+    Returns a timestamp as the ISO string stored in the database, now if ts is None.
+    Dates and ISO strings without a time stand for midnight.
+    """
+
+    if ts is None:
+        ts = datetime.datetime.now()
+    elif isinstance(ts, str):
+        ts = datetime.datetime.fromisoformat(ts)
+    elif not isinstance(ts, datetime.datetime):
+        ts = datetime.datetime.combine(ts, datetime.time())
+
+    return ts.isoformat(timespec="microseconds")
+
+
+def _typed(values):
+    """
+    Returns the stored (number, text) values of a field as numbers if every value that is
+    not missing is one, otherwise as texts, so that text such as a company named '3M' is
+    not read as a number. Missing values of numeric fields are None.
+    """
+
+    numeric = all(
+        number is not None or text is None or text.strip() in MISSING_VALUES
+        for number, text in values
+    )
+    return [number if numeric else text for number, text in values]
+
+
+class SnapshotStore:
+    """
+    Point in time history of screener results, stored in a SQLite file. Only the values that
+    changed since the previous snapshot are written, one row per ticker and field, so the file
+    grows with the changes rather than with the number of snapshots. The values are indexed
+    by ticker, field and timestamp, and by timestamp alone. Example usage:
+
+    store = SnapshotStore("snapshots/sp500.sqlite3")
+    store.add(Screener(filters=['idx_sp500'], table='Valuation'))
+    store.history('AAPL', 'P/E')
+    """
+
+    def __init__(self, path):
+        """
+        :param path: SQLite file of the snapshots
+        :type path: str
+        """
+
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots "
+                "(ts TEXT PRIMARY KEY, rows INTEGER, changes INTEGER)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS changes "
+                "(ticker TEXT, field TEXT, ts TEXT, number REAL, text TEXT)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS changes_ticker_ts ON changes (ticker, field, ts)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS changes_ts ON changes (ts)")
+            # Last value of every ticker and field, compared with the incoming snapshots
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS latest (ticker TEXT, field TEXT, ts TEXT, "
+                "number REAL, text TEXT, PRIMARY KEY (ticker, field))"
+            )
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+
+    def add(self, rows, ts=None, complete=True):
+        """
+        Stores a snapshot of rows and returns the number of values that changed. Snapshots are
+        added in order, a time that is not after the last snapshot raises ValueError.
+
+        :param rows: screener or rows as dictionaries with a Ticker, eg.: after get_ticker_details
+        :type rows: Iterable
+        :param ts: time of the snapshot, now if omitted
+        :type ts: datetime.datetime or str
+        :param complete: the rows are every ticker of the screener and every field of each, the missing
+            tickers are marked as removed and the fields missing from a row as missing (None).
+            Otherwise the missing tickers and fields keep their last values
+        :type complete: bool
+        """
+
+        ts = _timestamp(ts)
+        incoming = []
+        tickers = []
+        for row in rows:
+            ticker = row.get("Ticker")
+            tickers.append((ticker,))
+            for field, value in row.items():
+                if field in SKIPPED_FIELDS:
+                    continue
+                text = None if value is None else str(value)
+                incoming.append((ticker, field, parse_number(text), text))
+
+        with self._lock, self._conn:
+            last, = self._conn.execute("SELECT MAX(ts) FROM snapshots").fetchone()
+            if last is not None and ts <= last:
+                raise ValueError(
+                    f"Snapshot at {ts} is not after the last snapshot, at {last}"
+                )
+
+            self._conn.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS incoming "
+                "(ticker TEXT, field TEXT, number REAL, text TEXT)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS temp.incoming_ticker ON incoming (ticker, field)"
+            )
+            self._conn.execute("DELETE FROM incoming")
+            self._conn.executemany("INSERT INTO incoming VALUES (?, ?, ?, ?)", incoming)
+
+            if complete:
+                self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS present (ticker TEXT)")
+                self._conn.execute("DELETE FROM present")
+                self._conn.executemany("INSERT INTO present VALUES (?)", tickers)
+                # Tombstones of the fields a ticker had and its row omits
+                self._conn.execute(
+                    "INSERT INTO incoming SELECT l.ticker, l.field, NULL, NULL FROM latest l "
+                    "WHERE l.text IS NOT NULL AND l.ticker IN (SELECT ticker FROM present) "
+                    "AND NOT EXISTS (SELECT 1 FROM incoming i "
+                    "WHERE i.ticker = l.ticker AND i.field = l.field)"
+                )
+                self._conn.execute(
+                    "INSERT INTO incoming SELECT ticker, field, NULL, NULL FROM latest "
+                    "WHERE field = ? AND text IS NOT NULL "
+                    "AND ticker NOT IN (SELECT ticker FROM present)",
+                    (PRESENCE_FIELD,),
+                )
+
+            self._conn.execute("INSERT INTO snapshots VALUES (?, ?, 0)", (ts, len(tickers)))
+            changes = self._conn.execute(
+                "INSERT INTO changes SELECT i.ticker, i.field, ?, i.number, i.text "
+                "FROM incoming i LEFT JOIN latest l ON l.ticker = i.ticker AND l.field = i.field "
+                "WHERE l.ticker IS NULL OR l.text IS NOT i.text",
+                (ts,),
+            ).rowcount
+            self._conn.execute(
+                "INSERT OR REPLACE INTO latest SELECT ticker, field, ts, number, text "
+                "FROM changes WHERE ts = ?",
+                (ts,),
+            )
+            self._conn.execute("UPDATE snapshots SET changes = ? WHERE ts = ?", (changes, ts))
+
+        return changes
+
+    def as_of(self, ts):
+        """
+        Returns the rows of the last snapshot taken at or before a time. Values of numeric
+        fields are numbers, eg.: '1.2B' -> 1200000000.0
+
+        :param ts: time of the rows eg.: '2024-01-02T16:00'
+        :type ts: datetime.datetime or str
+        """
+
+        return list(self.__state(_timestamp(ts)).values())
+
+    def history(self, ticker, field):
+        """
+        Returns the values a field of a ticker took, with the time of the snapshot they first
+        appeared in. Values are numbers if all of them can be parsed, eg.: '1.2B' -> 1200000000.0
+
+        :param ticker: stock symbol eg.: 'AAPL'
+        :type ticker: str
+        :param field: header eg.: 'P/E'
+        :type field: str
+        """
+
+        with self._lock:
+            changes = self._conn.execute(
+                "SELECT ts, number, text FROM changes "
+                "WHERE ticker = ? AND field = ? ORDER BY ts",
+                (ticker, field),
+            ).fetchall()
+
+        values = _typed([(number, text) for _, number, text in changes])
+        return [
+            (datetime.datetime.fromisoformat(ts), value)
+            for (ts, _, _), value in zip(changes, values)
+        ]
+
+    def diff(self, ts1, ts2):
+        """
+        Returns the values that changed between two times, as {ticker: {field: (old, new)}}.
+        Tickers added or removed have None as their old or new Ticker.
+
+        :param ts1: earlier time
+        :type ts1: datetime.datetime or str
+        :param ts2: later time
+        :type ts2: datetime.datetime or str
+        """
+
+        ts1, ts2 = _timestamp(ts1), _timestamp(ts2)
+
+        with self._lock:
+            tickers = [
+                ticker
+                for ticker, in self._conn.execute(
+                    "SELECT DISTINCT ticker FROM changes WHERE ts > ? AND ts <= ?",
+                    (ts1, ts2),
+                )
+            ]
+
+        before = self.__state(ts1, tickers, removed=True)
+        after = self.__state(ts2, tickers, removed=True)
+
+        diff = {}
+        for ticker in tickers:
+            old, new = before.get(ticker, {}), after.get(ticker, {})
+            changed = {
+                field: (old.get(field), new.get(field))
+                for field in {**old, **new}
+                if old.get(field) != new.get(field)
+            }
+            if changed:
+                diff[ticker] = changed
+
+        return diff
+
+    def __state(self, ts, tickers=None, removed=False):
+        """
+        Private function used to return the last value of every field of the tickers at a time,
+        as rows by ticker. Removed tickers are left out unless removed is True, and so are
+        the fields a later snapshot omitted.
+        """
+
+        # latest holds every ticker and field once, CROSS JOIN keeps it as the outer loop
+        # so that the value of each at ts is one lookup of the index
+        query = (
+            "SELECT l.ticker, l.field, c.number, c.text FROM latest l "
+            "CROSS JOIN changes c ON c.ticker = l.ticker AND c.field = l.field AND c.ts = ("
+            "SELECT MAX(ts) FROM changes "
+            "WHERE ticker = l.ticker AND field = l.field AND ts <= ?) {}"
+        )
+        with self._lock, self._conn:
+            if tickers is None:
+                changes = self._conn.execute(query.format(""), (ts,)).fetchall()
+            else:
+                self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS selected (ticker TEXT)")
+                self._conn.execute("DELETE FROM selected")
+                self._conn.executemany(
+                    "INSERT INTO selected VALUES (?)", [(ticker,) for ticker in tickers]
+                )
+                changes = self._conn.execute(
+                    query.format("WHERE l.ticker IN (SELECT ticker FROM selected)"), (ts,)
+                ).fetchall()
+
+        fields = {}
+        for ticker, field, number, text in changes:
+            if text is None and field != PRESENCE_FIELD:
+                continue
+            fields.setdefault(field, []).append((ticker, number, text))
+
+        rows = {}
+        for field, values in fields.items():
+            typed = _typed([(number, text) for _, number, text in values])
+            for (ticker, _, _), value in zip(values, typed):
+                rows.setdefault(ticker, {})[field] = value
+
+        return {
+            ticker: row
+            for ticker, row in rows.items()
+            if removed or row.get(PRESENCE_FIELD) is not None
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
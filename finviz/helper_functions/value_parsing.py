@@ -0,0 +1,83 @@
+MISSING_VALUES = frozenset(["-", ""])
+MULTIPLIERS = {"K": 1e3, "M": 1e6, "B": 1e9, "T": 1e12}
+
+
+def parse_number(value):
+    """
+    Returns the number a FinViz value stands for, or None for missing values ('-') and text.
+    Percentages keep their unit and thousands separators are dropped, eg.:
+    '1.2B' -> 1200000000.0, '3.4%' -> 3.4, '-0.51' -> -0.51, '1,234,567' -> 1234567.0
+    """
+
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        return float(value)
+
+    value = value.strip().replace(",", "")
+    if value in MISSING_VALUES:
+        return None
+
+    multiplier = 1.0
+    if value[-1] == "%":
+        value = value[:-1]
+    elif value[-1] in MULTIPLIERS:
+        multiplier = MULTIPLIERS[value[-1]]
+        value = value[:-1]
+
+    try:
+        return float(value) * multiplier
+    except ValueError:
+        return None
+
+
+def parse_column(values):
+    """
+    Returns the numbers of the values of a column, None for the missing ones ('-'),
+    or None if any value is text.
+
+    :param values: values of a column eg.: ['1.2B', '-', '350.4M']
+    :type values: list
+    """
+
+    numbers = []
+    for value in values:
+        number = parse_number(value)
+        if number is None and not (
+            value is None or (isinstance(value, str) and value.strip() in MISSING_VALUES)
+        ):
+            return None
+        numbers.append(number)
+
+    return numbers
+
+
+def sort_rows(rows, column, descending=False):
+    """
+    Returns the rows sorted by the values of a column, comparing numbers by their value
+    and text case-insensitively. Rows missing the value ('-') come last in both directions.
+
+    :param rows: rows as dictionaries
+    :type rows: list
+    :param column: header of the column to sort by eg.: 'Market Cap'
+    :type column: str
+    :param descending: sort from the highest value
+    :type descending: bool
+    """
+
+    present, missing = [], []
+    for row in rows:
+        value = row.get(column)
+        if value is None or (isinstance(value, str) and value.strip() in MISSING_VALUES):
+            missing.append(row)
+        else:
+            present.append(row)
+
+    def sort_key(row):
+        value = row[column]
+        number = parse_number(value)
+        if number is not None:
+            return 0, number, ""
+        return 1, 0.0, str(value).lower()
+
+    return sorted(present, key=sort_key, reverse=descending) + missing
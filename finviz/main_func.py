@@ -2,8 +2,9 @@ from datetime import datetime
 
 from lxml import etree
 
+from finviz.helper_functions.error_handling import NoResults
 from finviz.helper_functions.request_functions import http_request_get
-from finviz.helper_functions.scraper_functions import get_table
+from finviz.helper_functions.scraper_functions import iter_table
 
 STOCK_URL = "https://finviz.com/quote.ashx"
 NEWS_URL = "https://finviz.com/news.ashx"
@@ -30,7 +31,11 @@ def get_stock(ticker):
     """
 
     get_page(ticker)
-    page_parsed = STOCK_PAGE[ticker]
+    return _stock_data(STOCK_PAGE[ticker])
+
+
+def _stock_data(page_parsed):
+    """ Returns a dictionary containing the stock data of a parsed quote page. """
 
     title = page_parsed.cssselect('table[class="fullview-title"]')[0]
     keys = ["Company", "Sector", "Industry", "Country"]
@@ -70,7 +75,12 @@ def get_insider(ticker):
     """
 
     get_page(ticker)
-    page_parsed = STOCK_PAGE[ticker]
+    return _insider_data(STOCK_PAGE[ticker])
+
+
+def _insider_data(page_parsed):
+    """ Returns the insider transactions of a parsed quote page. """
+
     outer_table = page_parsed.cssselect('table[class="body-table insider-trading-table"]')
 
     if len(outer_table) == 0:
@@ -96,7 +106,12 @@ def get_news(ticker):
     """
 
     get_page(ticker)
-    page_parsed = STOCK_PAGE[ticker]
+    return _news_data(STOCK_PAGE[ticker])
+
+
+def _news_data(page_parsed):
+    """ Returns the news headlines of a parsed quote page. """
+
     news_table = page_parsed.cssselect('table[id="news-table"]')
 
     if len(news_table) == 0:
@@ -148,17 +163,20 @@ def get_all_news():
 
 def get_crypto(pair):
     """
+    Returns the performance of a crypto pair, raises NoResults if FinViz does not list it.
 
-    :param pair: crypto pair
+    :param pair: crypto pair eg.: 'BTCUSD'
     :return: dictionary
     """
 
     page_parsed, _ = http_request_get(url=CRYPTO_URL, parse=True)
-    page_html, _ = http_request_get(url=CRYPTO_URL, parse=False)
     crypto_headers = page_parsed.cssselect('tr[valign="middle"]')[0].xpath("td//text()")
-    crypto_table_data = get_table(page_html, crypto_headers)
 
-    return crypto_table_data[pair]
+    for row in iter_table(page_parsed, crypto_headers):
+        if row[crypto_headers[0]] == pair:
+            return row
+
+    raise NoResults(f"crypto pair {pair}")
 
 
 def get_analyst_price_targets(ticker, last_ratings=5):
@@ -0,0 +1,178 @@
+import asyncio
+
+from finviz import aio
+from finviz.helper_functions.error_handling import NoResults
+from finviz.helper_functions.lazy_rows import ChainedRows
+from finviz.helper_functions.query_cache import QueryCache, get_query_cache
+from finviz.helper_functions.request_functions import rebase_url, session_scope
+from finviz.screener import SCREENER_URL, TABLE_TYPES, Screener
+
+
+class MergedScreener(Screener):
+    """
+    Base of the screeners whose rows are merged from several queries of the same table,
+    eg.: the batches of a TickerListScreener or the shards of a ShardedScreener.
+
+    The queries are downloaded with the request method of the screener: concurrently over
+    one asynchronous session with 'async', one after the other otherwise. Streaming and lazy
+    screeners cannot sort the rows of every query together, so they read the rows of each
+    query in turn, in the order of the query, up to the row limit.
+    """
+
+    async def _search_queries(self, queries, session=None, refresh=False):
+        """
+        Private function used to download the screener of every query, as (tickers, filters)
+        pairs, and to return them in order, None for the queries without results.
+        Every screener is downloaded before the first error other than NoResults is raised.
+
+        :param refresh: skip the query cache and store the new results
+        :type refresh: bool
+        """
+
+        deferred = self._stream or self._lazy
+        if len(queries) > 1 and not deferred:
+            self._merge_column()  # Fails before any request if the rows cannot be merged
+
+        cache = get_query_cache()
+        if refresh and cache is not None:
+            for tickers, filters in queries:
+                cache.discard(self.__query_key(tickers, filters))
+
+        parameters = dict(
+            rows=self._row_limit if deferred else None,
+            order=self._order,
+            signal=self._signal,
+            table={number: name for name, number in TABLE_TYPES.items()}[self._table],
+            custom=list(self._custom) or None,
+            user_agent=self._user_agent,
+            stream=self._stream,
+            base_url=self._base_url,
+            # Rows are written once merged or streamed, lazy pages as they are downloaded
+            sink=self._sink if self._lazy else None,
+        )
+
+        if self._request_method == "async" and not self._lazy:
+            async with session_scope(session, self._user_agent) as session:
+                screeners = [
+                    aio.Screener(list(tickers), list(filters), session=session, **parameters)
+                    for tickers, filters in queries
+                ]
+                found = {id(stock_list) for stock_list in await aio.search_all(screeners)}
+            return [
+                stock_list if id(stock_list) in found else None for stock_list in screeners
+            ]
+
+        def search():
+            screeners, error = [], None
+            for tickers, filters in queries:
+                try:
+                    screeners.append(
+                        Screener(
+                            list(tickers),
+                            list(filters),
+                            request_method=self._request_method,
+                            lazy=self._lazy,
+                            **parameters,
+                        )
+                    )
+                except NoResults:
+                    screeners.append(None)
+                except Exception as exception:
+                    screeners.append(None)
+                    error = error or exception
+
+            if error is not None:
+                raise error
+            return screeners
+
+        return await asyncio.get_running_loop().run_in_executor(None, search)
+
+    def __query_key(self, tickers, filters):
+        """ Private function used to return the query cache key of the screener of a query. """
+
+        return QueryCache.key(
+            self._table,
+            filters,
+            tickers,
+            self._signal,
+            self._custom,
+            self._order,
+            None,
+            rebase_url(SCREENER_URL, self._base_url),
+        )
+
+    def _merge_screeners(self, screeners):
+        """
+        Private function used to return the rows of the screeners with results: merged and
+        sorted, or read one screener after the other if they are streamed or lazy.
+        """
+
+        screeners = [stock_list for stock_list in screeners if stock_list is not None]
+        if not (self._stream or self._lazy):
+            data = self._merge_rows(screeners, self._row_limit)
+            self._write_rows(data, flush=True)
+            return data
+
+        self.headers = screeners[0].headers if screeners else []
+        self._total_rows = sum(stock_list._total_rows for stock_list in screeners)
+        self._rows = min(self._row_limit or self._total_rows, self._total_rows)
+        self._screeners = screeners
+        if self._stream:
+            return []
+        return ChainedRows([stock_list.data for stock_list in screeners], self._rows)
+
+    def iter_rows(self, ordered=True):
+        """
+        Yields the rows page by page as the responses arrive, the rows of each query in turn
+        if streaming. Streaming screeners keep no rows in memory, the others yield the rows
+        already downloaded.
+
+        :param ordered: yield the pages in table order instead of the order they arrive in (async only)
+        :type ordered: bool
+        """
+
+        if not self._stream:
+            yield from self.data
+            return
+
+        remaining = self._rows
+        for stock_list in self._screeners:
+            for page in stock_list._iter_pages(ordered):
+                page = page[:remaining]
+                self._write_rows(page)
+                remaining -= len(page)
+                yield from page
+                if not remaining:
+                    break
+            if not remaining:
+                break
+        self._write_rows([], flush=True)
+
+    async def astream(self, ordered=True):
+        """
+        Asynchronously yields the rows page by page as the responses arrive, the rows of each
+        query in turn. Non-streaming screeners yield the rows already downloaded.
+
+        :param ordered: yield the pages in table order instead of the order they arrive in
+        :type ordered: bool
+        """
+
+        if not self._stream:
+            for row in self.data:
+                yield row
+            return
+
+        remaining = self._rows
+        async with session_scope(None, self._user_agent) as session:
+            for stock_list in self._screeners:
+                async for page in stock_list._connector().stream(ordered, session=session):
+                    page = page[:remaining]
+                    self._write_rows(page)
+                    remaining -= len(page)
+                    for row in page:
+                        yield row
+                    if not remaining:
+                        break
+                if not remaining:
+                    break
+        self._write_rows([], flush=True)
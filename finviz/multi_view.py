@@ -0,0 +1,155 @@
+import asyncio
+
+from user_agent import generate_user_agent
+
+from finviz import aio
+from finviz.helper_functions.display_functions import create_table_string
+from finviz.helper_functions.request_functions import run_sync, session_scope
+from finviz.helper_functions.save_data import export_to_csv
+
+
+class MultiViewScreener(object):
+    """
+    Used to download several table types of one screener query concurrently and join
+    their rows by ticker. Example usage:
+
+    stock_list = MultiViewScreener(['Overview', 'Valuation', 'Financial'], filters=['idx_sp500'])
+    print(stock_list[0]['Company'], stock_list[0]['P/E'], stock_list[0]['ROE'])
+    """
+
+    def __init__(
+        self,
+        tables,
+        tickers=None,
+        filters=None,
+        rows=None,
+        order="",
+        signal="",
+        user_agent=generate_user_agent(),
+        base_url=None,
+    ):
+        """
+        Downloads every table type of the query.
+
+        :param tables: table types eg.: ['Overview', 'Valuation', 'Performance']
+        :type tables: list
+        :param tickers: collection of ticker strings eg.: ['AAPL', 'AMD', 'WMT']
+        :type tickers: list
+        :param filters: collection of filters strings eg.: ['exch_nasd', 'idx_sp500', 'fa_div_none']
+        :type filters: list
+        :param rows: total number of rows to get
+        :type rows: int
+        :param order: table order eg.: '-price' (to sort table by descending price)
+        :type order: str
+        :param signal: show by signal eg.: 'n_majornews' (for stocks with major news)
+        :type signal: str
+        :param user_agent: User-Agent header sent with every request
+        :type user_agent: str
+        :param base_url: send the requests to another server than https://finviz.com (eg. a stand-in)
+        :type base_url: str
+        :var self.views: screener of each table type
+        :type self.views: dict
+        :var self.data: list of dictionaries containing the joined row data
+        :type self.data: list
+        """
+
+        self.tables = list(tables)
+        self._tickers = tickers or []
+        self._filters = filters or []
+        self._rows = rows
+        self._order = order
+        self._signal = signal
+        self._user_agent = user_agent
+        self._base_url = base_url
+
+        self.views = {}
+        self.headers = []
+        self.data = run_sync(self.search())
+
+    def __str__(self):
+        """ Returns a readable representation of a table. """
+
+        table_list = [self.headers]
+
+        for row in self.data:
+            table_list.append([row.get(col) or "" for col in self.headers])
+
+        return create_table_string(table_list)
+
+    def __len__(self):
+        """ Returns an int with the number of total rows. """
+
+        return len(self.data)
+
+    def __getitem__(self, position):
+        """ Returns a dictionary containing specific row data. """
+
+        return self.data[position]
+
+    def __iter__(self):
+        return iter(self.data)
+
+    async def search(self, session=None):
+        """
+        Downloads the pages of every table type concurrently, over one asynchronous session,
+        and returns the joined rows.
+
+        :param session: asynchronous session to send the requests with, a new one is used if omitted
+        :type session: aiohttp.ClientSession
+        """
+
+        async with session_scope(session, self._user_agent) as session:
+            views = [
+                aio.Screener(
+                    list(self._tickers),
+                    list(self._filters),
+                    self._rows,
+                    self._order,
+                    self._signal,
+                    table,
+                    user_agent=self._user_agent,
+                    base_url=self._base_url,
+                    session=session,
+                )
+                for table in self.tables
+            ]
+            await asyncio.gather(*(view.search() for view in views))
+
+        self.views = dict(zip(self.tables, views))
+        self.data = self.__join(views)
+        return self.data
+
+    def __join(self, views):
+        """
+        Private function used to join the rows of the views by ticker, in the order of the
+        first view. Headers shared by several views keep the value of the first one.
+        """
+
+        known_headers = set()
+        self.headers = []
+        for view in views:
+            new_headers = [header for header in view.headers if header not in known_headers]
+            self.headers.extend(new_headers)
+            known_headers.update(new_headers)
+
+        rows_by_ticker = {}
+        data = []
+        for view in views:
+            for row in view.data:
+                joined = rows_by_ticker.get(row.get("Ticker"))
+                if joined is None:
+                    joined = rows_by_ticker[row.get("Ticker")] = {}
+                    data.append(joined)
+
+                for header, value in row.items():
+                    joined.setdefault(header, value)
+
+        return data
+
+    def to_csv(self, filename: str):
+        """ Exports the joined table into a CSV file. """
+
+        if filename and filename.endswith(".csv"):
+            filename = filename[:-4]
+
+        return export_to_csv(self.headers, self.data, f"{filename}.csv")
@@ -1,6 +1,5 @@
 import csv
 
-import requests
 from lxml import html
 from user_agent import generate_user_agent
 
@@ -8,7 +7,9 @@ from finviz.helper_functions.display_functions import create_table_string
 from finviz.helper_functions.error_handling import (InvalidPortfolioID,
                                                     InvalidTicker,
                                                     NonexistentPortfolioName)
-from finviz.helper_functions.request_functions import http_request_get
+from finviz.helper_functions.request_functions import (get_client,
+                                                       http_request_get,
+                                                       rebase_url)
 from finviz.helper_functions.scraper_functions import get_table
 
 LOGIN_URL = "https://finviz.com/login_submit.ashx"
@@ -44,10 +45,12 @@ class Portfolio(object):
 
         payload = {"email": email, "password": password}
 
-        # Create a session and log in by sending a POST request
-        self._session = requests.session()
+        # Create a session on the shared connection pool and log in by sending a POST request
+        self._session = get_client().new_session()
         auth_response = self._session.post(
-            LOGIN_URL, data=payload, headers={"User-Agent": generate_user_agent()}
+            rebase_url(LOGIN_URL),
+            data=payload,
+            headers={"User-Agent": generate_user_agent()},
         )
 
         if not auth_response.ok:  # If the post request wasn't successful
@@ -129,7 +132,7 @@ class Portfolio(object):
                         del data["shares" + row_number_string]
                     else:
                         data["price" + row_number_string] = current_price_page.text
-        self._session.post(PORTFOLIO_SUBMIT_URL, data=data)
+        self._session.post(rebase_url(PORTFOLIO_SUBMIT_URL), data=data)
 
     def __get_portfolio_url(self, portfolio_name):
         """ Private function used to return the portfolio url from a given id/name. """
@@ -1,6 +1,7 @@
+import itertools
 import json
+import os
 import pathlib
-import urllib.request
 from urllib.parse import parse_qs as urlparse_qs
 from urllib.parse import urlencode, urlparse
 
@@ -8,13 +9,36 @@ from bs4 import BeautifulSoup
 from user_agent import generate_user_agent
 
 import finviz.helper_functions.scraper_functions as scrape
+from finviz.config import connection_settings
+from finviz.helper_functions.chart_store import ChartStore
 from finviz.helper_functions.display_functions import create_table_string
-from finviz.helper_functions.error_handling import InvalidTableType, NoResults
-from finviz.helper_functions.request_functions import (Connector,
+from finviz.helper_functions.error_handling import (InvalidColumn,
+                                                    InvalidTableType, NoResults)
+from finviz.helper_functions.lazy_rows import ROWS_PER_PAGE, LazyRows
+from finviz.helper_functions.query_cache import QueryCache, get_query_cache
+from finviz.helper_functions.request_functions import (Connector, get_client,
                                                        http_request_get,
-                                                       sequential_data_scrape)
-from finviz.helper_functions.save_data import export_to_csv, export_to_db
-
+                                                       iter_data_scrape,
+                                                       iter_streamed_data_scrape,
+                                                       iter_threaded_data_scrape,
+                                                       rebase_url)
+from finviz.helper_functions.save_data import (ExportSink, export_to_csv,
+                                               export_to_db)
+from finviz.helper_functions.screener_result import ScreenerResult
+from finviz.helper_functions.snapshot_store import SnapshotStore
+from finviz.helper_functions.value_parsing import sort_rows
+
+SCREENER_URL = "https://finviz.com/screener.ashx"
+# Columns of the analyst ratings of the ticker details
+ANALYSIS_HEADERS = [
+    "ticker",
+    "date",
+    "category",
+    "analyst",
+    "rating",
+    "price_from",
+    "price_to",
+]
 TABLE_TYPES = {
     "Overview": "111",
     "Valuation": "121",
@@ -24,20 +48,230 @@ TABLE_TYPES = {
     "Financial": "161",
     "Technical": "171",
 }
+# Custom table (v=152) column ids of each header, used to request only the columns needed
+COLUMNS = {
+    "No.": "0",
+    "Ticker": "1",
+    "Company": "2",
+    "Sector": "3",
+    "Industry": "4",
+    "Country": "5",
+    "Market Cap": "6",
+    "P/E": "7",
+    "Fwd P/E": "8",
+    "PEG": "9",
+    "P/S": "10",
+    "P/B": "11",
+    "P/C": "12",
+    "P/FCF": "13",
+    "Dividend": "14",
+    "Payout Ratio": "15",
+    "EPS": "16",
+    "EPS this Y": "17",
+    "EPS next Y": "18",
+    "EPS past 5Y": "19",
+    "EPS next 5Y": "20",
+    "Sales past 5Y": "21",
+    "EPS Q/Q": "22",
+    "Sales Q/Q": "23",
+    "Outstanding": "24",
+    "Float": "25",
+    "Insider Own": "26",
+    "Insider Trans": "27",
+    "Inst Own": "28",
+    "Inst Trans": "29",
+    "Float Short": "30",
+    "Short Ratio": "31",
+    "ROA": "32",
+    "ROE": "33",
+    "ROI": "34",
+    "Curr R": "35",
+    "Quick R": "36",
+    "LTDebt/Eq": "37",
+    "Debt/Eq": "38",
+    "Gross M": "39",
+    "Oper M": "40",
+    "Profit M": "41",
+    "Perf Week": "42",
+    "Perf Month": "43",
+    "Perf Quart": "44",
+    "Perf Half": "45",
+    "Perf Year": "46",
+    "Perf YTD": "47",
+    "Beta": "48",
+    "ATR": "49",
+    "Volatility W": "50",
+    "Volatility M": "51",
+    "SMA20": "52",
+    "SMA50": "53",
+    "SMA200": "54",
+    "50D High": "55",
+    "50D Low": "56",
+    "52W High": "57",
+    "52W Low": "58",
+    "RSI": "59",
+    "from Open": "60",
+    "Gap": "61",
+    "Recom": "62",
+    "Avg Volume": "63",
+    "Rel Volume": "64",
+    "Price": "65",
+    "Change": "66",
+    "Volume": "67",
+    "Earnings": "68",
+    "Target Price": "69",
+    "IPO Date": "70",
+    "After-Hours Close": "71",
+    "After-Hours Change": "72",
+    "Book/sh": "73",
+    "Cash/sh": "74",
+    "Employees": "76",
+    "EPS next Q": "77",
+    "Income": "78",
+    "Index": "79",
+    "Optionable": "80",
+    "Prev Close": "81",
+    "Sales": "82",
+    "Shortable": "83",
+    "Short Interest": "84",
+    "Float %": "85",
+    "EPS Surprise": "127",
+    "Revenue Surprise": "128",
+}
+# Quote page snapshot fields shown under another header in the Custom table
+QUOTE_FIELD_COLUMNS = {
+    "EPS (ttm)": "EPS",
+    "Forward P/E": "Fwd P/E",
+    "Shs Outstand": "Outstanding",
+    "Shs Float": "Float",
+    "Short Float": "Float Short",
+    "Perf Quarter": "Perf Quart",
+    "Perf Half Y": "Perf Half",
+    "RSI (14)": "RSI",
+    "ATR (14)": "ATR",
+    "Gross Margin": "Gross M",
+    "Oper. Margin": "Oper M",
+    "Profit Margin": "Profit M",
+    "LT Debt/Eq": "LTDebt/Eq",
+    "Current Ratio": "Curr R",
+    "Quick Ratio": "Quick R",
+    "Payout": "Payout Ratio",
+    "Sales Surprise": "Revenue Surprise",
+}
+# Quote page snapshot fields joined from Custom table columns, eg.: Volatility '1.20% 1.35%'
+DERIVED_FIELDS = {
+    "Volatility": (("Volatility W", "Volatility M"), " "),
+    "Option/Short": (("Optionable", "Shortable"), " / "),
+}
+# Columns of the `order` codes, used to re-sort downloaded rows without requesting them again
+ORDER_COLUMNS = {
+    "ticker": "Ticker",
+    "company": "Company",
+    "sector": "Sector",
+    "industry": "Industry",
+    "country": "Country",
+    "marketcap": "Market Cap",
+    "pe": "P/E",
+    "forwardpe": "Fwd P/E",
+    "peg": "PEG",
+    "ps": "P/S",
+    "pb": "P/B",
+    "pc": "P/C",
+    "pfcf": "P/FCF",
+    "dividendyield": "Dividend",
+    "payoutratio": "Payout Ratio",
+    "eps": "EPS",
+    "epsyoy": "EPS this Y",
+    "epsyoy1": "EPS next Y",
+    "eps5years": "EPS past 5Y",
+    "estltgrowth": "EPS next 5Y",
+    "sales5years": "Sales past 5Y",
+    "epsqoq": "EPS Q/Q",
+    "salesqoq": "Sales Q/Q",
+    "sharesoutstanding2": "Outstanding",
+    "sharesfloat": "Float",
+    "insiderown": "Insider Own",
+    "insidertrans": "Insider Trans",
+    "instown": "Inst Own",
+    "insttrans": "Inst Trans",
+    "shortinterestshare": "Float Short",
+    "shortinterestratio": "Short Ratio",
+    "roa": "ROA",
+    "roe": "ROE",
+    "roi": "ROI",
+    "curratio": "Curr R",
+    "quickratio": "Quick R",
+    "ltdebteq": "LTDebt/Eq",
+    "debteq": "Debt/Eq",
+    "grossmargin": "Gross M",
+    "opermargin": "Oper M",
+    "netmargin": "Profit M",
+    "perf1w": "Perf Week",
+    "perf4w": "Perf Month",
+    "perf13w": "Perf Quart",
+    "perf26w": "Perf Half",
+    "perf52w": "Perf Year",
+    "perfytd": "Perf YTD",
+    "beta": "Beta",
+    "averagetruerange": "ATR",
+    "volatility1w": "Volatility W",
+    "volatility4w": "Volatility M",
+    "sma20": "SMA20",
+    "sma50": "SMA50",
+    "sma200": "SMA200",
+    "high52w": "52W High",
+    "low52w": "52W Low",
+    "rsi": "RSI",
+    "averagevolume": "Avg Volume",
+    "relativevolume": "Rel Volume",
+    "price": "Price",
+    "change": "Change",
+    "volume": "Volume",
+    "targetprice": "Target Price",
+}
+
+
+def plan_fields(fields):
+    """
+    Splits fields into the ones read from Custom table columns, 20 tickers per request,
+    and the ones only shown on the quote page of each ticker. The fields of DERIVED_FIELDS
+    are planned as the columns they are joined from.
+    Returns the Custom table header of each column field and the list of quote page fields.
+
+    :param fields: quote page or Custom table headers eg.: ['Forward P/E', 'Perf Week', 'Dividend TTM']
+    :type fields: list
+    """
+
+    columns = {}
+    quote_fields = []
+    for field in fields:
+        if field in DERIVED_FIELDS:
+            columns.update((column, column) for column in DERIVED_FIELDS[field][0])
+            continue
+
+        column = QUOTE_FIELD_COLUMNS.get(field, field)
+        if column in COLUMNS:
+            columns[field] = column
+        else:
+            quote_fields.append(field)
+
+    return columns, quote_fields
 
 
 class Screener(object):
     """ Used to download data from https://www.finviz.com/screener.ashx. """
 
     @classmethod
-    def init_from_url(cls, url, rows=None):
+    def init_from_url(cls, url, rows=None, **kwargs):
         """
-        Initializes from url
+        Initializes from url. The query is read into the same parameters as the constructor's,
+        so that it shares its key in the query cache with the equivalent Screener(...) call.
 
         :param url: screener url
         :type url: string
         :param rows: total number of rows to get
         :type rows: int
+        :param kwargs: other arguments of the constructor eg.: request_method='async'
         """
 
         split_query = urlparse_qs(urlparse(url).query)
@@ -57,7 +291,47 @@ class Screener(object):
             except KeyError:
                 raise InvalidTableType(split_query["v"][0])
 
-        return cls(tickers, filters, rows, order, signal, table, custom)
+        return cls(tickers, filters, rows, order, signal, table, custom, **kwargs)
+
+    @classmethod
+    def init_from_fields(cls, fields, ratings=False, **kwargs):
+        """
+        Initializes a Custom table with the given fields, planned by plan_fields: the fields
+        that are Custom table columns are read 20 tickers per page, and the quote page of
+        every ticker is only requested if other fields (or the analyst ratings) are needed.
+        Rows hold every field under the given name, eg.: 'Forward P/E' as well as 'Fwd P/E',
+        and the fields of DERIVED_FIELDS joined as on the quote page.
+
+        :param fields: quote page or Custom table headers eg.: ['Forward P/E', 'Perf Week', 'Dividend TTM']
+        :type fields: list
+        :param ratings: also download the analyst ratings into self.analysis
+        :type ratings: bool
+        :param kwargs: other arguments of the constructor eg.: filters=['idx_sp500']
+        """
+
+        columns, quote_fields = plan_fields(fields)
+        screener = cls(
+            columns=list(dict.fromkeys(columns.values())) or ["Ticker"], **kwargs
+        )
+
+        renamed = {field: column for field, column in columns.items() if field != column}
+        derived = {
+            field: DERIVED_FIELDS[field] for field in fields if field in DERIVED_FIELDS
+        }
+        for row in screener.data:
+            for field, column in renamed.items():
+                row[field] = row.get(column)
+            for field, (sources, separator) in derived.items():
+                values = [row.get(source) for source in sources]
+                row[field] = None if None in values else separator.join(values)
+        screener.headers.extend(
+            field for field in [*renamed, *derived] if field not in screener.headers
+        )
+
+        if quote_fields or ratings:
+            screener.get_ticker_details()
+
+        return screener
 
     def __init__(
         self,
@@ -70,6 +344,12 @@ class Screener(object):
         custom=None,
         user_agent=generate_user_agent(),
         request_method="sequential",
+        stream=False,
+        base_url=None,
+        lazy=False,
+        columns=None,
+        sink=None,
+        ratings_sink=None,
     ):
         """
         Initializes all variables to its values
@@ -88,10 +368,66 @@ class Screener(object):
         :type table: str
         :param custom: collection of custom columns eg.: ['1', '21', '23', '45']
         :type custom: list
-        :var self.data: list of dictionaries containing row data
+        :param user_agent: User-Agent header sent with every request
+        :type user_agent: str
+        :param request_method: 'sequential', 'threaded' (pool of threads) or 'async' (pages only)
+        :type request_method: str
+        :param stream: only request the first page and leave the rows to iter_rows() or astream()
+        :type stream: bool
+        :param base_url: send the requests to another server than https://finviz.com (eg. a stand-in)
+        :type base_url: str
+        :param lazy: only request the first page and the other pages when their rows are read
+        :type lazy: bool
+        :param columns: headers of the Custom table columns to request eg.: ['P/E', 'Perf Week', 'Earnings']
+        :type columns: list
+        :param sink: file path or ExportSink the rows are written to as each page is parsed eg.: 'stocks.csv.gz'
+        :type sink: str or ExportSink
+        :param ratings_sink: file path or ExportSink of the analyst ratings, next to a sink path if omitted
+        :type ratings_sink: str or ExportSink
+        :var self.data: list of dictionaries containing row data (empty when streaming, LazyRows when lazy)
         :type self.data: list
         """
 
+        if columns:
+            custom = self._check_columns(columns)
+
+        self._init_parameters(
+            tickers,
+            filters,
+            rows,
+            order,
+            signal,
+            table,
+            custom,
+            user_agent,
+            request_method,
+            stream,
+            base_url,
+            lazy,
+            sink,
+            ratings_sink,
+        )
+        self.data = self.__search_screener()
+
+    def _init_parameters(
+        self,
+        tickers,
+        filters,
+        rows,
+        order,
+        signal,
+        table,
+        custom,
+        user_agent,
+        request_method,
+        stream,
+        base_url=None,
+        lazy=False,
+        sink=None,
+        ratings_sink=None,
+    ):
+        """ Private function used to validate and store the query parameters. """
+
         if tickers is None:
             self._tickers = []
         else:
@@ -105,7 +441,7 @@ class Screener(object):
         if table is None:
             self._table = "111"
         else:
-            self._table = self.__check_table(table)
+            self._table = self._check_table(table)
 
         if custom is None:
             self._custom = []
@@ -123,9 +459,24 @@ class Screener(object):
         self._signal = signal
         self._user_agent = user_agent
         self._request_method = request_method
+        self._stream = stream
+        self._base_url = base_url
+        self._lazy = lazy
+        self._result = []
+
+        # Analyst ratings go next to the rows, eg.: stocks.csv.gz -> stocks-analysts.csv.gz
+        if ratings_sink is None and isinstance(sink, str):
+            directory, name = os.path.split(sink)
+            stem, dot, extension = name.partition(".")
+            ratings_sink = os.path.join(directory, f"{stem}-analysts{dot}{extension}")
+        self._sink = ExportSink(sink) if isinstance(sink, str) else sink
+        self._ratings_sink = (
+            ExportSink(ratings_sink, ANALYSIS_HEADERS)
+            if isinstance(ratings_sink, str)
+            else ratings_sink
+        )
 
         self.analysis = []
-        self.data = self.__search_screener()
 
     def __call__(
         self,
@@ -145,7 +496,150 @@ class Screener(object):
         # and show their performance:
         stock_list(filters=['fa_div_high'], table='Performance')
         # Shows performance of stocks with large market cap and high dividend yield
+
+        A new order or row limit alone is applied to the downloaded rows if they cover it:
+        stock_list(order='-marketcap')  # No request
+        """
+
+        only_reordered = (order or rows) and not (
+            tickers or filters or signal or table or custom
+        )
+        if only_reordered and self._reorder(order, rows):
+            return
+
+        self._update_parameters(tickers, filters, rows, order, signal, table, custom)
+        self._restart_sinks()
+        self.data = self.__search_screener()
+
+    add = __call__
+
+    def _reorder(self, order, rows):
+        """
+        Private function used to apply a new order or row limit to the downloaded rows
+        instead of downloading them again. Returns False if they cannot be answered locally:
+        a new order needs every row of the screener and a column to sort by, a higher
+        row limit needs the rows beyond the downloaded ones.
+        """
+
+        result = self._result
+        if self._stream or self._lazy or not result:
+            return False
+
+        if order and order != self._order:
+            column = ORDER_COLUMNS.get(order.lstrip("-"))
+            if column not in self.headers or len(result) < self._total_rows:
+                return False
+            result = sort_rows(result, column, descending=order.startswith("-"))
+
+        limit = min(rows or self._rows, self._total_rows)
+        if limit > len(result):
+            return False
+
+        if result is not self._result:
+            if "No." in self.headers:
+                for number, row in enumerate(result, 1):
+                    row["No."] = str(number)
+            self._order = order
+            self._result = result
+
+        self._rows = limit
+        self.data = result[:limit]
+        if self._sink is not None:
+            self._sink.truncate()
+            self._write_rows(self.data, flush=True)
+        return True
+
+    def _write_rows(self, rows, flush=False):
+        """ Private function used to write rows to the sink, if there is one. """
+
+        if self._sink is not None:
+            self._sink.write(rows, self.headers)
+            if flush:
+                self._sink.flush()
+
+    def _restart_sinks(self):
+        """
+        Private function used to empty the sinks before a new search, so that they hold
+        its rows instead of the rows of both searches.
+        """
+
+        for sink in (self._sink, self._ratings_sink):
+            if sink is not None:
+                sink.truncate()
+
+    def export(self):
+        """
+        Downloads the rows of a streaming screener into its sink without keeping them in memory,
+        and the pages not downloaded yet of a lazy one. Returns the number of rows.
+        """
+
+        return sum(1 for _ in self.iter_rows())
+
+    def close(self):
+        """ Closes the files of the sinks. """
+
+        for sink in (self._sink, self._ratings_sink):
+            if sink is not None:
+                sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _merge_rows(self, screeners, rows=None):
+        """
+        Private function used to merge the rows of several screeners of the same table into
+        the result, each ticker once. The rows are sorted by the order of the query again, as
+        each screener is only sorted on its own, and cut at the row limit, if any.
+        """
+
+        self.headers = screeners[0].headers if screeners else []
+
+        known_tickers = set()
+        result = []
+        for stock_list in screeners:
+            for row in stock_list.data:
+                if row.get("Ticker") not in known_tickers:
+                    known_tickers.add(row.get("Ticker"))
+                    result.append(row)
+
+        if len(screeners) > 1:
+            column = self._merge_column()
+            if column not in self.headers:
+                raise ValueError(
+                    f"Rows of several screeners cannot be merged in order '{self._order}': "
+                    f"the table has no '{column}' column"
+                )
+            result = sort_rows(result, column, descending=self._order.startswith("-"))
+
+        if "No." in self.headers:
+            for number, row in enumerate(result, 1):
+                row["No."] = str(number)
+
+        self._result = result
+        self._total_rows = len(result)
+        self._rows = min(rows or self._total_rows, self._total_rows)
+        return result[: self._rows]
+
+    def _merge_column(self):
         """
+        Private function used to return the column the rows of several screeners are sorted
+        by once merged. Raises ValueError for orders of no known column, as the merged rows
+        could not be sorted and a row limit would cut them at the wrong place.
+        """
+
+        # Without an order, FinViz sorts by ticker
+        code = self._order.lstrip("-") or "ticker"
+        if code not in ORDER_COLUMNS:
+            raise ValueError(
+                f"Rows of several screeners cannot be merged in order '{self._order}'"
+            )
+        return ORDER_COLUMNS[code]
+
+    def _update_parameters(self, tickers, filters, rows, order, signal, table, custom):
+        """ Private function used to add the given parameters to the query. """
 
         if tickers:
             [self._tickers.append(item) for item in tickers]
@@ -154,7 +648,7 @@ class Screener(object):
             [self._filters.append(item) for item in filters]
 
         if table:
-            self._table = self.__check_table(table)
+            self._table = self._check_table(table)
 
         if order:
             self._order = order
@@ -169,9 +663,6 @@ class Screener(object):
             self._custom = custom
 
         self.analysis = []
-        self.data = self.__search_screener()
-
-    add = __call__
 
     def __str__(self):
         """ Returns a readable representation of a table. """
@@ -210,8 +701,55 @@ class Screener(object):
 
     get = __getitem__
 
+    def iter_rows(self, ordered=True):
+        """
+        Yields the rows page by page as the responses arrive. Streaming screeners keep
+        no rows in memory, the others yield the rows already downloaded.
+
+        :param ordered: yield the pages in table order instead of the order they arrive in (async only)
+        :type ordered: bool
+        """
+
+        if not self._stream:
+            yield from self.data
+            return
+
+        for page in self._iter_pages(ordered):
+            self._write_rows(page)
+            yield from page
+        self._write_rows([], flush=True)
+
+    def _iter_pages(self, ordered=True):
+        """ Private function used to yield the rows of every page with the request method. """
+
+        if self._request_method == "async":
+            return self._connector().iter_results(ordered)
+        return self._iter_data_scrape(
+            scrape.get_table, self._page_urls(), self.headers, self._rows
+        )
+
+    async def astream(self, ordered=True):
+        """
+        Asynchronously yields the rows page by page as the responses arrive.
+        Non-streaming screeners yield the rows already downloaded.
+
+        :param ordered: yield the pages in table order instead of the order they arrive in
+        :type ordered: bool
+        """
+
+        if not self._stream:
+            for row in self.data:
+                yield row
+            return
+
+        async for page in self._connector().stream(ordered):
+            self._write_rows(page)
+            for row in page:
+                yield row
+        self._write_rows([], flush=True)
+
     @staticmethod
-    def __check_table(input_table):
+    def _check_table(input_table):
         """ Checks if the user input for table type is correct. Otherwise, raises an InvalidTableType error. """
 
         try:
@@ -221,10 +759,31 @@ class Screener(object):
             raise InvalidTableType(input_table)
 
     @staticmethod
-    def load_filter_dict(reload=True):
+    def _check_columns(columns):
+        """
+        Returns the Custom table ids of the given headers, preceded by No. and Ticker.
+        Raises an InvalidColumn error for headers that are not in the catalog.
+        """
+
+        column_ids = ["0", "1"]
+        for column in columns:
+            try:
+                column_id = COLUMNS[column]
+            except KeyError:
+                raise InvalidColumn(column)
+            if column_id not in column_ids:
+                column_ids.append(column_id)
+
+        return column_ids
+
+    @staticmethod
+    def load_filter_dict(reload=True, base_url=None):
         """
         Get dict of available filters. File containing json specification of filters will be built if it doesn't exist
         or if reload is False
+
+        :param base_url: base URL to request the filters from (eg. a stand-in server), whose filters are not saved
+        :type base_url: str
         """
 
         # Get location of filter.json
@@ -242,9 +801,7 @@ class Screener(object):
             "Chrome/23.0.1271.64 Safari/537.11"
         }
         url = "https://finviz.com/screener.ashx?ft=4"
-        req = urllib.request.Request(url, headers=hdr)
-        with urllib.request.urlopen(req) as response:
-            html = response.read().decode("utf-8")
+        html = get_client().get(rebase_url(url, base_url), headers=hdr).text
 
         # Parse html and locate table we are interested in.
         # Use one of the text values and get the parent table from that
@@ -295,7 +852,10 @@ class Screener(object):
             # Store current filter dict
             filter_dict[filter_text] = current_dict
 
-        # Save filter dict to finviz directory
+        # Save filter dict to finviz directory, only the filters of FinViz itself
+        if rebase_url(url, base_url) != url:
+            return filter_dict
+
         try:
             with open(json_file, "w") as fp:
                 json.dump(filter_dict, fp)
@@ -305,14 +865,44 @@ class Screener(object):
 
         return filter_dict
 
-    def to_sqlite(self, filename):
+    def to_sqlite(self, filename, mode="append", snapshot_date=None):
         """Exports the generated table into a SQLite database.
 
         :param filename: SQLite database file path
         :type filename: str
+        :param mode: 'append' adds the rows, 'upsert' replaces the rows of the same Ticker and snapshot date
+        :type mode: str
+        :param snapshot_date: date of the rows eg.: '2024-01-02', today if omitted
+        :type snapshot_date: str
+        """
+
+        export_to_db(self.headers, self.data, filename, mode, snapshot_date)
+
+    def to_result(self):
+        """Returns the generated table as a ScreenerResult, with one typed array per column:
+        numbers parsed into float64 (NaN for '-') and Sector, Industry and Country as categoricals.
         """
 
-        export_to_db(self.headers, self.data, filename)
+        return ScreenerResult(self.headers, self.data)
+
+    def to_snapshot_store(self, store, ts=None):
+        """Stores the generated table, with the ticker details if downloaded, as a snapshot.
+        Returns the number of values that changed since the previous snapshot.
+
+        :param store: snapshot store or the path of its SQLite file
+        :type store: SnapshotStore or str
+        :param ts: time of the snapshot, now if omitted
+        :type ts: datetime.datetime or str
+        """
+
+        if isinstance(store, str):
+            store = SnapshotStore(store)
+            try:
+                return store.add(self.data, ts)
+            finally:
+                store.close()
+
+        return store.add(self.data, ts)
 
     def to_csv(self, filename: str):
         """Exports the generated table into a CSV file.
@@ -326,25 +916,18 @@ class Screener(object):
             filename = filename[:-4]
 
         if len(self.analysis) > 0:
-            export_to_csv(
-                [
-                    "ticker",
-                    "date",
-                    "category",
-                    "analyst",
-                    "rating",
-                    "price_from",
-                    "price_to",
-                ],
-                self.analysis,
-                f"{filename}-analysts.csv",
-            )
+            export_to_csv(ANALYSIS_HEADERS, self.analysis, f"{filename}-analysts.csv")
 
         return export_to_csv(self.headers, self.data, f"{filename}.csv")
 
-    def get_charts(self, period="d", size="l", chart_type="c", ta="1"):
+    def get_charts(
+        self, period="d", size="l", chart_type="c", ta="1", directory="charts", workers=None
+    ):
         """
-        Downloads the charts of all tickers shown by the table.
+        Downloads the charts of all tickers shown by the table, from a pool of threads, into a
+        directory of images named by their content. Images that did not change since the last
+        download are not written again, and the manifest of each ticker lists its images.
+        Returns the manifest entry of every chart.
 
         :param period: table period eg. : 'd', 'w' or 'm' for daily, weekly and monthly periods
         :type period: str
@@ -354,19 +937,30 @@ class Screener(object):
         :type chart_type: str
         :param ta: technical analysis eg.: '1' to show ta '0' to hide ta
         :type ta: str
+        :param directory: directory of the images and of the manifests
+        :type directory: str
+        :param workers: charts downloaded at once, THREAD_WORKERS by default
+        :type workers: int
         """
 
         encoded_payload = urlencode(
             {"ty": chart_type, "ta": ta, "p": period, "s": size}
         )
 
-        sequential_data_scrape(
-            scrape.download_chart_image,
-            [
-                f"https://finviz.com/chart.ashx?{encoded_payload}&t={row.get('Ticker')}"
-                for row in self.data
-            ],
-            self._user_agent,
+        return list(
+            iter_streamed_data_scrape(
+                scrape.download_chart_image,
+                [
+                    rebase_url(
+                        f"https://finviz.com/chart.ashx?{encoded_payload}&t={row.get('Ticker')}",
+                        self._base_url,
+                    )
+                    for row in self.data
+                ],
+                self._user_agent,
+                workers=workers,
+                store=ChartStore(directory),
+            )
         )
 
     def get_ticker_details(self):
@@ -374,34 +968,76 @@ class Screener(object):
         Downloads the details of all tickers shown by the table.
         """
 
-        ticker_data = sequential_data_scrape(
-            scrape.download_ticker_details,
-            [
-                f"https://finviz.com/quote.ashx?&t={row.get('Ticker')}"
-                for row in self.data
-            ],
-            self._user_agent,
+        # Details are merged page by page as they are downloaded
+        ticker_data = self._iter_data_scrape(
+            scrape.download_ticker_details, self._ticker_urls()
         )
 
-        for entry in ticker_data:
-            for key, value in entry.items():
-                for ticker_generic in self.data:
-                    if ticker_generic.get("Ticker") == key:
-                        if "Sales" not in self.headers:
-                            self.headers.extend(list(value[0].keys()))
+        return self._merge_ticker_details(ticker_data)
+
+    def _ticker_urls(self):
+        """ Private function used to return the quote page URL addresses of all tickers. """
+
+        return [
+            rebase_url(
+                f"https://finviz.com/quote.ashx?&t={row.get('Ticker')}", self._base_url
+            )
+            for row in self.data
+        ]
+
+    def _merge_ticker_details(self, ticker_data):
+        """ Private function used to merge downloaded ticker details into the table. """
 
-                        ticker_generic.update(value[0])
-                        self.analysis.extend(value[1])
+        merge = self._ticker_details_merger()
+        self.analysis.extend(
+            itertools.chain.from_iterable(merge(entry) for entry in ticker_data)
+        )
+        if self._ratings_sink is not None:
+            self._ratings_sink.flush()
 
         return self.data
 
+    def _ticker_details_merger(self):
+        """
+        Private function used to return a function that merges one downloaded entry of
+        ticker details into the table and returns its analyst ratings. The rows are
+        indexed by ticker once, so that each entry is merged in constant time.
+        """
+
+        rows_by_ticker = {}
+        for row in self.data:
+            rows_by_ticker.setdefault(row.get("Ticker"), []).append(row)
+        known_headers = set(self.headers)
+
+        def merge(entry):
+            analysis = []
+            for ticker, (details, ratings) in entry.items():
+                rows = rows_by_ticker.get(ticker)
+                if rows is None:
+                    continue
+
+                if not known_headers.issuperset(details):
+                    new_headers = [key for key in details if key not in known_headers]
+                    self.headers.extend(new_headers)
+                    known_headers.update(new_headers)
+
+                for row in rows:
+                    row.update(details)
+                analysis.extend(ratings)
+
+            if self._ratings_sink is not None and analysis:
+                self._ratings_sink.write(analysis, ANALYSIS_HEADERS)
+            return analysis
+
+        return merge
+
     def __check_rows(self):
         """
         Checks if the user input for row number is correct.
         Otherwise, modifies the number or raises NoResults error.
         """
 
-        self._total_rows = scrape.get_total_rows(self._page_content)
+        self._total_rows, self._total_pages = scrape.get_pagination(self._page_content)
 
         if self._total_rows == 0:
             raise NoResults(self._url.split("?")[1])
@@ -425,47 +1061,181 @@ class Screener(object):
         
         return headers
 
-    def __search_screener(self):
-        """ Private function used to return data from the FinViz screener. """
+    def _iter_data_scrape(self, scrape_func, urls, *args, offload=True):
+        """
+        Private function used to request the URLs synchronously, from a pool of threads
+        if the request method is 'threaded' and one by one otherwise, and to yield the
+        scraped data of each page in order. Unless offload is False, the pages are parsed
+        by the PARSE_WORKERS processes if there are any.
+        """
 
-        self._page_content, self._url = http_request_get(
-            "https://finviz.com/screener.ashx",
-            payload={
-                "v": self._table,
-                "t": ",".join(self._tickers),
-                "f": ",".join(self._filters),
-                "o": self._order,
-                "s": self._signal,
-                "c": ",".join(self._custom),
-            },
-            user_agent=self._user_agent,
+        parse_workers = connection_settings["PARSE_WORKERS"] if offload else 0
+
+        if self._request_method == "threaded":
+            return iter_threaded_data_scrape(
+                scrape_func, urls, self._user_agent, *args, parse_workers=parse_workers
+            )
+        return iter_data_scrape(
+            scrape_func, urls, self._user_agent, *args, parse_workers=parse_workers
+        )
+
+    def _data_scrape(self, scrape_func, urls, *args, offload=True):
+        """ Private function used to return the scraped data of every URL in a list. """
+
+        return list(self._iter_data_scrape(scrape_func, urls, *args, offload=offload))
+
+    def _page_urls(self):
+        """ Private function used to return the URL addresses of all the pages to request. """
+
+        return scrape.get_page_urls(
+            self._page_content, self._rows, self._url, self._total_pages
         )
 
+    def _connector(self, urls=None):
+        """ Private function used to return a Connector over the pages, all of them by default. """
+
+        return Connector(
+            scrape.get_table,
+            self._page_urls() if urls is None else urls,
+            self._user_agent,
+            self.headers,
+            self._rows,
+            css_select=True,
+            base_url=self._base_url,
+            parse_workers=connection_settings["PARSE_WORKERS"],
+        )
+
+    def _fetch_pages(self, page_numbers):
+        """ Private function used to return the rows of each of the given 0-based page numbers. """
+
+        urls = [f"{self._url}&r={1 + number * ROWS_PER_PAGE}" for number in page_numbers]
+
+        if self._request_method == "async":
+            pages = self._connector(urls).run_connector()
+        else:
+            pages = self._data_scrape(scrape.get_table, urls, self.headers)
+
+        for page in pages:
+            self._write_rows(page)
+        self._write_rows([], flush=True)
+        return pages
+
+    def _screener_payload(self):
+        """ Private function used to return the query string parameters of the screener. """
+
+        return {
+            "v": self._table,
+            "t": ",".join(self._tickers),
+            "f": ",".join(self._filters),
+            "o": self._order,
+            "s": self._signal,
+            "c": ",".join(self._custom),
+        }
+
+    def _read_first_page(self, page_content, url):
+        """ Private function used to read the row count and headers from the first page. """
+
+        self._page_content, self._url = page_content, url
         self._rows = self.__check_rows()
         self.headers = self.__get_table_headers()
 
-        if self._request_method == "async":
-            async_connector = Connector(
-                scrape.get_table,
-                scrape.get_page_urls(self._page_content, self._rows, self._url),
-                self._user_agent,
-                self.headers,
-                self._rows,
-                css_select=True,
+    def _query_key(self):
+        """ Private function used to return the canonical key of the query in the query cache. """
+
+        return QueryCache.key(
+            self._table,
+            self._filters,
+            self._tickers,
+            self._signal,
+            self._custom,
+            self._order,
+            self._rows,
+            rebase_url(SCREENER_URL, self._base_url),
+        )
+
+    def _cached_search(self, key):
+        """
+        Private function used to return the rows of the query from the query cache and
+        restore the state of the first page, or None if the query is not cached.
+        """
+
+        cache = get_query_cache()
+        if cache is None or self._stream or self._lazy:
+            return None
+
+        result = cache.get(key)
+        if result is None:
+            return None
+
+        self._page_content = None
+        self._url = result["url"]
+        self._rows = result["rows"]
+        self._total_rows = result["total_rows"]
+        self._total_pages = result["total_pages"]
+        self.headers = result["headers"]
+        return result["data"]
+
+    def _cache_search(self, key, data):
+        """ Private function used to store the rows of the query in the query cache. """
+
+        cache = get_query_cache()
+        if cache is None or self._stream or self._lazy:
+            return
+
+        cache.put(
+            key,
+            {
+                "url": self._url,
+                "rows": self._rows,
+                "total_rows": self._total_rows,
+                "total_pages": self._total_pages,
+                "headers": self.headers,
+                "data": data,
+            },
+        )
+
+    def __search_screener(self):
+        """ Private function used to return data from the FinViz screener. """
+
+        key = self._query_key()
+        data = self._cached_search(key)
+        if data is not None:
+            self._write_rows(data, flush=True)
+            self._result = data
+            return data
+
+        self._read_first_page(
+            *http_request_get(
+                rebase_url(SCREENER_URL, self._base_url),
+                payload=self._screener_payload(),
+                user_agent=self._user_agent,
             )
-            pages_data = async_connector.run_connector()
+        )
+
+        if self._stream:
+            return []
+
+        if self._lazy:
+            first_page = scrape.get_table(self._page_content, self.headers, self._rows)
+            self._write_rows(first_page, flush=True)
+            return LazyRows(self._fetch_pages, self._rows, first_page)
+
+        # With a sink, the pages are written as they are parsed
+        if self._request_method == "async" and self._sink is not None:
+            pages_data = self._connector().iter_results()
+        elif self._request_method == "async":
+            pages_data = self._connector().run_connector()
         else:
-            pages_data = sequential_data_scrape(
-                scrape.get_table,
-                scrape.get_page_urls(self._page_content, self._rows, self._url),
-                self._user_agent,
-                self.headers,
-                self._rows,
+            pages_data = self._iter_data_scrape(
+                scrape.get_table, self._page_urls(), self.headers, self._rows
             )
 
         data = []
         for page in pages_data:
-            for row in page:
-                data.append(row)
+            self._write_rows(page)
+            data.extend(page)
+        self._write_rows([], flush=True)
 
+        self._cache_search(key, data)
+        self._result = data
         return data
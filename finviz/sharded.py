@@ -0,0 +1,171 @@
+from user_agent import generate_user_agent
+
+from finviz.helper_functions.error_handling import InvalidShardCategory
+from finviz.helper_functions.request_functions import run_sync
+from finviz.merged import MergedScreener
+from finviz.screener import Screener
+
+# Filter categories whose options split a screener into disjoint shards
+SHARD_CATEGORIES = ("Exchange", "Sector")
+
+
+def shard_filters(category, base_url=None):
+    """
+    Returns the filter of every option of a category of load_filter_dict, eg.: for 'Sector'
+    ['sec_basicmaterials', 'sec_communicationservices', ...]
+
+    :param category: filter category, 'Exchange' or 'Sector'
+    :type category: str
+    :param base_url: base URL to request the filters from if they are not saved, eg. a stand-in server
+    :type base_url: str
+    """
+
+    if category not in SHARD_CATEGORIES:
+        raise InvalidShardCategory(category)
+
+    # The 'Any' option has no value, eg.: 'sec_'
+    options = Screener.load_filter_dict(base_url=base_url)[category]
+    return [option for option in options.values() if not option.endswith("_")]
+
+
+class ShardedScreener(MergedScreener):
+    """
+    Used to download a broad screener as disjoint shards, one per exchange or sector, instead
+    of one chain of hundreds of pages. The shards are downloaded concurrently over one session,
+    with the default 'async' request method, and their rows are merged. With the query cache enabled every shard is cached on its own,
+    so a shard that failed or is refreshed is the only one downloaded again, and the shards
+    answer the queries of a single exchange or sector too. Example usage:
+
+    stock_list = ShardedScreener(filters=['ind_stocksonly'], shard_by='Sector')
+    stock_list.refresh('sec_technology')
+    """
+
+    def __init__(
+        self,
+        tickers=None,
+        filters=None,
+        rows=None,
+        order="",
+        signal="",
+        table=None,
+        custom=None,
+        user_agent=generate_user_agent(),
+        request_method="async",
+        stream=False,
+        base_url=None,
+        lazy=False,
+        columns=None,
+        sink=None,
+        ratings_sink=None,
+        shard_by="Sector",
+        shards=None,
+    ):
+        """
+        Downloads the shards. Takes the same parameters as finviz.screener.Screener
+        (see MergedScreener for the request methods, streaming and lazy rows), plus:
+
+        :param shard_by: filter category splitting the query, 'Exchange' or 'Sector'
+        :type shard_by: str
+        :param shards: filters of the shards, the options of the shard_by category if omitted
+        :type shards: list
+        :var self.shards: screener of each shard filter, None for the shards without results
+        :type self.shards: dict
+        """
+
+        if columns:
+            custom = self._check_columns(columns)
+
+        self._init_parameters(
+            tickers,
+            filters,
+            rows,
+            order,
+            signal,
+            table,
+            custom,
+            user_agent,
+            request_method,
+            stream,
+            base_url,
+            lazy,
+            sink,
+            ratings_sink,
+        )
+        self._shard_filters = (
+            shard_filters(shard_by, self._base_url) if shards is None else list(shards)
+        )
+        self._row_limit = rows
+
+        self.shards = {}
+        self.headers = []
+        self.data = run_sync(self.search())
+
+    def __call__(
+        self,
+        tickers=None,
+        filters=None,
+        rows=None,
+        order="",
+        signal="",
+        table=None,
+        custom=None,
+    ):
+        """
+        Adds more filters to the screener and downloads its shards again.
+        Only a new order or row limit is applied to the downloaded rows if possible.
+        """
+
+        self._row_limit = rows or self._row_limit
+
+        only_reordered = (order or rows) and not (
+            tickers or filters or signal or table or custom
+        )
+        if only_reordered and self._reorder(order, rows):
+            return
+
+        self._update_parameters(tickers, filters, rows, order, signal, table, custom)
+        self._restart_sinks()
+        self.data = run_sync(self.search())
+
+    add = __call__
+
+    async def search(self, session=None):
+        """
+        Downloads the shards, concurrently over one asynchronous session with the 'async'
+        request method, and returns the merged rows. A query already filtered by the
+        category of the shards is downloaded as a single shard.
+
+        :param session: asynchronous session to send the requests with, a new one is used if omitted
+        :type session: aiohttp.ClientSession
+        """
+
+        categories = {shard.split("_")[0] for shard in self._shard_filters}
+        if any(item.split("_")[0] in categories for item in self._filters):
+            shards = [None]
+        else:
+            shards = self._shard_filters
+
+        screeners = await self._search_queries(self.__queries(shards), session)
+        self.shards = dict(zip(shards, screeners))
+        return self._merge_screeners(self.shards.values())
+
+    def refresh(self, *shards):
+        """
+        Downloads the given shards again, skipping the query cache, and merges them with the others.
+
+        :param shards: shard filters eg.: 'sec_technology'
+        :type shards: str
+        """
+
+        self._restart_sinks()
+        screeners = run_sync(self._search_queries(self.__queries(shards), refresh=True))
+        self.shards.update(zip(shards, screeners))
+        self.data = self._merge_screeners(self.shards.values())
+        return self.data
+
+    def __queries(self, shards):
+        """ Private function used to return the query of each shard filter. """
+
+        return [
+            (self._tickers, self._filters + ([shard] if shard else [])) for shard in shards
+        ]
@@ -0,0 +1,5 @@
+from finviz.testing.fixtures import (FixtureStore, record_fixtures,
+                                     synthetic_universe)
+from finviz.testing.pages import (render_filters_page, render_news_page,
+                                  render_quote_page, render_screener_page)
+from finviz.testing.server import StandInServer
@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import random
+from urllib.parse import urlsplit
+
+from user_agent import generate_user_agent
+
+import finviz.helper_functions.scraper_functions as scrape
+from finviz.helper_functions.request_functions import get_client
+from finviz.helper_functions.response_cache import ResponseCache
+from finviz.main_func import CRYPTO_URL, NEWS_URL, STOCK_URL
+from finviz.screener import Screener
+
+SYNTHETIC_HEADERS = [
+    "No.",
+    "Ticker",
+    "Company",
+    "Sector",
+    "Industry",
+    "Country",
+    "Market Cap",
+    "P/E",
+    "Price",
+    "Change",
+    "Volume",
+]
+
+
+class FixtureStore:
+    """ Directory of recorded FinViz responses, indexed by their normalized request. """
+
+    def __init__(self, directory):
+        """
+        :param directory: directory the fixtures and their index.json are stored in
+        :type directory: str
+        """
+
+        self.directory = directory
+        self._index_file = os.path.join(directory, "index.json")
+
+        if os.path.isfile(self._index_file):
+            with open(self._index_file, "r") as fp:
+                self.index = json.load(fp)
+        else:
+            self.index = {}
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, url):
+        return self.key(url) in self.index
+
+    @staticmethod
+    def key(url):
+        """ Returns the host-independent key of a request eg.: 'quote.ashx?t=AAPL'. """
+
+        parts = urlsplit(ResponseCache.key(url))
+        key = parts.path.lstrip("/")
+        return f"{key}?{parts.query}" if parts.query else key
+
+    def save(self, url, body):
+        """ Stores the body of a response. """
+
+        key = self.key(url)
+        endpoint = key.split("?")[0].replace(".ashx", "")
+        file_name = f"{endpoint}-{hashlib.sha1(key.encode()).hexdigest()[:12]}.html"
+
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, file_name), "wb") as handle:
+            handle.write(body)
+
+        self.index[key] = file_name
+        with open(self._index_file, "w") as fp:
+            json.dump(self.index, fp, indent=1, sort_keys=True)
+
+    def load(self, url):
+        """ Returns the recorded body of a request, or None. """
+
+        file_name = self.index.get(self.key(url))
+        if file_name is None:
+            return None
+
+        with open(os.path.join(self.directory, file_name), "rb") as handle:
+            return handle.read()
+
+    def keys(self, endpoint=None):
+        """ Returns the recorded keys, optionally of one endpoint eg.: 'quote.ashx'. """
+
+        return [
+            key
+            for key in sorted(self.index)
+            if endpoint is None or key.split("?")[0] == endpoint
+        ]
+
+
+def record_fixtures(
+    directory,
+    filters=None,
+    table="Overview",
+    tickers=None,
+    max_quotes=20,
+    news=True,
+    crypto=True,
+    user_agent=generate_user_agent(),
+):
+    """
+    Downloads FinViz pages and records them as fixtures: every page of a screener,
+    the quote pages of some tickers and, optionally, the news and crypto pages.
+
+    :param directory: directory of the fixture store
+    :type directory: str
+    :param filters: screener filters eg.: ['exch_nasd', 'idx_sp500']
+    :type filters: list
+    :param table: screener table type eg.: 'Performance'
+    :type table: str
+    :param tickers: tickers whose quote pages are recorded, defaults to the first screener rows
+    :type tickers: list
+    :param max_quotes: number of screener rows whose quote pages are recorded if no tickers are given
+    :type max_quotes: int
+    :return: the fixture store
+    :rtype: FixtureStore
+    """
+
+    store = FixtureStore(directory)
+
+    def record(url):
+        response = get_client().get(url, headers={"User-Agent": user_agent})
+        response.raise_for_status()
+        store.save(url, response.content)
+        return response
+
+    screener = Screener(filters=filters, table=table, user_agent=user_agent, stream=True)
+    first_page = record(screener._url)
+    for url in screener._page_urls():
+        record(url)
+
+    if tickers is None:
+        rows = scrape.get_table(first_page, screener.headers)
+        tickers = [row["Ticker"] for row in rows[:max_quotes]]
+
+    for ticker in tickers:
+        record(f"{STOCK_URL}?t={ticker}")
+
+    if news:
+        record(NEWS_URL)
+    if crypto:
+        record(CRYPTO_URL)
+
+    return store
+
+
+def synthetic_universe(size, seed=0):
+    """
+    Returns the headers and rows of a made-up screener of a given size,
+    shaped like the FinViz Overview table.
+
+    :param size: number of rows
+    :type size: int
+    """
+
+    rng = random.Random(seed)
+    sectors = ["Technology", "Healthcare", "Financial", "Energy", "Utilities"]
+    rows = []
+
+    for number in range(1, size + 1):
+        sector = rng.choice(sectors)
+        rows.append(
+            [
+                str(number),
+                f"T{number:05d}",
+                f"Company {number} Inc",
+                sector,
+                f"{sector} Services",
+                rng.choice(["USA", "China", "Canada"]),
+                f"{rng.uniform(0.05, 900):.2f}{rng.choice('MB')}",
+                rng.choice(["-", f"{rng.uniform(1, 90):.2f}"]),
+                f"{rng.uniform(1, 500):.2f}",
+                f"{rng.uniform(-9, 9):.2f}%",
+                f"{rng.randint(1000, 90000000):,}",
+            ]
+        )
+
+    return list(SYNTHETIC_HEADERS), rows
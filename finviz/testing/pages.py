@@ -0,0 +1,157 @@
+from html import escape
+
+ROWS_PER_PAGE = 20
+
+
+def render_screener_page(headers, rows, offset=1):
+    """
+    Returns a screener.ashx page in FinViz markup showing the 20 rows that start at an offset.
+
+    :param headers: table headers eg.: ['No.', 'Ticker', 'Company']
+    :type headers: list
+    :param rows: all the rows of the screener, as lists of strings in header order
+    :type rows: list
+    :param offset: 1-based position of the first row, as in the `r` query parameter
+    :type offset: int
+    """
+
+    total = len(rows)
+    pages = max(1, -(-total // ROWS_PER_PAGE))
+    options = "".join(
+        f'<option value="{1 + (page - 1) * ROWS_PER_PAGE}">Page {page}/{pages}</option>'
+        for page in range(1, pages + 1)
+    )
+    header_cells = "".join(f"<th>{escape(header)}</th>" for header in headers)
+    body_rows = "".join(
+        '<tr valign="top">'
+        + "".join(f"<td><a>{escape(value)}</a></td>" for value in row)
+        + "</tr>"
+        for row in rows[offset - 1 : offset - 1 + ROWS_PER_PAGE]
+    )
+
+    return (
+        "<html><body><table>"
+        f'<tr><td><div class="count-text whitespace-nowrap">#1 / {total} Total</div></td></tr>'
+        f'<tr><td><select id="pageSelect">{options}</select></td></tr>'
+        "<tr><td><table>"
+        f'<tr valign="middle">{header_cells}</tr>{body_rows}'
+        "</table></td></tr></table></body></html>"
+    )
+
+
+def render_quote_page(ticker, title, snapshot, ratings=(), news=(), insiders=()):
+    """
+    Returns a quote.ashx page in FinViz markup.
+
+    :param ticker: stock symbol
+    :type ticker: str
+    :param title: company, sector, industry, country and website
+    :type title: dict
+    :param snapshot: pairs of snapshot table labels and values, 6 pairs per table row
+    :type snapshot: list
+    :param ratings: analyst ratings as (date, category, analyst, rating, price) tuples
+    :type ratings: list
+    :param news: news as (timestamp, headline, url, source) tuples, timestamp eg.: 'Jan-02-24 09:30AM'
+    :type news: list
+    :param insiders: insider transactions as dictionaries with the same keys
+    :type insiders: list
+    """
+
+    links = [title.get("Website") or f"quote.ashx?t={ticker}"] + [
+        f"screener.ashx?f={key.lower()}" for key in ("Sector", "Industry", "Country")
+    ]
+    title_links = " | ".join(
+        f'<a class="tab-link" href="{escape(link)}">{escape(title[key])}</a>'
+        for link, key in zip(links, ("Company", "Sector", "Industry", "Country"))
+    )
+
+    snapshot_rows = "".join(
+        '<tr class="table-dark-row">'
+        + "".join(
+            f"<td>{escape(label)}</td><td><b>{escape(value)}</b></td>"
+            for label, value in snapshot[start : start + 6]
+        )
+        + "</tr>"
+        for start in range(0, len(snapshot), 6)
+    )
+
+    rating_rows = "".join(
+        "<tr>" + "".join(f"<td>{escape(value)}</td>" for value in rating) + "</tr>"
+        for rating in ratings
+    )
+
+    news_rows = []
+    last_date = None
+    for timestamp, headline, url, source in news:
+        date, time = timestamp.split(" ")
+        shown = time if date == last_date else timestamp
+        last_date = date
+        news_rows.append(
+            f"<tr><td>{shown}&nbsp;&nbsp;</td><td>"
+            f'<div class="news-link-left"><a class="tab-link-news" href="{escape(url)}">{escape(headline)}</a></div>'
+            f'<div class="news-link-right"><span>({escape(source)})</span></div>'
+            "</td></tr>"
+        )
+
+    insider_rows = ""
+    if insiders:
+        insider_headers = list(insiders[0].keys())
+        insider_rows = (
+            '<table class="body-table insider-trading-table"><tr>'
+            + "".join(f"<td>{escape(header)}</td>" for header in insider_headers)
+            + "</tr>"
+            + "".join(
+                "<tr>"
+                + "".join(f"<td>{escape(insider[key])}</td>" for key in insider_headers)
+                + "</tr>"
+                for insider in insiders
+            )
+            + "</table>"
+        )
+
+    return (
+        "<html><body>"
+        f'<table class="fullview-title"><tr><td>{title_links}</td></tr></table>'
+        f'<table class="snapshot-table2">{snapshot_rows}</table>'
+        f'<table class="js-table-ratings fullview-ratings-outer">{rating_rows}</table>'
+        f'<table id="news-table">{"".join(news_rows)}</table>'
+        f"{insider_rows}</body></html>"
+    )
+
+
+def render_news_page(news):
+    """
+    Returns a news.ashx page in FinViz markup.
+
+    :param news: news as (time, headline, url) tuples
+    :type news: list
+    """
+
+    rows = "".join(
+        f'<tr><td class="nn-date">{escape(time)}</td>'
+        f'<td><a class="nn-tab-link" href="{escape(url)}">{escape(headline)}</a></td></tr>'
+        for time, headline, url in news
+    )
+    return f"<html><body><table>{rows}</table></body></html>"
+
+
+def render_filters_page(filters):
+    """
+    Returns the screener.ashx?ft=4 page in FinViz markup, listing the options of every filter.
+
+    :param filters: options of each filter eg.: {'Exchange': ('exch', {'AMEX': 'amex'})}
+    :type filters: dict
+    """
+
+    rows = "".join(
+        f"<tr><td>{escape(name)}</td><td><select data-filter=\"{escape(prefix)}\">"
+        '<option value="">Any</option>'
+        + "".join(
+            f'<option value="{escape(value)}">{escape(text)}</option>'
+            for text, value in options.items()
+        )
+        + "</select></td></tr>"
+        for name, (prefix, options) in filters.items()
+    )
+    # The last pair of cells of the table is not a filter
+    return f"<html><body><table>{rows}<tr><td></td><td></td></tr></table></body></html>"
@@ -0,0 +1,216 @@
+import argparse
+import random
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from finviz.testing.fixtures import FixtureStore, synthetic_universe
+from finviz.testing.pages import render_screener_page
+
+PNG_SIGNATURE = b"\x89PNG"
+
+
+class StandInServer:
+    """
+    Local HTTP server that answers like FinViz from recorded fixtures. Example usage:
+
+    with StandInServer(FixtureStore("fixtures"), latency=0.05, throttle_rate=0.01) as server:
+        stock_list = Screener(filters=['exch_nasd'], base_url=server.url)
+    """
+
+    def __init__(
+        self,
+        store=None,
+        screener=None,
+        latency=0.0,
+        jitter=0.0,
+        throttle_rate=0.0,
+        rate_limit=None,
+        throttle_status=200,
+        failure_rate=0.0,
+        seed=None,
+        host="127.0.0.1",
+        port=0,
+    ):
+        """
+        :param store: recorded responses to serve
+        :type store: FixtureStore
+        :param screener: headers and rows of a synthetic table served for screener pages that are not recorded
+        :type screener: tuple
+        :param latency: seconds every response is delayed by
+        :type latency: float
+        :param jitter: maximum number of seconds randomly added to the latency
+        :type jitter: float
+        :param throttle_rate: share of requests answered with "Too many requests."
+        :type throttle_rate: float
+        :param rate_limit: number of requests per second above which requests are throttled
+        :type rate_limit: float
+        :param throttle_status: HTTP status of throttled responses (FinViz answers 200, some proxies 429)
+        :type throttle_status: int
+        :param failure_rate: share of requests answered with 500 Internal Server Error
+        :type failure_rate: float
+        :param seed: seed of the random throttles, failures and jitter
+        :type seed: int
+        """
+
+        self.store = store
+        self.screener = screener
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.rate_limit = rate_limit
+        self.throttle_status = throttle_status
+        self.failure_rate = failure_rate
+
+        self.requests = 0
+        self.throttled = 0
+        self.failed = 0
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._recent = deque()
+        self._httpd = ThreadingHTTPServer((host, port), self.__handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        """ Returns the base URL to pass as `base_url` or the BASE_URL connection setting. """
+
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """ Starts serving from a background thread. """
+
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """ Stops serving and closes the socket. """
+
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def respond(self, path):
+        """
+        Returns the status code and the body answering a request path.
+
+        :param path: requested path with its query string eg.: '/quote.ashx?t=AAPL'
+        :type path: str
+        """
+
+        with self._lock:
+            self.requests += 1
+            now = time.monotonic()
+            self._recent.append(now)
+            while self._recent and self._recent[0] < now - 1:
+                self._recent.popleft()
+
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            failed = self._random.random() < self.failure_rate
+            throttled = self._random.random() < self.throttle_rate or (
+                self.rate_limit is not None and len(self._recent) > self.rate_limit
+            )
+            if failed:
+                self.failed += 1
+            elif throttled:
+                self.throttled += 1
+
+        if delay:
+            time.sleep(delay)
+
+        if failed:
+            return 500, b"Internal Server Error"
+        if throttled:
+            return self.throttle_status, b"Too many requests."
+
+        body = self.store.load(path) if self.store is not None else None
+        if body is not None:
+            return 200, body
+
+        parts = urlsplit(path)
+        endpoint = parts.path.lstrip("/")
+
+        if endpoint == "screener.ashx" and self.screener is not None:
+            offset = int(parse_qs(parts.query).get("r", ["1"])[0])
+            return 200, render_screener_page(*self.screener, offset).encode("utf-8")
+
+        # Unrecorded requests of a recorded endpoint (eg. another ticker) get a recorded page
+        keys = self.store.keys(endpoint) if self.store is not None else []
+        if keys:
+            return 200, self.store.load(keys[0])
+
+        return 404, b"Not Found"
+
+    def __handler(self):
+        """ Returns the request handler class bound to this server. """
+
+        server = self
+
+        class StandInHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep connections alive like FinViz does
+
+            def do_GET(self):
+                status, body = server.respond(self.path)
+                self.send_response(status)
+                # Charts are PNG images, throttles and every other page HTML like on FinViz
+                if body.startswith(PNG_SIGNATURE):
+                    content_type = "image/png"
+                else:
+                    content_type = "text/html; charset=utf-8"
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return StandInHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded FinViz fixtures.")
+    parser.add_argument("fixtures", nargs="?", default="", help="fixture directory")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=None)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--synthetic-rows",
+        type=int,
+        default=0,
+        help="serve a made-up screener of this many rows for unrecorded screener pages",
+    )
+    args = parser.parse_args()
+
+    server = StandInServer(
+        FixtureStore(args.fixtures) if args.fixtures else None,
+        screener=synthetic_universe(args.synthetic_rows)
+        if args.synthetic_rows
+        else None,
+        latency=args.latency,
+        jitter=args.jitter,
+        throttle_rate=args.throttle_rate,
+        rate_limit=args.rate_limit,
+        failure_rate=args.failure_rate,
+        port=args.port,
+    )
+    print(f"Serving FinViz stand-in on {server.url}")
+    server._httpd.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import time
+
+from finviz.helper_functions.query_cache import QueryCache
+
+
+def test_key_is_canonical():
+    """ Verifies filters and tickers are keyed regardless of their order. """
+
+    key = QueryCache.key(
+        "111", ["sec_technology", "exch_nasd"], ["MSFT", "AAPL"], "", [], "-price"
+    )
+    assert key == QueryCache.key(
+        "111", ["exch_nasd", "sec_technology"], ["AAPL", "MSFT"], "", [], "-price"
+    )
+    assert key != QueryCache.key("111", ["exch_nasd"], ["AAPL", "MSFT"], "", [], "-price")
+    assert QueryCache.key("152", [], [], "", ["0", "1"], "") != QueryCache.key(
+        "152", [], [], "", ["1", "0"], ""
+    )
+
+
+def test_results_expire_and_are_evicted(tmp_path):
+    """ Verifies the TTL, the LRU eviction and the sharing through the SQLite file. """
+
+    cache = QueryCache(ttl=60, max_entries=2, path=str(tmp_path / "queries.sqlite3"))
+    cache.put("a", {"data": [1]})
+    cache.put("b", {"data": [2]})
+    assert cache.get("a") == {"data": [1]}  # "b" is now the least recently used
+    cache.put("c", {"data": [3]})
+
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+    other_process = QueryCache(ttl=60, max_entries=2, path=cache.path)
+    assert other_process.get("c") == {"data": [3]}
+
+    other_process.ttl = 0.01
+    time.sleep(0.02)
+    assert other_process.get("c") is None
+    assert cache.get("c") == {"data": [3]}
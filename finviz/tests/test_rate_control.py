@@ -0,0 +1,46 @@
+from finviz.helper_functions.rate_control import AdaptiveLimiter, get_limiter
+
+
+def test_limiter_grows_on_healthy_responses():
+    """ Verifies the window and the rate grow while responses are healthy. """
+
+    limiter = AdaptiveLimiter(max_window=8, initial_window=2, rate=1000, max_rate=2000)
+
+    assert limiter.try_acquire() == 0
+    assert limiter.try_acquire() == 0
+    assert limiter.try_acquire() > 0  # The window is full
+
+    for _ in range(20):
+        limiter.in_flight += 1
+        limiter.release(0.0)
+
+    assert limiter.window == 8
+    assert limiter.rate > 1000
+    assert limiter.completed == 20
+    assert limiter.in_flight == 2
+
+
+def test_limiter_backs_off_once_per_congestion_event():
+    """ Verifies throttled responses sent before the last decrease do not shrink the window again. """
+
+    limiter = AdaptiveLimiter(max_window=16, initial_window=16, rate=100)
+
+    sent = []
+    for _ in range(3):
+        assert limiter.try_acquire() == 0
+        sent.append(limiter._updated)
+
+    for sent_at in sent:
+        limiter.release(sent_at, throttled=True)
+
+    assert limiter.window == 8
+    assert limiter.rate == 50
+    assert limiter.throttled == 3
+    assert limiter.try_acquire() > 0  # The bucket is emptied after a throttle
+
+
+def test_requests_to_a_host_share_one_limiter():
+    """ Verifies every caller gets the same limiter for a host and its own for another. """
+
+    assert get_limiter("finviz.com") is get_limiter("finviz.com")
+    assert get_limiter("finviz.com") is not get_limiter("elite.finviz.com")
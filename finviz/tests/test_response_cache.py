@@ -0,0 +1,72 @@
+import os
+
+from finviz.helper_functions.response_cache import ResponseCache
+
+
+def test_cache_key_is_normalized(tmp_path):
+    """ Verifies the same request with reordered or empty parameters maps to one key. """
+
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"))
+
+    assert cache.key("https://FinViz.com/screener.ashx?f=b,a&v=111", {"o": ""}) == (
+        cache.key("https://finviz.com/screener.ashx", {"v": "111", "f": "b,a"})
+    )
+    assert cache.ttl(cache.key("https://finviz.com/screener.ashx?ft=4")) == (
+        cache.ttls["filters"]
+    )
+    assert cache.ttl(cache.key("https://finviz.com/portfolio.ashx")) == 0
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    """ Verifies old entries are evicted once the cache grows past its size. """
+
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"), max_size=2500)
+    bodies = {key: os.urandom(1000) for key in ("a", "b", "c")}
+
+    cache.store("a", "a", bodies["a"])
+    cache.store("b", "b", bodies["b"])
+    assert cache.lookup("a").body == bodies["a"]  # "b" is now the least recently used
+    cache.store("c", "c", bodies["c"])
+
+    assert cache.lookup("b") is None
+    assert cache.lookup("a").body == bodies["a"]
+    assert cache.is_fresh(cache.lookup("c")) is False  # Unknown endpoints are never fresh
+
+
+def test_reads_are_not_written_until_the_next_store(tmp_path):
+    """ Verifies hits only record their access time in memory and the size is kept running. """
+
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"), max_size=2500)
+    cache.store("a", "a", os.urandom(1000))
+    cache.store("a", "a", os.urandom(1000))  # Replaced, not counted twice
+    cache.store("b", "b", os.urandom(1000))
+
+    changes = cache._conn.total_changes
+    for _ in range(10):
+        cache.lookup("a")
+    assert cache._conn.total_changes == changes
+    assert cache._conn.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    cache.close()
+
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"), max_size=2500)
+    cache.store("c", "c", os.urandom(1000))  # The access of "a" was written on close
+    assert cache.lookup("b") is None and cache.lookup("a") is not None
+    assert cache.size == sum(
+        size for size, in cache._conn.execute("SELECT size FROM responses")
+    )
+
+
+def test_processes_sharing_the_file_evict_by_its_size(tmp_path):
+    """ Verifies a cache sees the bodies another connection stored before evicting. """
+
+    path = str(tmp_path / "cache.sqlite3")
+    first = ResponseCache(path, max_size=2500)
+    second = ResponseCache(path, max_size=2500)
+    first.store("a", "a", os.urandom(1000))
+    second.store("b", "b", os.urandom(1000))
+    first.store("c", "c", os.urandom(1000))
+
+    assert first.size == second.size <= 2500
+    assert first.lookup("a") is None and first.lookup("c") is not None
+    first.close()
+    second.close()
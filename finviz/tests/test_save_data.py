@@ -0,0 +1,106 @@
+import csv
+import gzip
+import json
+import sqlite3
+import zlib
+
+from finviz.helper_functions.save_data import ExportSink, export_to_db
+from finviz.testing import synthetic_universe
+
+
+def test_rows_are_exported_typed(tmp_path):
+    """ Verifies numeric columns are stored as numbers and quoted text is bound as is. """
+
+    headers, rows = synthetic_universe(2500)
+    data = [dict(zip(headers, row)) for row in rows]
+    data[0]["Company"] = 'The "Quoted" Company\'s'
+    data[1]["P/E"] = "-"
+    filename = str(tmp_path / "screener.sqlite3")
+
+    export_to_db(headers, data, filename, snapshot_date="2024-01-02", batch_size=1000)
+
+    conn = sqlite3.connect(filename)
+    assert conn.execute("SELECT COUNT(*) FROM screener_results").fetchone() == (2500,)
+    company, pe, market_cap, snapshot_date = conn.execute(
+        'SELECT Company, PE, MarketCap, SnapshotDate FROM screener_results WHERE "No" = 1'
+    ).fetchone()
+    assert company == 'The "Quoted" Company\'s'
+    assert isinstance(pe, float) and isinstance(market_cap, float)
+    assert conn.execute('SELECT typeof("No") FROM screener_results').fetchone() == (
+        "integer",
+    )
+    assert snapshot_date == "2024-01-02"
+    assert conn.execute(
+        'SELECT PE FROM screener_results WHERE "No" = 2'
+    ).fetchone() == (None,)
+    conn.close()
+
+
+def test_upsert_replaces_rows_of_the_same_snapshot(tmp_path):
+    """ Verifies upserts are keyed on Ticker and snapshot date. """
+
+    headers, rows = synthetic_universe(30)
+    data = [dict(zip(headers, row)) for row in rows]
+    filename = str(tmp_path / "screener.sqlite3")
+
+    export_to_db(headers, data, filename, "upsert", "2024-01-02")
+    data[0]["Price"] = "123.45"
+    export_to_db(headers, data, filename, "upsert", "2024-01-02")
+    export_to_db(headers, data[:10], filename, "upsert", "2024-01-03")
+
+    conn = sqlite3.connect(filename)
+    assert conn.execute("SELECT COUNT(*) FROM screener_results").fetchone() == (40,)
+    assert conn.execute(
+        "SELECT Price FROM screener_results WHERE Ticker = ? AND SnapshotDate = ?",
+        (data[0]["Ticker"], "2024-01-02"),
+    ).fetchone() == (123.45,)
+    conn.close()
+
+
+def test_upsert_replaces_appended_rows(tmp_path):
+    """ Verifies an upsert after appends of the same day replaces every copy of a row. """
+
+    headers, rows = synthetic_universe(30)
+    data = [dict(zip(headers, row)) for row in rows]
+    filename = str(tmp_path / "screener.sqlite3")
+
+    export_to_db(headers, data, filename, "append", "2024-01-02")
+    export_to_db(headers, data, filename, "append", "2024-01-02")
+    export_to_db(headers, data[:10], filename, "upsert", "2024-01-02")
+
+    conn = sqlite3.connect(filename)
+    assert conn.execute(
+        "SELECT COUNT(*) FROM screener_results WHERE Ticker = ?", (data[0]["Ticker"],)
+    ).fetchone() == (1,)
+    assert conn.execute("SELECT COUNT(*) FROM screener_results").fetchone() == (50,)
+    conn.close()
+
+
+def test_sink_flushes_readable_rows_before_closing(tmp_path):
+    """ Verifies compressed CSV and JSON Lines rows can be read back after each flush. """
+
+    headers, rows = synthetic_universe(30)
+    data = [dict(zip(headers, row)) for row in rows]
+
+    for name in ("stocks.csv.gz", "stocks.jsonl"):
+        filename = str(tmp_path / name)
+        sink = ExportSink(filename, flush_rows=10)
+        sink.write(data[:25], headers)  # Flushed after the first 25 rows
+
+        # A gzip file without its trailer yet is read with zlib, as by zcat
+        with open(filename, "rb") as file:
+            content = file.read()
+        if name.endswith(".gz"):
+            content = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(content)
+        assert len(content.decode().splitlines()) == (26 if name.endswith(".csv.gz") else 25)
+
+        sink.write(data[25:])
+        sink.close()
+        sink.write(data[:1])  # Reopened for appending
+        sink.close()
+
+        with gzip.open(filename, "rt") if name.endswith(".gz") else open(filename) as file:
+            read = list(csv.DictReader(file)) if name.endswith(".csv.gz") else [
+                json.loads(line) for line in file
+            ]
+        assert read == data + data[:1]
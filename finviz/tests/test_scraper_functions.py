@@ -0,0 +1,40 @@
+import finviz.helper_functions.scraper_functions as scrape
+from finviz.testing import render_screener_page, synthetic_universe
+
+
+def test_pagination_is_read_from_the_page():
+    """ Verifies the total row and page counts and the page URLs of a screener page. """
+
+    page = render_screener_page(*synthetic_universe(65))
+
+    assert scrape.get_pagination(page) == (65, 4)
+    assert scrape.get_total_rows(page) == 65
+    assert scrape.get_page_urls(page, 65, "screener.ashx?v=111") == [
+        f"screener.ashx?v=111&r={sequence}" for sequence in (1, 21, 41, 61)
+    ]
+    assert scrape.get_page_urls(page, 30, "screener.ashx?v=111") == [
+        "screener.ashx?v=111&r=1",
+        "screener.ashx?v=111&r=21",
+    ]
+
+
+def test_pagination_of_older_markup():
+    """ Verifies the counter of the older table layout, without a page selector. """
+
+    page = '<table><tr><td class="count-text">#1 / 1,204 Total</td></tr></table>'
+    assert scrape.get_pagination(page) == (1204, 61)
+    assert scrape.get_pagination("<html><body></body></html>") == (0, 1)
+
+
+def test_table_rows_are_read_from_bytes():
+    """ Verifies rows are zipped to the headers from UTF-8 bytes and cut at the row limit. """
+
+    headers, rows = synthetic_universe(20)
+    rows[0][2] = "Société Générale"
+    page = render_screener_page(headers, rows).encode("utf-8")
+
+    table = scrape.get_table(page, headers)
+    assert len(table) == 20
+    assert table[0]["Company"] == "Société Générale"
+    assert table[19] == dict(zip(headers, rows[19]))
+    assert list(scrape.iter_table(page, headers, rows=3)) == table[:3]
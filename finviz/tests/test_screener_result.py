@@ -0,0 +1,72 @@
+import math
+
+import pytest
+
+from finviz.helper_functions.screener_result import ScreenerResult
+from finviz.testing import synthetic_universe
+
+
+def test_columns_are_parsed_once_into_typed_arrays():
+    """ Verifies numeric, categorical and text columns and the row view over them. """
+
+    headers, rows = synthetic_universe(30)
+    data = [dict(zip(headers, row)) for row in rows]
+    data[1]["P/E"] = "-"
+    data[2]["Sector"] = "-"
+
+    result = ScreenerResult(headers, data)
+    assert len(result) == 30
+    assert result.columns["Price"].typecode == "d"
+    assert result.columns["Sector"].typecode == "i"
+    assert result.columns["Ticker"] == [row["Ticker"] for row in data]
+
+    row = result[0]
+    assert row["Ticker"] == data[0]["Ticker"] and row["Sector"] == data[0]["Sector"]
+    assert row["Change"] == float(data[0]["Change"][:-1])
+    assert list(row) == headers
+    assert math.isnan(result[1]["P/E"]) and result[2]["Sector"] is None
+    assert [row["Ticker"] for row in result[-2:]] == [data[28]["Ticker"], data[29]["Ticker"]]
+    with pytest.raises(KeyError):
+        row["Price/Earnings"]
+
+
+def test_exports_share_the_column_memory():
+    """ Verifies the NumPy arrays are views of the columns and pandas gets categoricals. """
+
+    pd = pytest.importorskip("pandas")
+
+    headers, rows = synthetic_universe(30)
+    result = ScreenerResult(headers, [dict(zip(headers, row)) for row in rows])
+
+    arrays = result.to_numpy()
+    result.columns["Price"][0] = 1.5
+    assert arrays["Price"][0] == 1.5
+
+    frame = result.to_pandas()
+    assert list(frame.columns) == headers
+    assert isinstance(frame["Sector"].dtype, pd.CategoricalDtype)
+    assert frame["Volume"].dtype == "float64"
+
+
+def test_rows_give_back_the_text_of_the_columns():
+    """ Verifies pages added one by one are stored typed and read back as the same text. """
+
+    headers, rows = synthetic_universe(30)
+    data = [dict(zip(headers, row)) for row in rows]
+    data[1]["P/E"] = "-"
+    data[2]["Sector"] = "-"
+    data[3]["Market Cap"] = "1,234.50M"
+
+    result = ScreenerResult(headers)
+    for start in range(0, 30, 20):
+        result.extend(data[start : start + 20])
+
+    assert result.rows == data
+    assert result.columns["Market Cap"][3] == 1234500000.0
+    assert math.isnan(result[1]["P/E"]) and result.rows[1]["P/E"] == "-"
+
+    row = result.rows[0]
+    row.update({"Price": "n/a", "EPS (ttm)": "6.43"})
+    assert result.columns["Price"][:2] == ["n/a", data[1]["Price"]]
+    assert result[0]["EPS (ttm)"] == 6.43 and result.rows[1]["EPS (ttm)"] is None
+    assert result.headers == headers + ["EPS (ttm)"]
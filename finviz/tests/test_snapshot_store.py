@@ -0,0 +1,113 @@
+import datetime
+
+import pytest
+
+from finviz.helper_functions.snapshot_store import SnapshotStore
+from finviz.helper_functions.value_parsing import parse_number
+from finviz.testing import synthetic_universe
+
+
+def snapshot(size):
+    headers, rows = synthetic_universe(size)
+    return [dict(zip(headers, row)) for row in rows]
+
+
+def test_only_changed_values_are_stored(tmp_path):
+    """ Verifies unchanged rows are deduplicated and the history holds typed values. """
+
+    store = SnapshotStore(str(tmp_path / "snapshots.sqlite3"))
+    rows = snapshot(50)
+    fields = len(rows[0]) - 1  # No. is not stored
+
+    assert store.add(rows, "2024-01-02T10:00") == 50 * fields
+    assert store.add(rows, "2024-01-02T10:05") == 0
+
+    rows[0]["P/E"] = "12.50"
+    rows[1]["Market Cap"] = "1.5B"
+    assert store.add(rows, "2024-01-02T10:10") == 2
+    assert len(store) == 3
+
+    history = store.history(rows[1]["Ticker"], "Market Cap")
+    assert history[-1] == (datetime.datetime(2024, 1, 2, 10, 10), 1.5e9)
+    assert len(history) == 2
+    store.close()
+
+
+def test_as_of_and_diff(tmp_path):
+    """ Verifies the rows at a time and the changes between two times, with removed tickers. """
+
+    store = SnapshotStore(str(tmp_path / "snapshots.sqlite3"))
+    rows = snapshot(10)
+    store.add(rows, "2024-01-02T10:00")
+
+    changed = [dict(row) for row in rows[1:]]
+    changed[0]["Price"] = "1.00"
+    store.add(changed, "2024-01-03T10:00")
+
+    assert len(store.as_of("2024-01-02T12:00")) == 10
+    assert store.as_of("2024-01-01") == []
+    as_of = {row["Ticker"]: row for row in store.as_of("2024-01-04")}
+    assert len(as_of) == 9 and as_of[rows[1]["Ticker"]]["Price"] == 1.0
+
+    assert store.diff("2024-01-02T12:00", "2024-01-04") == {
+        rows[0]["Ticker"]: {"Ticker": (rows[0]["Ticker"], None)},
+        rows[1]["Ticker"]: {"Price": (float(rows[1]["Price"]), 1.0)},
+    }
+    store.close()
+
+
+def test_as_of_values_keep_their_types(tmp_path):
+    """ Verifies numeric fields round-trip as numbers and text fields as text. """
+
+    store = SnapshotStore(str(tmp_path / "snapshots.sqlite3"))
+    rows = snapshot(20)
+    rows[0]["Company"] = "3M"  # Text of a text field is not read as a number
+    store.add(rows, "2024-01-02T10:00")
+
+    as_of = {row["Ticker"]: row for row in store.as_of("2024-01-02T10:00")}
+    for row in rows:
+        stored = as_of[row["Ticker"]]
+        assert stored["Company"] == row["Company"]
+        assert stored["Market Cap"] == parse_number(row["Market Cap"])
+        assert stored["Change"] == parse_number(row["Change"])
+        assert stored["P/E"] == parse_number(row["P/E"])  # None if missing ('-')
+        assert isinstance(stored["Volume"], float)
+    store.close()
+
+
+def test_snapshots_are_added_in_order(tmp_path):
+    """ Verifies a snapshot that is not after the last one is refused and changes nothing. """
+
+    store = SnapshotStore(str(tmp_path / "snapshots.sqlite3"))
+    rows = snapshot(10)
+    store.add(rows, "2024-01-02T10:00")
+
+    older = [dict(row, Price="1.00") for row in rows]
+    for ts in ("2024-01-02T10:00", "2024-01-01T10:00"):
+        with pytest.raises(ValueError, match="not after the last snapshot"):
+            store.add(older, ts)
+
+    assert len(store) == 1
+    assert store.as_of("2024-01-03")[0]["Price"] == float(rows[0]["Price"])
+    store.close()
+
+
+def test_fields_omitted_from_a_complete_snapshot_are_missing(tmp_path):
+    """ Verifies fields a row omits are left out of later rows unless the snapshot is partial. """
+
+    store = SnapshotStore(str(tmp_path / "snapshots.sqlite3"))
+    rows = snapshot(10)
+    store.add(rows, "2024-01-02T10:00")
+
+    without_pe = [{field: value for field, value in row.items() if field != "P/E"} for row in rows]
+    store.add(without_pe[:5], "2024-01-03T10:00", complete=False)
+    assert all("P/E" in row for row in store.as_of("2024-01-03T10:00"))
+
+    store.add(without_pe, "2024-01-04T10:00")
+    assert not any("P/E" in row for row in store.as_of("2024-01-04T10:00"))
+    assert all("P/E" in row for row in store.as_of("2024-01-03T10:00"))
+
+    ticker = rows[0]["Ticker"]
+    assert store.history(ticker, "P/E")[-1] == (datetime.datetime(2024, 1, 4, 10), None)
+    assert store.diff("2024-01-03", "2024-01-05")[ticker]["P/E"][1] is None
+    store.close()
@@ -0,0 +1,810 @@
+import asyncio
+import csv
+import gzip
+import json
+import os
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import aiohttp
+import pytest
+import tenacity
+
+from finviz import (aio, disable_query_cache, disable_response_cache,
+                    enable_query_cache, enable_response_cache)
+from finviz.config import connection_settings
+from finviz.helper_functions.chart_store import ChartStore
+from finviz.helper_functions.error_handling import (InvalidColumn, NoResults,
+                                                    TooManyRequests)
+from finviz.helper_functions.request_functions import (Connector,
+                                                       async_http_request_get,
+                                                       configure_client,
+                                                       get_client,
+                                                       http_request_get,
+                                                       iter_threaded_data_scrape,
+                                                       stream_scrape)
+from finviz.helper_functions.response_cache import ResponseCache
+from finviz.helper_functions.value_parsing import parse_number
+from finviz.main_func import (CRYPTO_URL, STOCK_PAGE, get_crypto, get_news,
+                              get_stock)
+from finviz.screener import Screener, plan_fields
+from finviz.sharded import ShardedScreener
+from finviz.multi_view import MultiViewScreener
+from finviz.ticker_list import TickerListScreener, split_tickers
+from finviz.testing import (FixtureStore, StandInServer, render_filters_page,
+                            render_quote_page, render_screener_page,
+                            synthetic_universe)
+
+QUOTE_PAGE = render_quote_page(
+    "AAPL",
+    {
+        "Company": "Apple Inc",
+        "Sector": "Technology",
+        "Industry": "Consumer Electronics",
+        "Country": "USA",
+        "Website": "https://www.apple.com",
+    },
+    [("Index", "DJIA S&P500"), ("P/E", "29.15"), ("EPS (ttm)", "6.43")]
+    + [(f"Field {i}", str(i)) for i in range(9)]
+    + [("Volatility", "1.20% 1.35%")]
+    + [(f"Other {i}", str(i)) for i in range(5)],
+    news=[
+        ("Jan-02-24 09:30AM", "Apple rallies", "https://example.com/a", "Reuters"),
+        ("Jan-02-24 08:10AM", "Apple opens", "https://example.com/b", "Bloomberg"),
+    ],
+)
+
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory):
+    store = FixtureStore(str(tmp_path_factory.mktemp("fixtures")))
+    store.save("https://finviz.com/quote.ashx?t=AAPL", QUOTE_PAGE.encode())
+
+    with StandInServer(store, screener=synthetic_universe(65), seed=1) as server:
+        yield server
+
+
+@pytest.mark.parametrize("request_method", ["sequential", "threaded", "async"])
+def test_screener_crawls_stand_in(server, request_method, monkeypatch):
+    """ Verifies every page of a screener is crawled from the stand-in server. """
+
+    monkeypatch.setenv("DISABLE_TQDM", "1")
+    stock_list = Screener(
+        filters=["exch_nasd"], request_method=request_method, base_url=server.url
+    )
+
+    assert len(stock_list) == 65
+    assert [row["Ticker"] for row in stock_list] == [
+        f"T{number:05d}" for number in range(1, 66)
+    ]
+
+
+def test_rows_stay_dictionaries_next_to_the_typed_result(server):
+    """ Verifies the rows of a screener are plain dicts and to_result() holds the typed columns. """
+
+    headers, rows = synthetic_universe(65)
+    stock_list = Screener(filters=["exch_nasd"], base_url=server.url)
+    assert stock_list.data == [dict(zip(headers, row)) for row in rows]
+    assert all(type(row) is dict for row in stock_list.data)
+    json.dumps(stock_list.data)
+
+    stock_list(rows=10)  # Applied to the downloaded rows
+    assert type(stock_list.data) is list and len(stock_list.data) == 10
+
+    result = stock_list.to_result()
+    assert result.columns["Price"].typecode == "d"
+    assert result[0]["Price"] == float(stock_list.data[0]["Price"])
+
+
+@pytest.mark.parametrize("request_method", ["sequential", "threaded", "async"])
+def test_pages_are_parsed_in_process_pool(server, request_method, monkeypatch):
+    """ Verifies pages and quote pages parsed by worker processes are merged as usual. """
+
+    monkeypatch.setenv("DISABLE_TQDM", "1")
+    monkeypatch.setitem(connection_settings, "PARSE_WORKERS", 2)
+    stock_list = Screener(
+        filters=["exch_nasd"],
+        rows=40,
+        request_method=request_method,
+        base_url=server.url,
+    )
+    assert [row["Ticker"] for row in stock_list] == [
+        f"T{number:05d}" for number in range(1, 41)
+    ]
+
+    stock_list.get_ticker_details()
+    assert stock_list.data[39]["P/E"] == "29.15"
+
+
+def test_ticker_details_are_merged_as_they_arrive(server):
+    """ Verifies the asynchronous detail crawl merges every quote page into its row. """
+
+    async def crawl():
+        stock_list = await aio.Screener(filters=["exch_nasd"], base_url=server.url)
+        return stock_list, await stock_list.get_ticker_details()
+
+    stock_list, data = asyncio.run(crawl())
+
+    assert len(data) == 65
+    assert all(row["EPS (ttm)"] == "6.43" for row in data)
+    assert stock_list.headers.count("P/E") == 1
+    assert "Volatility" in stock_list.headers
+
+
+@pytest.mark.parametrize("request_method", ["sequential", "async"])
+def test_lazy_screener_requests_pages_on_demand(server, request_method, monkeypatch):
+    """ Verifies a lazy screener only requests the pages covering the rows read. """
+
+    monkeypatch.setenv("DISABLE_TQDM", "1")
+    requests = server.requests
+    stock_list = Screener(request_method=request_method, base_url=server.url, lazy=True)
+    assert len(stock_list) == 65
+    assert stock_list[0]["Ticker"] == "T00001"
+    assert server.requests - requests == 1
+
+    assert stock_list[25]["Ticker"] == "T00026"
+    assert [row["Ticker"] for row in stock_list[18:45:13]] == ["T00019", "T00032", "T00045"]
+    assert stock_list[-1]["Ticker"] == "T00065"
+    assert server.requests - requests == 4
+
+    assert [row["Ticker"] for row in stock_list] == [
+        f"T{number:05d}" for number in range(1, 66)
+    ]
+    assert server.requests - requests == 4
+
+
+def test_equivalent_queries_hit_the_query_cache(server):
+    """ Verifies the same query asked differently, or from its URL, is served from the cache. """
+
+    enable_query_cache(ttl=60)
+    try:
+        requests = server.requests
+        stock_list = Screener(
+            filters=["exch_nasd", "sec_technology"], order="-price", base_url=server.url
+        )
+        assert server.requests - requests == 5
+
+        same_query = Screener(
+            filters=["sec_technology", "exch_nasd"], order="-price", base_url=server.url
+        )
+        from_url = Screener.init_from_url(
+            "https://finviz.com/screener.ashx?v=111&f=sec_technology,exch_nasd&o=-price",
+            base_url=server.url,
+        )
+        assert server.requests - requests == 5
+        assert same_query.data == from_url.data == stock_list.data
+        assert len(from_url) == 65 and from_url.headers == stock_list.headers
+
+        same_query.get_ticker_details()  # Changes to the rows do not leak into the cache
+        cached = Screener(
+            filters=["exch_nasd", "sec_technology"], order="-price", base_url=server.url
+        )
+        assert "EPS (ttm)" in same_query.data[0] and "EPS (ttm)" not in cached.data[0]
+    finally:
+        disable_query_cache()
+
+
+def test_new_order_is_applied_locally(server):
+    """ Verifies a new order or row limit re-sorts the downloaded rows without requests. """
+
+    stock_list = Screener(base_url=server.url)
+    requests = server.requests
+
+    stock_list(order="-marketcap")
+    caps = [parse_number(row["Market Cap"]) for row in stock_list]
+    assert caps == sorted(caps, reverse=True) and len(caps) == 65
+    assert stock_list[0]["No."] == "1"
+
+    stock_list(rows=10)
+    assert len(stock_list) == len(stock_list.data) == 10
+    stock_list(order="price", rows=30)
+    prices = [float(row["Price"]) for row in stock_list]
+    assert len(prices) == 30 and prices == sorted(prices)
+    assert server.requests == requests
+
+    stock_list(filters=["exch_nasd"])  # A new filter requests the screener again
+    assert server.requests > requests
+
+
+def test_views_are_joined_by_ticker(tmp_path):
+    """ Verifies the table types of a query are downloaded together and joined by ticker. """
+
+    headers, rows = synthetic_universe(45)
+    valuation_headers = ["No.", "Ticker", "Market Cap", "P/E", "Fwd P/E", "Price"]
+    valuation_rows = [
+        [str(number), row[1], row[6], row[7], f"{number}.5", row[8]]
+        for number, row in enumerate(reversed(rows), 1)
+    ]
+
+    store = FixtureStore(str(tmp_path))
+    for view, view_headers, view_rows in [
+        ("111", headers, rows),
+        ("121", valuation_headers, valuation_rows),
+    ]:
+        store.save(
+            f"https://finviz.com/screener.ashx?v={view}",
+            render_screener_page(view_headers, view_rows).encode(),
+        )
+        for offset in (1, 21, 41):
+            store.save(
+                f"https://finviz.com/screener.ashx?v={view}&r={offset}",
+                render_screener_page(view_headers, view_rows, offset).encode(),
+            )
+
+    with StandInServer(store) as server:
+        stock_list = MultiViewScreener(["Overview", "Valuation"], base_url=server.url)
+
+    assert stock_list.headers == headers + ["Fwd P/E"]
+    assert len(stock_list) == 45
+    assert stock_list[0]["Ticker"] == "T00001" and stock_list[0]["No."] == "1"
+    assert stock_list[0]["Fwd P/E"] == "45.5" and stock_list[44]["Fwd P/E"] == "1.5"
+
+
+def test_only_the_given_columns_are_requested(server):
+    """ Verifies headers are mapped to Custom table column ids, after No. and Ticker. """
+
+    stock_list = Screener(columns=["P/E", "Perf Week", "Earnings"], base_url=server.url)
+    query = parse_qs(urlsplit(stock_list._url).query)
+    assert query["v"] == ["152"]
+    assert query["c"] == ["0,1,7,42,68"]
+
+    with pytest.raises(InvalidColumn):
+        Screener(columns=["P/E", "Price/Earnings"], base_url=server.url)
+
+
+def test_quote_pages_are_only_requested_for_other_fields(server):
+    """ Verifies fields shown by the Custom table are not read from the quote pages. """
+
+    assert plan_fields(["Forward P/E", "P/E", "Dividend TTM"]) == (
+        {"Forward P/E": "Fwd P/E", "P/E": "P/E"},
+        ["Dividend TTM"],
+    )
+
+    requests = server.requests
+    stock_list = Screener.init_from_fields(
+        ["P/E", "Market Cap"], rows=20, base_url=server.url
+    )
+    assert server.requests - requests == 2  # The first page is requested twice
+    assert stock_list[0]["P/E"] and not stock_list.analysis
+
+    requests = server.requests
+    stock_list = Screener.init_from_fields(
+        ["P/E", "Dividend TTM"], rows=20, base_url=server.url
+    )
+    assert server.requests - requests == 2 + 20
+    assert stock_list[0]["Index"] == "DJIA S&P500"
+
+
+def test_dataframe_helpers_only_request_quote_pages_for_other_fields(server, monkeypatch):
+    """ Verifies the finviz_utils paths read Custom table columns before falling back to quote pages. """
+
+    from finviz_utils import finviz_utils
+
+    quote_requests = []
+    respond = server.respond
+
+    def counting_respond(path):
+        if path.startswith("/quote.ashx"):
+            quote_requests.append(path)
+        return respond(path)
+
+    monkeypatch.setattr(server, "respond", counting_respond)
+    monkeypatch.setitem(connection_settings, "BASE_URL", server.url)
+    monkeypatch.setenv("DISABLE_TQDM", "1")
+    # The values are not converted, only the requests are counted
+    monkeypatch.setattr(finviz_utils, "_process_dataframe", lambda data: data)
+
+    assert plan_fields(["Volatility"]) == (
+        {"Volatility W": "Volatility W", "Volatility M": "Volatility M"},
+        [],
+    )
+
+    finviz_utils._get_data_frame_with_custom_fields(
+        "exch_nasd", "marketcap", columns=["Forward P/E", "Perf Week", "Volatility"]
+    )
+    assert quote_requests == []
+
+    # The default paths leave out the fields of no Custom table column eg.: Dividend TTM
+    data = finviz_utils._get_dataframe(
+        "exch_nasd", "Performance", "marketcap", details=True
+    )
+    assert quote_requests == [] and len(data.columns) == 65
+    assert data.loc["Price"].notna().all() and data.loc["Dividend TTM"].isna().all()
+    data = finviz_utils._get_data_frame_with_custom_fields("exch_nasd", "marketcap")
+    assert quote_requests == [] and "52W Range" in data.index
+    with pytest.raises(ValueError, match="Overview"):
+        finviz_utils._get_dataframe("exch_nasd", "Overview", "marketcap", details=True)
+
+    # They are requested when asked for, once per ticker
+    data = finviz_utils._get_data_frame_with_custom_fields(
+        "exch_nasd", "marketcap", columns=["Price", "EPS (ttm)", "Dividend TTM"]
+    )
+    assert len(quote_requests) == len(set(quote_requests)) == len(data.columns) == 65
+    assert (data.loc["EPS (ttm)"] == "6.43").all()
+
+
+def test_ticker_lists_are_requested_in_batches(server):
+    """ Verifies long ticker lists are split into URL-sized batches whose rows are merged. """
+
+    tickers = [f"T{number:05d}" for number in range(1, 66)]
+    batches = split_tickers(tickers + tickers[:5], max_length=120)
+    assert sum(batches, []) == tickers
+    assert all(len(",".join(batch)) <= 120 for batch in batches)
+
+    requests = server.requests
+    stock_list = TickerListScreener(
+        tickers, order="-price", max_length=120, base_url=server.url
+    )
+    assert len(stock_list.batches) == len(batches) == 4
+    assert server.requests - requests == 4 * 5
+
+    # The stand-in ignores t=, so every batch returns the whole universe once merged
+    assert len(stock_list) == 65
+    prices = [float(row["Price"]) for row in stock_list]
+    assert prices == sorted(prices, reverse=True)
+    assert [row["No."] for row in stock_list][:3] == ["1", "2", "3"]
+
+
+def test_merged_batches_are_sorted_by_ticker_without_an_order(tmp_path):
+    """ Verifies batches are merged in the default ticker order before the row limit is applied. """
+
+    headers, rows = synthetic_universe(4)
+    store = FixtureStore(str(tmp_path))
+    for batch in (["MSFT", "ZM"], ["AAPL", "AMD"]):
+        page = render_screener_page(
+            headers, [[row[0], ticker, *row[2:]] for row, ticker in zip(rows, batch)]
+        ).encode()
+        url = f"https://finviz.com/screener.ashx?v=111&t={','.join(batch)}"
+        store.save(url, page)
+        store.save(f"{url}&r=1", page)
+
+    with StandInServer(store) as server:
+        stock_list = TickerListScreener(
+            ["MSFT", "ZM", "AAPL", "AMD"], rows=2, max_length=8, base_url=server.url
+        )
+
+    assert [batch._tickers for batch in stock_list.batches] == [
+        ["MSFT", "ZM"],
+        ["AAPL", "AMD"],
+    ]
+    assert [row["Ticker"] for row in stock_list] == ["AAPL", "AMD"]
+    assert [row["No."] for row in stock_list] == ["1", "2"]
+
+
+def test_orders_of_no_known_column_are_not_merged(server):
+    """ Verifies batches and shards refuse orders they could not sort once merged. """
+
+    tickers = [f"T{number:05d}" for number in range(1, 66)]
+    requests = server.requests
+    with pytest.raises(ValueError, match="earningsdate"):
+        TickerListScreener(
+            tickers, order="earningsdate", rows=10, max_length=120, base_url=server.url
+        )
+    with pytest.raises(ValueError, match="earningsdate"):
+        ShardedScreener(
+            order="-earningsdate", shards=["exch_amex", "exch_nasd"], base_url=server.url
+        )
+    assert server.requests == requests
+
+    # A single batch keeps the order of FinViz
+    stock_list = TickerListScreener(tickers[:3], order="earningsdate", base_url=server.url)
+    assert len(stock_list.batches) == 1
+
+
+@pytest.mark.parametrize("request_method", ["sequential", "threaded", "async"])
+def test_merged_screeners_take_the_request_method(
+    server, request_method, tmp_path, monkeypatch
+):
+    """ Verifies batches and shards are downloaded with the request method, streamed or lazily. """
+
+    monkeypatch.setenv("DISABLE_TQDM", "1")
+    tickers = [f"T{number:05d}" for number in range(1, 66)]
+
+    stock_list = ShardedScreener(
+        order="-price",
+        shards=["exch_amex", "exch_nasd"],
+        request_method=request_method,
+        base_url=server.url,
+    )
+    assert len(stock_list) == 65
+    assert all(
+        isinstance(shard, aio.Screener) == (request_method == "async")
+        for shard in stock_list.shards.values()
+    )
+
+    # Streamed batches only request their first page, the rows are read batch by batch
+    filename = str(tmp_path / "stocks.csv.gz")
+    requests = server.requests
+    with TickerListScreener(
+        tickers,
+        rows=30,
+        max_length=120,
+        request_method=request_method,
+        stream=True,
+        sink=filename,
+        base_url=server.url,
+    ) as stock_list:
+        assert server.requests - requests == 4
+        assert stock_list.data == [] and len(stock_list) == 30
+        assert stock_list.export() == 30
+
+    with gzip.open(filename, "rt") as file:
+        rows = list(csv.DictReader(file))
+    assert [row["Ticker"] for row in rows] == tickers[:30]
+
+    requests = server.requests
+    stock_list = TickerListScreener(
+        tickers,
+        max_length=120,
+        request_method=request_method,
+        lazy=True,
+        base_url=server.url,
+    )
+    assert server.requests - requests == 4
+    assert len(stock_list) == 4 * 65
+    assert stock_list[65 + 25]["Ticker"] == "T00026"  # Second page of the second batch
+    assert server.requests - requests == 5
+
+
+def test_shards_are_cached_and_refreshed_on_their_own(server):
+    """ Verifies a sharded screener caches each shard, reused by narrower queries and refreshed alone. """
+
+    shards = ["exch_amex", "exch_nasd", "exch_nyse"]
+    enable_query_cache()
+    try:
+        requests = server.requests
+        stock_list = ShardedScreener(
+            filters=["ind_stocksonly"], shards=shards, base_url=server.url
+        )
+        assert list(stock_list.shards) == shards
+        assert server.requests - requests == 3 * 5
+        # The stand-in ignores filters, so every shard returns the whole universe once merged
+        assert len(stock_list) == 65
+
+        requests = server.requests
+        Screener(filters=["exch_nasd", "ind_stocksonly"], base_url=server.url)
+        assert server.requests == requests
+
+        stock_list.refresh("exch_nasd")
+        assert server.requests - requests == 5
+        assert len(stock_list) == 65
+
+        # A query filtered by the category of the shards is not split again
+        stock_list = ShardedScreener(
+            filters=["exch_nasd"], shards=shards, base_url=server.url
+        )
+        assert list(stock_list.shards) == [None]
+    finally:
+        disable_query_cache()
+
+
+def test_shards_come_from_the_stand_in_and_merge_in_ticker_order(tmp_path):
+    """ Verifies the shard filters are read from the base URL and merged shards are sorted by ticker. """
+
+    headers, rows = synthetic_universe(3)
+    store = FixtureStore(str(tmp_path))
+    filters = {"Exchange": ("exch", {"AMEX": "amex", "NASDAQ": "nasd"})}
+    store.save(
+        "https://finviz.com/screener.ashx?ft=4", render_filters_page(filters).encode()
+    )
+    for shard, tickers in [
+        ("exch_amex", ["MSFT", "ZM"]),
+        ("exch_nasd", ["AAPL", "AMD"]),
+    ]:
+        page = render_screener_page(
+            headers, [[row[0], ticker, *row[2:]] for row, ticker in zip(rows, tickers)]
+        ).encode()
+        url = f"https://finviz.com/screener.ashx?v=111&f={shard}"
+        store.save(url, page)
+        store.save(f"{url}&r=1", page)
+
+    with StandInServer(store) as server:
+        stock_list = ShardedScreener(shard_by="Exchange", rows=3, base_url=server.url)
+
+    assert list(stock_list.shards) == ["exch_amex", "exch_nasd"]
+    assert [row["Ticker"] for row in stock_list] == ["AAPL", "AMD", "MSFT"]
+
+
+@pytest.mark.parametrize("request_method", ["sequential", "async"])
+def test_rows_are_written_to_the_sink_while_crawling(
+    server, request_method, tmp_path, monkeypatch
+):
+    """ Verifies a streaming screener exports its pages without keeping them. """
+
+    monkeypatch.setenv("DISABLE_TQDM", "1")
+    filename = str(tmp_path / "stocks.csv.gz")
+    with Screener(
+        request_method=request_method, stream=True, sink=filename, base_url=server.url
+    ) as stock_list:
+        assert stock_list.export() == 65
+        assert stock_list.data == []
+
+    with gzip.open(filename, "rt") as file:
+        rows = list(csv.DictReader(file))
+    assert [row["Ticker"] for row in rows] == [f"T{number:05d}" for number in range(1, 66)]
+
+
+def test_async_screeners_write_their_rows_to_the_sink(server, tmp_path):
+    """ Verifies the rows of an async search and of a stream reach the sink, once per search. """
+
+    async def crawl():
+        sink = str(tmp_path / "aio.jsonl")
+        with aio.Screener(sink=sink, base_url=server.url) as stock_list:
+            await stock_list.search()
+            await stock_list.add(filters=["exch_nasd"])
+
+        sink = str(tmp_path / "streamed.csv")
+        with Screener(stream=True, sink=sink, base_url=server.url) as streamed:
+            return [row async for row in streamed.astream()]
+
+    streamed_rows = asyncio.run(crawl())
+    tickers = [f"T{number:05d}" for number in range(1, 66)]
+
+    with open(tmp_path / "aio.jsonl") as file:
+        assert [json.loads(line)["Ticker"] for line in file] == tickers
+    with open(tmp_path / "streamed.csv", newline="") as file:
+        assert [row["Ticker"] for row in csv.DictReader(file)] == tickers
+    assert [row["Ticker"] for row in streamed_rows] == tickers
+
+
+def test_unchanged_charts_are_not_written_again(tmp_path):
+    """ Verifies charts are stored by content, once, with a manifest per ticker. """
+
+    store = FixtureStore(str(tmp_path / "fixtures"))
+    store.save("https://finviz.com/chart.ashx?ty=c&ta=1&p=d&s=l&t=AAPL", b"\x89PNG chart")
+    directory = str(tmp_path / "charts")
+
+    with StandInServer(store, screener=synthetic_universe(30)) as server:
+        stock_list = Screener(rows=20, base_url=server.url)
+        charts = stock_list.get_charts(directory=directory, workers=4)
+        assert len(charts) == 20 and all(chart["changed"] for chart in charts)
+
+        charts = stock_list.get_charts(directory=directory, workers=4)
+        assert not any(chart["changed"] for chart in charts)
+
+    images = [name for name in os.listdir(directory) if name.endswith(".png")]
+    assert images == [charts[0]["file"]]
+    assert len(os.listdir(os.path.join(directory, "manifests"))) == 20
+
+    manifest = ChartStore(directory).manifest("T00001")
+    assert list(manifest["charts"]) == ["p=d&s=l&ta=1&ty=c"]
+    assert len(manifest["charts"]["p=d&s=l&ta=1&ty=c"]) == 1
+
+
+def test_throttled_charts_are_retried_instead_of_stored(tmp_path, monkeypatch):
+    """ Verifies a 200 "Too many requests." answer to a chart is retried, never written. """
+
+    monkeypatch.setattr(stream_scrape.retry, "wait", tenacity.wait_none())
+    store = FixtureStore(str(tmp_path / "fixtures"))
+    store.save("https://finviz.com/chart.ashx?ty=c&ta=1&p=d&s=l&t=AAPL", b"\x89PNG chart")
+    directory = str(tmp_path / "charts")
+
+    with StandInServer(
+        store, screener=synthetic_universe(30), throttle_status=200, seed=5
+    ) as server:
+        stock_list = Screener(rows=20, base_url=server.url)
+        server.throttle_rate = 0.3
+        charts = stock_list.get_charts(directory=directory, workers=4)
+
+    assert server.throttled > 0 and len(charts) == 20
+    for name in os.listdir(directory):
+        if name.endswith(".png"):
+            with open(os.path.join(directory, name), "rb") as image:
+                assert image.read().startswith(b"\x89PNG")
+
+
+def test_async_screener_survives_throttling():
+    """ Verifies throttled pages are requeued instead of failing the crawl. """
+
+    with StandInServer(screener=synthetic_universe(120), seed=3) as server:
+        # Throttle the pages only, the first request of the screener is not retried
+        stock_list = Screener(request_method="async", base_url=server.url)
+        server.throttle_rate = 0.3
+        stock_list()
+
+    assert len(stock_list.data) == 120
+    assert server.throttled > 0
+
+
+def test_views_of_a_host_share_one_limiter():
+    """ Verifies the concurrent crawls of a multi-view screener are paced by one window. """
+
+    with StandInServer(screener=synthetic_universe(45)) as server:
+        connectors = [
+            Connector(
+                lambda page, URL=None: page,
+                [f"{server.url}/screener.ashx?v={view}"],
+                "test",
+            )
+            for view in ("111", "121")
+        ]
+        for connector in connectors:
+            connector.run_connector()
+
+    assert connectors[0].limiter is connectors[1].limiter
+    assert connectors[0].limiter.completed == 2
+
+
+def test_request_rate_is_the_rate_of_the_run():
+    """ Verifies a run reports its own rate, not the lifetime rate of the shared limiter. """
+
+    with StandInServer(screener=synthetic_universe(20), latency=0.02) as server:
+        urls = [f"{server.url}/screener.ashx?v=111&r={number}" for number in range(20)]
+        first, second = (
+            Connector(lambda page, URL=None: page, urls, "test") for _ in range(2)
+        )
+        assert second.request_rate == 0.0
+
+        first.run_connector()
+        time.sleep(0.5)  # Idle between the crawls
+        started = time.monotonic()
+        second.run_connector()
+        elapsed = time.monotonic() - started
+
+    assert first.limiter is second.limiter
+    assert second.request_rate >= 20 / elapsed
+    assert second.request_rate > first.limiter.sustained_rate
+
+
+def test_threaded_crawls_stop_requesting_when_closed(monkeypatch):
+    """ Verifies threaded crawls request a bounded number of pages ahead of the consumer. """
+
+    monkeypatch.setenv("DISABLE_TQDM", "1")
+    monkeypatch.setitem(connection_settings, "THREAD_WORKERS", 2)
+    with StandInServer(screener=synthetic_universe(20), latency=0.05) as server:
+        urls = [f"{server.url}/screener.ashx?v=111&r={number}" for number in range(50)]
+        pages = iter_threaded_data_scrape(lambda page, URL=None: URL, urls, "test")
+        assert [next(pages), next(pages)] == urls[:2]
+        pages.close()
+        requests = server.requests
+
+        time.sleep(0.2)
+        assert server.requests == requests <= 2 + 2 * 2
+
+
+def test_async_requests_look_the_cache_up_once_off_the_loop(tmp_path, monkeypatch):
+    """ Verifies each URL is looked up in the response cache once, in the executor. """
+
+    lookups = []
+    lookup = ResponseCache.lookup
+
+    def recording_lookup(cache, key):
+        lookups.append(threading.current_thread() is threading.main_thread())
+        return lookup(cache, key)
+
+    monkeypatch.setattr(ResponseCache, "lookup", recording_lookup)
+    enable_response_cache(str(tmp_path / "responses.sqlite3"))
+    try:
+        with StandInServer(screener=synthetic_universe(20)) as server:
+            urls = [f"{server.url}/screener.ashx?v=111&r={number}" for number in range(5)]
+            Connector(lambda page, URL=None: page, urls, "test").run_connector()
+            requests = server.requests
+            Connector(lambda page, URL=None: page, urls, "test").run_connector()
+            assert server.requests == requests  # Fresh pages are answered by the cache
+    finally:
+        disable_response_cache()
+
+    assert lookups == [False] * 10
+
+
+def test_only_throttled_responses_shrink_the_window(monkeypatch):
+    """ Verifies failed requests leave the window alone and retries follow THROTTLE_RETRIES. """
+
+    with StandInServer(screener=synthetic_universe(20), failure_rate=1.0) as server:
+        connector = Connector(
+            lambda page, URL=None: page, [f"{server.url}/screener.ashx"], "test"
+        )
+        with pytest.raises(aiohttp.ClientResponseError):
+            connector.run_connector()
+        assert connector.limiter.throttled == 0
+        assert connector.limiter.window == connection_settings["INITIAL_CONCURRENCY"]
+
+    monkeypatch.setitem(connection_settings, "THROTTLE_RETRIES", 2)
+    with StandInServer(screener=synthetic_universe(20), throttle_rate=1.0) as server:
+
+        async def request():
+            async with aiohttp.ClientSession() as session:
+                await async_http_request_get(f"{server.url}/screener.ashx", session)
+
+        with pytest.raises(TooManyRequests):
+            asyncio.run(request())
+        assert server.requests == 2
+
+
+def test_main_func_uses_base_url(server, monkeypatch):
+    """ Verifies quote pages are read from the BASE_URL connection setting. """
+
+    monkeypatch.setitem(connection_settings, "BASE_URL", server.url)
+    STOCK_PAGE.pop("AAPL", None)
+
+    stock = get_stock("AAPL")
+    assert stock["Company"] == "Apple Inc"
+    assert stock["P/E"] == "29.15"
+    assert stock["Volatility (Month)"] == "1.35%"
+    assert [news[1] for news in get_news("AAPL")] == ["Apple rallies", "Apple opens"]
+
+    STOCK_PAGE.pop("AAPL", None)
+
+
+def test_unknown_crypto_pairs_raise(tmp_path, monkeypatch):
+    """ Verifies a crypto pair missing from the performance table raises instead of returning None. """
+
+    store = FixtureStore(str(tmp_path))
+    store.save(
+        CRYPTO_URL,
+        b'<html><body><table><tr valign="middle"><td>Ticker</td><td>Price</td></tr>'
+        b'<tr valign="top"><td><a>BTCUSD</a></td><td>42000.00</td></tr>'
+        b"</table></body></html>",
+    )
+
+    with StandInServer(store) as server:
+        monkeypatch.setitem(connection_settings, "BASE_URL", server.url)
+        assert get_crypto("BTCUSD") == {"Ticker": "BTCUSD", "Price": "42000.00"}
+        with pytest.raises(NoResults, match="DOGEUSD"):
+            get_crypto("DOGEUSD")
+
+
+def _connection_pool(client, url):
+    """ Returns the pool of connections of a client to the host of a URL. """
+
+    pools = client.adapter.poolmanager.pools
+    port = urlsplit(url).port
+    return next(pools[key] for key in pools.keys() if key.key_port == port)
+
+
+def test_pooled_client_reuses_its_connections(server):
+    """ Verifies sequential requests share one kept-alive connection of the pooled client. """
+
+    client = get_client()
+    assert get_client() is client
+
+    requests = server.requests
+    for _ in range(5):
+        http_request_get(f"{server.url}/screener.ashx", parse=False)
+    assert server.requests - requests == 5
+
+    pool = _connection_pool(client, server.url)
+    assert pool.num_connections == 1 and pool.num_requests >= 5
+
+    # A forked child process gets a client of its own
+    client.pid = -1
+    assert get_client() is not client
+    client.close()
+
+
+def test_configure_client_replaces_the_pool(server, monkeypatch):
+    """ Verifies configure_client closes the pooled connections and sizes the new pool. """
+
+    for setting in ("POOL_CONNECTIONS", "POOL_MAXSIZE", "POOL_BLOCK"):
+        monkeypatch.setitem(connection_settings, setting, connection_settings[setting])
+
+    old_client = get_client()
+    http_request_get(f"{server.url}/screener.ashx", parse=False)
+    try:
+        client = configure_client(POOL_MAXSIZE=2, POOL_BLOCK=False)
+        assert get_client() is client is not old_client
+        assert connection_settings["POOL_MAXSIZE"] == 2
+        assert not old_client.adapter.poolmanager.pools
+
+        http_request_get(f"{server.url}/screener.ashx", parse=False)
+        pool = _connection_pool(client, server.url)
+        assert pool.pool.maxsize == 2 and pool.block is False
+    finally:
+        monkeypatch.undo()
+        configure_client()
+
+
+def test_throttled_requests_back_off_up_to_the_retry_setting(monkeypatch):
+    """ Verifies throttled requests wait exponentially longer, THROTTLE_RETRIES times at most. """
+
+    waits = []
+    monkeypatch.setattr(stream_scrape.retry, "sleep", waits.append)
+    monkeypatch.setitem(connection_settings, "THROTTLE_RETRIES", 4)
+
+    with StandInServer(screener=synthetic_universe(20), throttle_rate=1.0) as server:
+        with pytest.raises(TooManyRequests):
+            stream_scrape(lambda response: None, f"{server.url}/screener.ashx", "test")
+
+    assert server.requests == 4
+    assert waits == [1, 2, 4]
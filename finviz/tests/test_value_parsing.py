@@ -0,0 +1,24 @@
+from finviz.helper_functions.value_parsing import parse_number, sort_rows
+
+
+def test_finviz_values_are_parsed():
+    """ Verifies suffixes, percentages, separators and missing values. """
+
+    assert parse_number("1.2B") == 1.2e9
+    assert parse_number("350.50M") == 350.5e6
+    assert parse_number("-3.4%") == -3.4
+    assert parse_number("1,234,567") == 1234567
+    assert parse_number("-") is None
+    assert parse_number("Technology") is None
+
+
+def test_rows_are_sorted_numerically():
+    """ Verifies numbers sort by value and missing values come last in both directions. """
+
+    rows = [{"Market Cap": value} for value in ["950.00M", "-", "1.20B", "12.5M"]]
+
+    ascending = [row["Market Cap"] for row in sort_rows(rows, "Market Cap")]
+    descending = [row["Market Cap"] for row in sort_rows(rows, "Market Cap", True)]
+
+    assert ascending == ["12.5M", "950.00M", "1.20B", "-"]
+    assert descending == ["1.20B", "950.00M", "12.5M", "-"]
@@ -0,0 +1,145 @@
+from user_agent import generate_user_agent
+
+from finviz.helper_functions.request_functions import run_sync
+from finviz.merged import MergedScreener
+
+# Characters of the t= parameter sent per request, keeping the URL of each batch short
+MAX_TICKERS_LENGTH = 1500
+
+
+def split_tickers(tickers, max_length=MAX_TICKERS_LENGTH):
+    """
+    Splits tickers into batches whose comma separated form fits in max_length characters.
+    Duplicated tickers are dropped and the order of the others is kept.
+
+    :param tickers: collection of ticker strings eg.: ['AAPL', 'AMD', 'WMT']
+    :type tickers: list
+    :param max_length: maximum number of characters of the t= parameter of a batch
+    :type max_length: int
+    """
+
+    batches = []
+    batch, length = [], 0
+    for ticker in dict.fromkeys(tickers):
+        if batch and length + 1 + len(ticker) > max_length:
+            batches.append(batch)
+            batch, length = [], 0
+
+        length += len(ticker) + (1 if batch else 0)
+        batch.append(ticker)
+
+    if batch:
+        batches.append(batch)
+
+    return batches
+
+
+class TickerListScreener(MergedScreener):
+    """
+    Used to download a screener over any number of tickers, eg.: the thousands of tickers
+    of an earnings calendar. The tickers are split into batches that fit in a URL, the
+    batches are downloaded concurrently over one session, with the default 'async' request
+    method, and their rows are merged. Example usage:
+
+    stock_list = TickerListScreener(calendar_tickers, filters=['sec_technology'], table='Performance')
+    """
+
+    def __init__(
+        self,
+        tickers,
+        filters=None,
+        rows=None,
+        order="",
+        signal="",
+        table=None,
+        custom=None,
+        user_agent=generate_user_agent(),
+        request_method="async",
+        stream=False,
+        base_url=None,
+        lazy=False,
+        columns=None,
+        sink=None,
+        ratings_sink=None,
+        max_length=MAX_TICKERS_LENGTH,
+    ):
+        """
+        Downloads the batches of tickers. Takes the same parameters as finviz.screener.Screener
+        (see MergedScreener for the request methods, streaming and lazy rows), plus:
+
+        :param max_length: maximum number of characters of the t= parameter of a batch
+        :type max_length: int
+        :var self.batches: screener of each batch of tickers, None for the batches without results
+        :type self.batches: list
+        """
+
+        if columns:
+            custom = self._check_columns(columns)
+
+        self._init_parameters(
+            list(tickers),
+            filters,
+            rows,
+            order,
+            signal,
+            table,
+            custom,
+            user_agent,
+            request_method,
+            stream,
+            base_url,
+            lazy,
+            sink,
+            ratings_sink,
+        )
+        self._max_length = max_length
+        self._row_limit = rows
+
+        self.batches = []
+        self.headers = []
+        self.data = run_sync(self.search())
+
+    def __call__(
+        self,
+        tickers=None,
+        filters=None,
+        rows=None,
+        order="",
+        signal="",
+        table=None,
+        custom=None,
+    ):
+        """
+        Adds more tickers or filters to the screener and downloads it again.
+        Only a new order or row limit is applied to the downloaded rows if possible.
+        """
+
+        self._row_limit = rows or self._row_limit
+
+        only_reordered = (order or rows) and not (
+            tickers or filters or signal or table or custom
+        )
+        if only_reordered and self._reorder(order, rows):
+            return
+
+        self._update_parameters(tickers, filters, rows, order, signal, table, custom)
+        self._restart_sinks()
+        self.data = run_sync(self.search())
+
+    add = __call__
+
+    async def search(self, session=None):
+        """
+        Downloads the batches of tickers, concurrently over one asynchronous session with
+        the 'async' request method, and returns the merged rows.
+
+        :param session: asynchronous session to send the requests with, a new one is used if omitted
+        :type session: aiohttp.ClientSession
+        """
+
+        queries = [
+            (batch, self._filters)
+            for batch in split_tickers(self._tickers, self._max_length)
+        ]
+        self.batches = await self._search_queries(queries, session)
+        return self._merge_screeners(self.batches)
@@ -188,6 +188,18 @@ PERFORMANCE_TABLE_ALL_FIELDS = [
     'SMA200'
 ]
 
+# Fields of no Custom table column, only shown on the quote page of each ticker. They cost
+# one request per ticker, so the default field lists leave them out, ask for them with columns=
+QUOTE_ONLY_FIELDS = [
+    '52W Range',
+    'Dividend Est.',
+    'Dividend TTM',
+    'Dividend Ex-Date',
+    'EPS Y/Y TTM',
+    'Sales Y/Y TTM',
+    'Return% 1Y',
+]
+
 MONEY_COLUMNS = [
     'Avg Volume', 
     'Shs Outstand',
@@ -1,6 +1,8 @@
 import pandas as pd
 from datetime import datetime
 from finviz_utils.finviz_utils import (
+    _get_data_frame_with_custom_fields,
+    _get_dataframe,
     get_filters,
     get_dataframe_by_industry,
     get_dataframe_by_sector,
@@ -115,7 +117,9 @@ class FinvizDataCalendarGenerator:
         table   <- You can see more table formats in Finviz but only support 
                    Prformance and Overview
         """
-        
+
+        # One filtered crawl: the whole calendar as t= batches takes far more requests
+        # than a sector, industry or index, use get_finviz_data_for_upcoming for ticker lists
         if industry and not index and not sector:
             finviz_data = get_dataframe_by_industry(
                 industry, 
@@ -200,15 +204,54 @@ class FinvizDataCalendarGenerator:
         earnings_calendar['dataDate'] = datetime.now().strftime("%Y-%m-%d")
         return earnings_calendar
 
+    @classmethod
+    def get_finviz_data_for_upcoming(cls,
+                                     days=7,
+                                     table='Performance',
+                                     details=True):
+        """
+        Requests only the tickers reporting in the next days, in batches of
+        t= ticker lists, instead of whole industries, sectors or indexes.
+
+        days    <- days ahead of the report dates, 7 for this week
+        """
+        tickers = cls.get_calendar_symbols(days=days)
+        if table == 'Custom':
+            finviz_data = _get_data_frame_with_custom_fields(None, order='marketcap', tickers=tickers)
+        else:
+            finviz_data = _get_dataframe(None, table=table, order='marketcap', details=details, tickers=tickers)
+
+        earnings_calendar = cls.get_earning_calendar_for(finviz_data.T.index, days=days)
+        return cls.prepare_finviz_calendar(
+            earnings_calendar=earnings_calendar,
+            finviz_data=finviz_data,
+            table=table)
+
+    @classmethod
+    def get_calendar_symbols(cls, days=None):
+        """
+        :days   only the symbols reporting in the next days, every symbol if None
+        """
+        data = MasterEarningsCalendar.get_whole_earnings_calendar(csv=True)
+        if days is not None:
+            data = data[(data['days_left'] >= 0) & (data['days_left'] <= days)]
+
+        return list(data['symbol'].dropna().unique())
+
     @classmethod
     def get_earning_calendar_for(cls, 
-                                 symbols):
+                                 symbols,
+                                 days=None):
         """
         :symbols list of symbols 
+        :days   only the report dates in the next days, all of them if None
 
         """
         data = MasterEarningsCalendar.get_whole_earnings_calendar(csv=True)
         filtered_results = data[data['symbol'].isin(symbols)]
+        if days is not None:
+            filtered_results = filtered_results[(filtered_results['days_left'] >= 0)
+                                                & (filtered_results['days_left'] <= days)]
 
         return filtered_results.sort_index()
 
@@ -1,12 +1,13 @@
 # import sys;sys.path.insert(1,'/Users/administrador/Documents/Devs/finviz-platform')
 from finviz.screener import Screener
+from finviz.ticker_list import TickerListScreener
 import pandas as pd
 from pprint import pprint as pp
 import numpy as np
 from finviz_utils.constants import (
     PERFORMANCE_TABLE_ALL_FIELDS,
     CUSTOM_TABLE_ALL_FIELDS,
-    CUSTOM_TABLE_FIELDS_ON_URL,
+    QUOTE_ONLY_FIELDS,
     PERCENTAJE_COLUMNS,
     MONEY_COLUMNS,
     NUMERIC_COLUMNS,
@@ -25,32 +26,60 @@ def get_filters(sub_category=None, raw=False):
     return filters.get(sub_category)
 
 
-def _get_dataframe(filters, table, order, details):
-    stock_list = Screener(filters=[filters], table=table, order=order)
+def _screen_fields(fields, filters, order, tickers=None):
+    # Fields are read from Custom table columns, quote pages are only requested for the other fields
+    filters = [filters] if filters else None
+    if tickers is not None:
+        # With tickers, only those tickers are requested, in batches, instead of every stock of the filter
+        return TickerListScreener.init_from_fields(fields, tickers=tickers, filters=filters, order=order)
+    return Screener.init_from_fields(fields, filters=filters, order=order)
+
+# Fields of each table whose details can be planned, the other tables are requested as they are
+DETAILS_FIELDS = {
+    'Performance': PERFORMANCE_TABLE_ALL_FIELDS,
+    'Custom': CUSTOM_TABLE_ALL_FIELDS,
+}
+
+def _without_quote_only_fields(fields):
+    # Quote page only fields are left out of the default lists, they need one request per ticker
+    return [field for field in fields if field not in QUOTE_ONLY_FIELDS]
+
+def _get_dataframe(filters, table, order, details, tickers=None):
+    fields = PERFORMANCE_TABLE_ALL_FIELDS
     if details:
-        stock_list = stock_list.get_ticker_details()
-    data = pd.DataFrame(index=PERFORMANCE_TABLE_ALL_FIELDS)
+        if table not in DETAILS_FIELDS:
+            raise ValueError(f'Details are only available for the tables {list(DETAILS_FIELDS)}, '
+                             f'not {table}, use details=False')
+        fields = DETAILS_FIELDS[table]
+        stock_list = _screen_fields(_without_quote_only_fields(fields), filters, order, tickers=tickers)
+    elif tickers is not None:
+        stock_list = TickerListScreener(tickers, filters=[filters] if filters else None, table=table, order=order)
+    else:
+        stock_list = Screener(filters=[filters], table=table, order=order)
+    data = pd.DataFrame(index=fields)
     for stock in stock_list:
         ticker = stock.get('Ticker')
-        ticker_data = pd.DataFrame(index=CUSTOM_TABLE_ALL_FIELDS)
+        ticker_data = pd.DataFrame(index=fields)
         for key, value in stock.items():
-            if key in PERFORMANCE_TABLE_ALL_FIELDS:
+            if key in fields:
                 ticker_data.loc[key, ticker] = value
         data = pd.concat([data, ticker_data], axis=1)
     return _process_dataframe(data)
 
-def _get_data_frame_with_custom_fields(filters, order):
-    
-    order = f"&o={order}"
-    query = f"https://finviz.com/screener.ashx?v=152&f={filters}" + CUSTOM_TABLE_FIELDS_ON_URL + order
-    stock_list = Screener.init_from_url(query)
-    stock_list = stock_list.get_ticker_details()
-    data = pd.DataFrame(index=CUSTOM_TABLE_ALL_FIELDS)
+def _get_data_frame_with_custom_fields(filters, order, columns=None, tickers=None):
+    # With columns, only those fields are requested instead of every Custom table field
+    if columns:
+        fields = ['Ticker'] + [column for column in columns if column != 'Ticker']
+        stock_list = _screen_fields(fields, filters, order, tickers=tickers)
+    else:
+        fields = CUSTOM_TABLE_ALL_FIELDS
+        stock_list = _screen_fields(_without_quote_only_fields(fields), filters, order, tickers=tickers)
+    data = pd.DataFrame(index=fields)
     for stock in stock_list:
         ticker = stock.get('Ticker')
-        ticker_data = pd.DataFrame(index=CUSTOM_TABLE_ALL_FIELDS)
+        ticker_data = pd.DataFrame(index=fields)
         for key, value in stock.items():
-            if key in CUSTOM_TABLE_ALL_FIELDS:
+            if key in fields:
                 ticker_data.loc[key, ticker] = value
         data = pd.concat([data, ticker_data], axis=1)
     return data
@@ -58,61 +87,69 @@ def _get_data_frame_with_custom_fields(filters, order):
 def get_dataframe_by_industry(industry=None, 
                               table='Performance', 
                               order='marketcap', 
-                              details=True):
+                              details=True,
+                              columns=None,
+                              tickers=None):
     if not industry:
         pp(get_filters('Industry'))
         return
     filters = get_filters('Industry').get(industry)
-    if table == 'Custom':
-        data = _get_data_frame_with_custom_fields(filters, order=order)
+    if table == 'Custom' or columns:
+        data = _get_data_frame_with_custom_fields(filters, order=order, columns=columns, tickers=tickers)
     else:
         print("the table is not custom")
-        data = _get_dataframe(filters, table=table, order=order, details=details)
+        data = _get_dataframe(filters, table=table, order=order, details=details, tickers=tickers)
         data.loc['Industry'] = industry
     return data
 
 def get_dataframe_by_index(index=None, 
                            table='Performance', 
                            order='marketcap', 
-                           details=True):
+                           details=True,
+                           columns=None,
+                           tickers=None):
     if not index:
         pp(get_filters('Index'))
         return
     filters = get_filters('Index').get(index)
     if not filters:
         print(f'No valid index. Valid indexes: {get_filters("Index")}')
-    if table == 'Custom':
-        data = _get_data_frame_with_custom_fields(filters, order=order)
+    if table == 'Custom' or columns:
+        data = _get_data_frame_with_custom_fields(filters, order=order, columns=columns, tickers=tickers)
     else:
-        data = _get_dataframe(filters, table=table, order=order, details=details)
+        data = _get_dataframe(filters, table=table, order=order, details=details, tickers=tickers)
         data.loc['Index'] = index
     return data
 
 def get_dataframe_by_sector(sector=None, 
                             table='Performance', 
                             order='marketcap', 
-                            details=True):
+                            details=True,
+                            columns=None,
+                            tickers=None):
     if not sector:
         pp(get_filters('Sector'))
         return
     filters = get_filters('Sector').get(sector)
     if not filters:
         print(f'No valid sector. Valid sectors: {get_filters("Sector")}')
-    if table == 'Custom':
-        data = _get_data_frame_with_custom_fields(filters, order=order)
+    if table == 'Custom' or columns:
+        data = _get_data_frame_with_custom_fields(filters, order=order, columns=columns, tickers=tickers)
     else:
-        data = _get_dataframe(filters, table=table, order=order, details=details)
+        data = _get_dataframe(filters, table=table, order=order, details=details, tickers=tickers)
         data.loc['Sector'] = sector
     return data
 
-def get_dataframe_by_exchange(exchange=None, table='Performance', order='marketcap', details=True):
+def get_dataframe_by_exchange(exchange=None, table='Performance', order='marketcap', details=True, columns=None, tickers=None):
     if not exchange:
         pp(get_filters('Exchange'))
         return
     filters = get_filters('Exchange').get(exchange)
     if not filters:
         print(f'No valid exchange. Valid exchanges: {get_filters("Exchange")}')
-    return _get_dataframe(filters, table=table, order=order, details=details)
+    if columns:
+        return _get_data_frame_with_custom_fields(filters, order=order, columns=columns, tickers=tickers)
+    return _get_dataframe(filters, table=table, order=order, details=details, tickers=tickers)
 
 def _process_money_value(value):
     if type(value) == float:
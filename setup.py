@@ -2,7 +2,7 @@ from distutils.core import setup
 
 setup(
     name="finviz-platform",
-    packages=["finviz", "finviz.helper_functions", 
+    packages=["finviz", "finviz.helper_functions", "finviz.testing",
               "finviz_utils", "finviz_utils.earnings_calendar", 
               "finviz_utils.earnings_anomaly"],
     version="0.1.0",